@@ -0,0 +1,67 @@
+"""Compare sampling of limit random unique ids with ReservoirSampler
+against collecting all unique ids, shuffling and slicing them.
+
+Run from root of repository:
+    python benchmarks/bench_sampler.py
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from dztoolset.sampler import ReservoirSampler  # noqa: E402
+
+
+def full_shuffle(ids, limit):
+    tracks = array('q')
+    seen = set()
+    for track_id in ids:
+        if track_id not in seen:
+            seen.add(track_id)
+            tracks.append(track_id)
+    random.shuffle(tracks)
+    return tracks[:limit]
+
+
+def reservoir(ids, limit):
+    sampler = ReservoirSampler(limit)
+    sampler.extend(ids)
+    return sampler.get_sample()
+
+
+def measure(func, ids, limit):
+    """Run func twice, to get time without tracing and peak memory."""
+    started = time.perf_counter()
+    func(ids, limit)
+    seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    func(ids, limit)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main(limit=1000):
+    print('{0:>9} {1:>14} {2:>10} {3:>10}'.format(
+        'ids', 'method', 'time, s', 'peak, Mb'
+    ))
+    for size in (10000, 100000, 1000000):
+        # about 10% of ids are duplicates, like in overlapping playlists
+        ids = array('q', (random.randrange(size * 10)
+                          for i in range(size)))
+        ids.extend(ids[:size // 10])
+        for name, func in (('full shuffle', full_shuffle),
+                           ('reservoir', reservoir)):
+            seconds, peak = measure(func, ids, limit)
+            print('{0:>9} {1:>14} {2:>10.3f} {3:>10.2f}'.format(
+                size, name, seconds, peak / 1024 / 1024
+            ))
+
+
+if __name__ == '__main__':
+    main()
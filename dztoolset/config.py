@@ -3,6 +3,8 @@ import os
 import sys
 from typing import Dict
 
+_UNSET = object()
+
 
 class Config(object):
     """Manage info from config .ini file."""
@@ -30,7 +32,8 @@ class Config(object):
         else:
             self._read()
 
-    def get(self, section: str = None, option: str = None):
+    def get(self, section: str = None, option: str = None,
+            fallback=_UNSET):
         """Get info from config.
 
         if option is None, will return section as dictionary
@@ -39,13 +42,24 @@ class Config(object):
         Keyword arguments:
         section -- section name of config (default None)
         option -- option name of config (default None)
+        fallback -- value returned if there is no such option,
+            if not passed, exception will be raised
         """
         if option is None and section is None:
             return self._get_all()
         elif option is None:
             return self._get_section(section)
         else:
-            return self._get_option(section, option)
+            return self._get_option(section, option, fallback)
+
+    def get_bool(self, section: str, option: str, fallback=_UNSET):
+        """Get option value converted to bool.
+
+        Values like yes/no, on/off, true/false, 1/0 are accepted.
+        """
+        if fallback is _UNSET:
+            return self.cfg.getboolean(section, option)
+        return self.cfg.getboolean(section, option, fallback=fallback)
 
     def set(self, section: str, option: str, value):
         """Set option value and _write change to config file.
@@ -117,6 +131,8 @@ class Config(object):
             data[key] = val
         return data
 
-    def _get_option(self, section: str, option: str):
+    def _get_option(self, section: str, option: str, fallback=_UNSET):
         """Will return value of config option in section."""
-        return self.cfg.get(section, option)
+        if fallback is _UNSET:
+            return self.cfg.get(section, option)
+        return self.cfg.get(section, option, fallback=fallback)
@@ -1,17 +1,189 @@
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
+from urllib.parse import parse_qsl, quote, unquote, urlsplit
 
 import requests
 
+from dztoolset.deezersession import DeezerSession
+from dztoolset.ratelimiter import RateLimiter
+from dztoolset.retrypolicy import RetryPolicy
+from dztoolset.responsecache import ResponseCache
 
-class DeezerApi(object):
-    """Send requests to Deezer api and get answers as dicts
-    before use, set valid auth token into self.token
+QUOTA_ERROR_CODE = 4
+TOKEN_ERROR_CODE = 300
+
+
+class DeezerApiBase(object):
+    """Common part of sync and async Deezer api clients:
+    request params, decoding of answers and errors
     """
 
-    def __init__(self):
+    def __init__(self, rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None):
+        """Keyword arguments:
+        rate_limiter -- limiter all requests pass through, it must be
+            the same for all api clients working with one account,
+            if None, new one with Deezer quota will be created (default None)
+        retry_policy -- decides if request failed due connection or server
+            error should be sent again, if None, default one will be
+            created (default None)
+        """
         self._base_url = 'http://api.deezer.com'
         self._limit_results_per_request = 500
+        self.quota_retries = 5
+        self.token = ''
+        self.rate_limiter = (rate_limiter if rate_limiter is not None
+                             else RateLimiter())
+        self.retry_policy = (retry_policy if retry_policy is not None
+                             else RetryPolicy())
+
+    def _process_api_error(self, error_data: Dict):
+        """Raise exception by error sesponse from Deezer.
+
+        Keyword arguments:
+        error_data -- Dict with info about errror with keys:
+            'message' - error message, str
+            'code'    - error code, optional, str
+        """
+        code = error_data['code'] if 'code' in error_data else None
+        raise DeezerApiRequestError(error_data['message'], code)
+
+    def _is_quota_error(self, error: 'DeezerApiRequestError'):
+        """Check if error means that requests quota is exceeded."""
+        return str(error.code) == str(QUOTA_ERROR_CODE)
+
+    def _is_token_error(self, error: 'DeezerApiRequestError'):
+        """Check if error means that auth token is invalid or expired."""
+        return str(error.code) == str(TOKEN_ERROR_CODE)
+
+    def _get_token(self, url: str, args: tuple):
+        """Get token request is sent with, return str."""
+        if args and isinstance(args[0], dict) and 'access_token' in args[0]:
+            return args[0]['access_token']
+        match = re.search(r'access_token=([^&]*)', url)
+        return unquote(match.group(1)) if match else ''
+
+    def _replace_token(self, url: str, args: tuple, token: str):
+        """Put new token into url and params of request, return tuple
+        of url and args.
+        """
+        url = re.sub(r'access_token=[^&]*',
+                     'access_token=' + quote(token, safe=''), url)
+        if args and isinstance(args[0], dict) and 'access_token' in args[0]:
+            args = (dict(args[0], access_token=token),) + tuple(args[1:])
+        return url, args
+
+    def _is_transient_error(self, error: Exception):
+        """Check if request failed with error could succeed next time.
+
+        Those are connection errors, timeouts, server errors
+        and broken answers that cant be decoded.
+        """
+        return isinstance(error, (requests.exceptions.ConnectionError,
+                                  requests.exceptions.Timeout,
+                                  DeezerApiServerError,
+                                  json.JSONDecodeError))
+
+    def _decode_response(self, response: requests.models.Response):
+        """Decode json from response object, return Dict or bool.
+
+        Raise exception if Deezer answered with error.
+        """
+        if response.status_code >= 500:
+            raise DeezerApiServerError(
+                'Deezer api answered with status {0}'
+                .format(response.status_code)
+            )
+
+        response = json.loads(response.text)
+
+        if not isinstance(response, bool) and 'error' in response:
+            return self._process_api_error(response['error'])
+
+        return response
+
+    def _check_list_page(self, page):
+        """Raise exception if page is not page of paginated list."""
+        if not isinstance(page, dict) or 'data' not in page:
+            raise DeezerApiError('Error occured on request to Deezer api')
+
+    def _get_page_offsets(self, page: Dict):
+        """Get index offsets of pages of list after first one,
+        return range.
+
+        Offset between pages is index of next page taken from 'next'
+        link of first page, server could return less items than limit,
+        so number of items on page is used only if there is no index
+        in link.
+
+        Keyword arguments:
+        page -- first page of list with 'data' and 'total'
+        """
+        query = dict(parse_qsl(urlsplit(page.get('next', '')).query))
+        try:
+            stride = int(query['index'])
+        except (KeyError, ValueError):
+            stride = 0
+        if stride <= 0:
+            stride = len(page['data'])
+        return range(stride, int(page['total']), stride)
+
+    def _build_query_uri(self, uri: str, params: Dict):
+        """Put params into uri as GET parameters, return str."""
+        return uri + '?' + '&'.join([f'{key}={val}'
+                                     for key, val in params.items()])
+
+    def _add_required_params(self, params: Dict):
+        """Add token and limit to copy of requests param. Return Dict
+
+        Passed dict is not changed, so default {} of request methods
+        never keeps token or limit from previous call.
+        """
+        params = dict(params)
+        if 'access_token' not in params:
+            params['access_token'] = self.token
+
+        if 'limit' not in params:
+            params['limit'] = self._limit_results_per_request
+
+        return params
+
+    def _invalidate_cache(self, url: str):
+        """Remove cached responses changed by not GET request to url."""
+        # changed playlist and listing of playlists with its nb_tracks
+        paths = ['/user/me/playlists']
+        match = re.search(r'/playlist/\d+', url)
+        if match:
+            paths.append(match.group(0))
+        self.cache.invalidate(paths)
+
+
+class DeezerApi(DeezerApiBase):
+    """Send requests to Deezer api and get answers as dicts
+    before use, set valid auth token into self.token
+    """
+
+    def __init__(self, session: DeezerSession = None,
+                 rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None,
+                 cache: ResponseCache = None):
+        """Keyword arguments:
+        session -- pooled http session, could be shared with DeezerAuth,
+            if None, new one will be created (default None)
+        rate_limiter -- see DeezerApiBase
+        retry_policy -- see DeezerApiBase
+        cache -- persistent cache of GET responses, if None,
+            responses are not cached (default None)
+        """
+        super(DeezerApi, self).__init__(rate_limiter, retry_policy)
+        self.workers = 4
+        self.session = session if session is not None else DeezerSession()
+        self.cache = cache
+        # callable receiving rejected token, it should put valid one
+        # into self.token, request is sent again with it once
+        self.token_refresher = None
 
     def get_request(self, uri: str, response_type: str = 'single',
                     params: Dict = {}):
@@ -23,7 +195,7 @@ class DeezerApi(object):
         params -- Dict with parameters to add to request (default {})
         """
         params = self._add_required_params(params)
-        response = requests.get(self._base_url + uri, params)
+        response = self._send('get', self._base_url + uri, params)
         return self._prepare_response(response, response_type)
 
     def get_request_strict(self, url: str, response_type: str = 'single'):
@@ -32,7 +204,7 @@ class DeezerApi(object):
         Url include domain and all parameters
         response_type -- 'single' or 'list'
         """
-        response = requests.get(url)
+        response = self._send('get', url)
         return self._prepare_response(response, response_type)
 
     def post_request(self, uri: str, response_type: str = 'single',
@@ -45,7 +217,7 @@ class DeezerApi(object):
         params -- Dict with parameters to add to request (default {})
         """
         params = self._add_required_params(params)
-        response = requests.post(self._base_url + uri, params)
+        response = self._send('post', self._base_url + uri, params)
         return self._prepare_response(response, response_type)
 
     def delete_request(self, uri: str, response_type: str = 'single',
@@ -58,49 +230,125 @@ class DeezerApi(object):
         params -- Dict with parameters to add to request (default {})
         """
         params = self._add_required_params(params)
-        uri += '?'+'&'.join([f'{key}={val}' for key, val in params.items()])
+        uri = self._build_query_uri(uri, params)
 
-        response = requests.delete(self._base_url + uri)
+        response = self._send('delete', self._base_url + uri)
         return self._prepare_response(response, response_type)
 
-    def _process_api_error(self, error_data: Dict):
-        """Raise exception by error sesponse from Deezer.
+    def iter_request(self, uri: str, params: Dict = {},
+                     parallel: bool = False):
+        """Generator yields items of paginated list from Deezer API.
+
+        Pages are requested one by one following 'next' links
+        only when previous page is consumed, so whole list
+        never held in memory at once.
+
+        In parallel mode offsets of all pages are computed from 'total'
+        field of first page, and rest of pages are requested concurrently
+        by self.workers threads. Items are yielded in the same order.
 
         Keyword arguments:
-        error_data -- Dict with info about errror with keys:
-            'message' - error message, str
-            'code'    - error code, optional, str
+        uri -- address without domain
+        params -- Dict with parameters to add to request (default {})
+        parallel -- prefetch pages concurrently (default False)
         """
-        code = error_data['code'] if 'code' in error_data else None
-        raise DeezerApiRequestError(error_data['message'], code)
+        params = self._add_required_params(params)
+        page = self._send('get', self._base_url + uri, params)
+
+        if parallel:
+            yield from self._iter_list_data_parallel(uri, params, page)
+        else:
+            yield from self._iter_list_data(page)
+
+    def _send(self, method: str, url: str, *args):
+        """Send request through rate limiter, return decoded response.
 
-    def _prepare_response(self, response: requests.models.Response,
-                          response_type: str):
-        """Get data from response object.
+        If Deezer answers that quota is exceeded, wait for whole
+        quota period and send request again, up to self.quota_retries times.
+        If request failed due connection, timeout or server error,
+        self.retry_policy decides if it should be sent again.
+
+        GET responses are taken from self.cache while they are fresh,
+        stale ones are revalidated with conditional request.
+        Other requests invalidate cached responses of changed playlist.
+
+        If Deezer rejects token, self.token_refresher is asked
+        for valid one and request is sent again with it once.
 
         Keyword arguments:
-        response -- response object from requests lib
+        method -- 'get', 'post' or 'delete'
+        url -- full url of request
+        args -- additional arguments for session method, like params
+        """
+        send = getattr(self.session, method)
+        kwargs = {}
+        entry = None
+
+        if self.cache is not None and method == 'get':
+            entry = self.cache.get(url, *args)
+            if entry is not None and entry.is_fresh():
+                entry.touch()
+                return self._decode_response(entry)
+            if entry is not None and entry.get_validators():
+                kwargs['headers'] = entry.get_validators()
+
+        quota_attempt = 0
+        attempt = 0
+        token_refreshed = False
+
+        while True:
+            self.rate_limiter.acquire()
+            attempt += 1
+            try:
+                response = send(url, *args, **kwargs)
+                if entry is not None and response.status_code == 304:
+                    self.cache.revalidated(entry)
+                    return self._decode_response(entry)
+
+                data = self._decode_response(response)
+                if self.cache is not None:
+                    self._update_cache(method, url, args, response)
+                return data
+            except DeezerApiRequestError as e:
+                if (self._is_token_error(e) and not token_refreshed
+                        and self.token_refresher is not None):
+                    token_refreshed = True
+                    self.token_refresher(self._get_token(url, args))
+                    url, args = self._replace_token(url, args, self.token)
+                    continue
+                if (not self._is_quota_error(e)
+                        or quota_attempt >= self.quota_retries):
+                    raise
+                quota_attempt += 1
+                self.rate_limiter.drain()
+            except Exception as e:
+                if (not self._is_transient_error(e)
+                        or not self.retry_policy.should_retry(method,
+                                                              attempt, e)):
+                    raise
+                self.retry_policy.wait(attempt)
+
+    def _update_cache(self, method: str, url: str, args, response):
+        """Store GET response or invalidate responses changed by request."""
+        if method == 'get':
+            self.cache.store(url, args[0] if args else None, response)
+            return
+
+        self._invalidate_cache(url)
+
+    def _prepare_response(self, response, response_type: str):
+        """Get data from decoded response.
+
+        Keyword arguments:
+        response -- decoded response, Dict or bool
         response_type -- 'list' or 'single'
         if 'list' then getting all paginated data with additional requests
         """
-        response = json.loads(response.text)
-
         if isinstance(response, bool):
             return response
 
-        if 'error' in response:
-            return self._process_api_error(response['error'])
-
         if response_type == 'list':
-            if 'data' not in response:
-                raise DeezerApiError('Error occured on request'
-                                     ' to Deezer api')
-
-            nextPages = []
-            if 'next' in response:
-                nextPages = self.get_request_strict(response['next'], 'list')
-
-            return response['data'] + nextPages
+            return list(self._iter_list_data(response))
 
         elif response_type == 'single':
             return response
@@ -111,23 +359,62 @@ class DeezerApi(object):
                 ' it can be either single or list'.format(response_type)
             )
 
-    def _add_required_params(self, params: Dict):
-        """Add token and limit to requests param. Return Dict"""
-        if 'access_token' not in params:
-            params['access_token'] = self.token
+    def _iter_list_data(self, page: Dict):
+        """Generator yields items from page and all pages after it.
 
-        if 'limit' not in params:
-            params['limit'] = self._limit_results_per_request
+        Next pages are requested iteratively by 'next' link,
+        so stack depth stays the same for any number of pages.
+        """
+        while True:
+            self._check_list_page(page)
+            yield from page['data']
 
-        return params
+            if 'next' not in page:
+                break
+
+            page = self._send('get', page['next'])
+
+    def _iter_list_data_parallel(self, uri: str, params: Dict, page: Dict):
+        """Generator yields items from first page and all pages after it.
+
+        Pages after first are requested concurrently by index offsets.
+        If there is no 'total' in page, falls back to following
+        'next' links one by one.
+        """
+        if 'total' not in page or 'next' not in page:
+            yield from self._iter_list_data(page)
+            return
+
+        if 'data' not in page or not page['data']:
+            raise DeezerApiError('Error occured on request to Deezer api')
+
+        offsets = self._get_page_offsets(page)
+
+        def fetch_page(index: int):
+            # token could be refreshed by request of other page
+            page_params = dict(params, index=index, access_token=self.token)
+            data = self._send('get', self._base_url + uri, page_params)
+            self._check_list_page(data)
+            return data['data']
+
+        yield from page['data']
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for data in executor.map(fetch_page, offsets):
+                yield from data
 
 
 class DeezerApiError(Exception):
     pass
 
 
+class DeezerApiServerError(DeezerApiError):
+    pass
+
+
 class DeezerApiRequestError(DeezerApiError):
     def __init__(self, message, code):
+        self.code = code
         codeStr = 'code '+str(code) if code else ''
         exc_message = 'Deezer API error {1}: {0}'.format(message, codeStr)
         super(DeezerApiError, self).__init__(exc_message)
@@ -0,0 +1,234 @@
+import asyncio
+import functools
+from typing import Dict
+
+from dztoolset.deezerapi import (DeezerApiBase, DeezerApiError,
+                                 DeezerApiRequestError)
+from dztoolset.deezersession import DeezerSession
+from dztoolset.ratelimiter import RateLimiter
+from dztoolset.responsecache import ResponseCache
+from dztoolset.retrypolicy import RetryPolicy
+
+
+class SessionTransport(object):
+    """Default transport for AsyncDeezerApi.
+
+    Sends requests with pooled DeezerSession in threads
+    of event loop executor, so event loop is never blocked.
+
+    Any object with coroutine method request(method, url, params)
+    that returns object with status_code and text attributes
+    could be used as transport instead.
+    """
+
+    def __init__(self, session: DeezerSession = None):
+        self.session = session if session is not None else DeezerSession()
+
+    async def request(self, method: str, url: str, params: Dict = None):
+        """Send request, return response object from requests lib.
+
+        Keyword arguments:
+        method -- 'get', 'post' or 'delete'
+        url -- full url of request
+        params -- Dict with parameters of request (default None)
+        """
+        send = getattr(self.session, method)
+        args = (url,) if params is None else (url, params)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(send, *args))
+
+
+class AsyncDeezerApi(DeezerApiBase):
+    """Send requests to Deezer api from asyncio event loop
+    and get answers as dicts.
+
+    Before use, set valid auth token into self.token
+    """
+
+    def __init__(self, transport=None, rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None, concurrency: int = 4,
+                 cache: ResponseCache = None):
+        """Keyword arguments:
+        transport -- object sending http requests, if None
+            SessionTransport will be used (default None)
+        rate_limiter -- see DeezerApiBase
+        retry_policy -- see DeezerApiBase
+        concurrency -- max number of requests in flight at once (default 4)
+        cache -- cache of GET responses of DeezerApi, responses changed
+            by requests are removed from it, but it is not read
+            (default None)
+        """
+        super(AsyncDeezerApi, self).__init__(rate_limiter, retry_policy)
+        self.transport = (transport if transport is not None
+                          else SessionTransport())
+        self.concurrency = concurrency
+        self.cache = cache
+        # callable receiving rejected token, it should put valid one
+        # into self.token, request is sent again with it once,
+        # it is called in thread of executor, so it could block
+        self.token_refresher = None
+        self._semaphore = None
+        self._semaphore_loop = None
+        self._rejected_tokens = set()
+
+    async def get_request(self, uri: str, response_type: str = 'single',
+                          params: Dict = {}):
+        """Send GET request to Deezer API, return Dict, List or bool
+
+        If response_type is 'list', pages after first are requested
+        concurrently by index offsets.
+
+        Keyword arguments:
+        uri -- address without domain
+        response_type -- 'single' or 'list'
+        params -- Dict with parameters to add to request (default {})
+        """
+        params = self._add_required_params(params)
+        response = await self._send('get', self._base_url + uri, params)
+
+        if response_type == 'list' and not isinstance(response, bool):
+            return await self._get_list_data(uri, params, response)
+
+        return self._prepare_response(response, response_type)
+
+    async def post_request(self, uri: str, response_type: str = 'single',
+                           params: Dict = {}):
+        """Send POST request to Deezer API, return bool or Dict.
+
+        Keyword arguments:
+        uri -- address without domain
+        response_type -- 'single'
+        params -- Dict with parameters to add to request (default {})
+        """
+        params = self._add_required_params(params)
+        response = await self._send('post', self._base_url + uri, params)
+        return self._prepare_response(response, response_type)
+
+    async def delete_request(self, uri: str, response_type: str = 'single',
+                             params: Dict = {}):
+        """Send DELETE request to Deezer API, return bool or Dict.
+
+        Keyword arguments:
+        uri -- address without domain
+        response_type -- 'single'
+        params -- Dict with parameters to add to request (default {})
+        """
+        params = self._add_required_params(params)
+        uri = self._build_query_uri(uri, params)
+        response = await self._send('delete', self._base_url + uri)
+        return self._prepare_response(response, response_type)
+
+    @property
+    def semaphore(self):
+        """Semaphore bounding requests in flight.
+
+        It is bound to event loop, so new one is created for each loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+
+        return self._semaphore
+
+    async def _send(self, method: str, url: str, params: Dict = None):
+        """Send request through rate limiter, return decoded response.
+
+        Quota errors, transient failures and rejected token
+        are handled the same way as in DeezerApi. Requests are made
+        before they wait for semaphore, so token rejected meanwhile
+        is replaced with current one before sending.
+        """
+        loop = asyncio.get_running_loop()
+        quota_attempt = 0
+        attempt = 0
+        token_refreshed = False
+
+        while True:
+            async with self.semaphore:
+                await loop.run_in_executor(None, self.rate_limiter.acquire)
+                attempt += 1
+                args = () if params is None else (params,)
+                if self._get_token(url, args) in self._rejected_tokens:
+                    url, args = self._replace_token(url, args, self.token)
+                    params = args[0] if args else None
+                try:
+                    response = await self.transport.request(method, url,
+                                                            params)
+                    data = self._decode_response(response)
+                    if self.cache is not None and method != 'get':
+                        self._invalidate_cache(url)
+                    return data
+                except DeezerApiRequestError as e:
+                    if (self._is_token_error(e) and not token_refreshed
+                            and self.token_refresher is not None):
+                        token_refreshed = True
+                        rejected_token = self._get_token(url, args)
+                        await loop.run_in_executor(
+                            None, self.token_refresher, rejected_token
+                        )
+                        if self.token != rejected_token:
+                            self._rejected_tokens.add(rejected_token)
+                        url, args = self._replace_token(url, args,
+                                                        self.token)
+                        params = args[0] if args else None
+                        continue
+                    if (not self._is_quota_error(e)
+                            or quota_attempt >= self.quota_retries):
+                        raise
+                    quota_attempt += 1
+                    self.rate_limiter.drain()
+                    continue
+                except Exception as e:
+                    if (not self._is_transient_error(e)
+                            or not self.retry_policy.should_retry(
+                                method, attempt, e)):
+                        raise
+
+            await asyncio.sleep(self.retry_policy.get_delay(attempt))
+
+    def _prepare_response(self, response, response_type: str):
+        """Check type of decoded single response and return it."""
+        if isinstance(response, bool) or response_type == 'single':
+            return response
+
+        raise DeezerApiError(
+            'Unknown response type "{0}",'
+            ' it can be either single or list'.format(response_type)
+        )
+
+    async def _get_list_data(self, uri: str, params: Dict, page: Dict):
+        """Get items from first page and all pages after it, return List.
+
+        If there is 'total' in page, rest of pages are requested
+        concurrently, else 'next' links are followed one by one.
+        """
+        self._check_list_page(page)
+        items = list(page['data'])
+
+        if 'next' not in page:
+            return items
+
+        if 'total' not in page or not page['data']:
+            while 'next' in page:
+                page = await self._send('get', page['next'])
+                self._check_list_page(page)
+                items.extend(page['data'])
+            return items
+
+        async def fetch_page(index: int):
+            # token could be refreshed by request of other page
+            data = await self._send('get', self._base_url + uri,
+                                    dict(params, index=index,
+                                         access_token=self.token))
+            self._check_list_page(data)
+            return data['data']
+
+        pages = await asyncio.gather(*[
+            fetch_page(index) for index in self._get_page_offsets(page)
+        ])
+
+        for data in pages:
+            items.extend(data)
+
+        return items
@@ -0,0 +1,130 @@
+import asyncio
+from typing import List, Union
+
+from dztoolset.deezerasyncapi import AsyncDeezerApi, SessionTransport
+from dztoolset.deezertool import DeezerTool
+
+
+class AsyncDeezerTool(object):
+    """Async variants of DeezerTool operations for asyncio event loop.
+
+    It works on top of DeezerTool and shares with it http session,
+    rate limiter, retry policy, auth token, user info, listing
+    of playlists and local caches, so check token with DeezerTool
+    before use. Changes made here are seen by DeezerTool
+    the same way as its own ones.
+    """
+
+    def __init__(self, dztool: DeezerTool, transport=None):
+        """Keyword arguments:
+        dztool -- DeezerTool with checked token
+        transport -- object sending http requests, see AsyncDeezerApi,
+            if None, requests will be sent with session of dztool
+            (default None)
+        """
+        self._dztool = dztool
+
+        if transport is None:
+            transport = SessionTransport(dztool.session)
+
+        self.api = AsyncDeezerApi(transport, dztool.api.rate_limiter,
+                                  dztool.api.retry_policy,
+                                  concurrency=dztool.api.workers)
+        self.api.token_refresher = self._refresh_token
+        self._sync_api()
+
+    async def get_my_playlists(self, forced: bool = False):
+        """Request all playlists from Deezer and cache it.
+
+        Listing is shared with DeezerTool, so on next calls
+        playlists will be returned from it or from its listing cache.
+        For forced request pass forced param.
+        """
+        playlists = None if forced else self._dztool.get_loaded_playlists()
+        if playlists is None:
+            playlists = await self._sync_api().get_request(
+                '/user/me/playlists', 'list'
+            )
+            self._dztool.set_my_playlists(playlists)
+
+        return playlists
+
+    async def get_tracks_from_playlist(self, playlist_id: int):
+        """Request all tracks from playlist, return List of Dicts.
+
+        Cached responses of DeezerTool are not used for that.
+        """
+        uri = '/playlist/{0}/tracks'.format(playlist_id)
+        return await self._sync_api().get_request(uri, 'list')
+
+    async def create_playlist(self, title: str):
+        """Create playlist with title in your Deezer library.
+        Return id of new playlist
+        """
+        uri = '/user/{0}/playlists'.format(self._dztool.user['id'])
+        response = await self._sync_api().post_request(uri, 'single',
+                                                       {'title': title})
+        new_playlist_id = response['id']
+        self._dztool.playlist_created(new_playlist_id, title)
+        return new_playlist_id
+
+    async def remove_playlist(self, id: Union[str, int]):
+        """Remove playlist from your library by id, return bool."""
+        uri = '/playlist/{0}'.format(id)
+        response = await self._sync_api().delete_request(uri, 'single')
+        self._dztool.playlist_removed(id)
+        return response
+
+    async def purge_playlist(self, id: Union[str, int]):
+        """Remove all tracks from playlist by id.
+
+        Chunks of tracks are deleted concurrently.
+        """
+        uri = '/playlist/{0}/tracks'.format(id)
+        track_ids = [str(track['id']) for track
+                     in await self.get_tracks_from_playlist(id)]
+        await asyncio.gather(*[
+            self._sync_api().delete_request(uri, 'single',
+                                            {'songs': ','.join(chank)})
+            for chank in self._dztool.iter_delete_chanks(track_ids)
+        ])
+        self._dztool.playlist_tracks_changed(id, lambda nb_tracks: 0)
+
+    async def add_tracks_to_playlist(self, track_ids: List[int],
+                                     playlist_id: int):
+        """Add tracks by ids to playlist, return bool.
+
+        Ids are sent by the same batches as in DeezerTool, one after
+        another to keep order of track_ids.
+        """
+        uri = '/playlist/{0}/tracks'.format(playlist_id)
+        track_ids = [str(track_id) for track_id in track_ids]
+        response = True
+        added = 0
+
+        for batch in self._dztool.iter_add_batches(track_ids):
+            response = await self._sync_api().post_request(
+                uri, 'single', {'songs': ','.join(batch)}
+            ) and response
+            added += len(batch)
+
+        self._dztool.playlist_tracks_changed(
+            playlist_id, lambda nb_tracks: nb_tracks + added
+        )
+        return response
+
+    def _sync_api(self):
+        """Take current token and response cache of DeezerTool
+        into self.api, return it.
+
+        Both could be changed in DeezerTool after this tool was made,
+        like token refreshed by sync requests or disabled cache.
+        """
+        self.api.token = self._dztool.api.token
+        self.api.cache = self._dztool.api.cache
+        return self.api
+
+    def _refresh_token(self, rejected_token: str):
+        """Get valid token by DeezerTool after Deezer rejected one."""
+        self._dztool.refresh_token(rejected_token)
+        self.api.token = self._dztool.api.token
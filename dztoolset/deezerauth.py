@@ -4,7 +4,8 @@ import webbrowser
 import re
 from typing import Union
 
-import requests
+from dztoolset.deezersession import DeezerSession
+from dztoolset.tokencache import TokenCache
 
 
 class DeezerAuth(object):
@@ -17,8 +18,17 @@ class DeezerAuth(object):
     attach with each request to Deezer API
     """
 
-    def __init__(self):
+    def __init__(self, session: DeezerSession = None,
+                 token_cache: TokenCache = None):
+        """Keyword arguments:
+        session -- pooled http session, could be shared with DeezerApi,
+            if None, new one will be created (default None)
+        token_cache -- record of last successful token check, if set,
+            token is not checked again while record is fresh (default None)
+        """
         self.token = ''
+        self.session = session if session is not None else DeezerSession()
+        self.token_cache = token_cache
         self._user = None
         self._url_auth = (
             'https://connect.deezer.com/oauth/auth.php?app_id={0}'
@@ -86,15 +96,30 @@ class DeezerAuth(object):
         self._fetch_code()
         self._fetch_token()
 
-    def check_token(self):
-        """Check auth token, fetching user info, return bool"""
+    def check_token(self, forced: bool = False):
+        """Check auth token, fetching user info, return bool
+
+        If token was checked recently, user info is taken
+        from self.token_cache without request. Pass forced
+        to check token with request anyway.
+        """
+        if not forced and self.token_cache is not None:
+            user = self.token_cache.get_user(self.token)
+            if user is not None:
+                self._user = user
+                return True
+
         url = self._url_check_token.format(self.token)
-        response = json.loads(requests.get(url).text)
+        response = json.loads(self.session.get(url).text)
 
         if 'error' in response:
+            if self.token_cache is not None:
+                self.token_cache.clear()
             return False
         elif 'type' in response and response['type'] == 'user':
             self._user = response
+            if self.token_cache is not None:
+                self.token_cache.save(self.token, response)
             return True
         else:
             raise DeezerAuthError('Cant check auth token')
@@ -120,7 +145,7 @@ class DeezerAuth(object):
 
         """Fetch temporary auth token if you has auth code."""
         url = self._url_token.format(self._app_id, self._secret, self.code)
-        response = json.loads(requests.get(url).text)
+        response = json.loads(self.session.get(url).text)
 
         if 'access_token' in response:
             self.token = response['access_token']
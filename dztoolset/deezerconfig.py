@@ -10,18 +10,41 @@ class DeezerConfig(Config):
             'system': {
                 'port': '8090',
                 'editor': 'vim',
-                'browser': 'chrome'
+                'browser': 'chrome',
+                'pool_size': '10',
+                'keep_alive': 'yes',
+                'connect_timeout': '5',
+                'read_timeout': '30',
+                'workers': '4',
+                'scenario_workers': '2',
+                'retry_attempts': '4',
+                'retry_backoff': '0.5',
+                'retry_backoff_cap': '8'
             },
             'auth': {
                 'app_id': '',
                 'secret': '',
-                'token': ''
+                'token': '',
+                'rate_limit': '50',
+                'rate_period': '5',
+                'token_check_interval': '3600'
+            },
+            'cache': {
+                'enabled': 'yes',
+                'track_store': 'yes',
+                'max_size': '50',
+                'playlists_ttl': '300',
+                'ttl': '/user/me/playlists: 300, /playlist/*/tracks: 3600'
             },
             'pl_example': {
                 'title': 'Example shuffled playlist',
                 'type': 'shuffled',
                 'source': 'playlist 1, playlist 2',
-                'limit': 1000
+                'limit': 1000,
+                'update': 'reset',
+                'reset_policy': 'keep_id',
+                'sparse_fetch': 'no',
+                'regenerate': 'always'
             }
         }
 
@@ -1,9 +1,16 @@
-from typing import List, Union
+import hashlib
+import json
+import math
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Union
 from random import shuffle
 from datetime import datetime
 
 from dztoolset.deezertool import DeezerTool
 from dztoolset.printer import Printer
+from dztoolset.sampler import ReservoirSampler
 
 
 class DeezerPlaylist(object):
@@ -12,70 +19,311 @@ class DeezerPlaylist(object):
     def __init__(self, config):
         self._dztool = DeezerTool(config)
         self.printer = Printer()
+        self._resume = False
 
     def check_and_update_token(self):
         self._dztool.check_and_update_token()
 
+    def disable_cache(self):
+        self._dztool.disable_cache()
+
+    def refresh_playlists(self):
+        self._dztool.get_my_playlists(forced=True)
+
+    def enable_resume(self):
+        """Continue interrupted make_shuffled_playlist() calls from
+        journal instead of starting them over.
+        """
+        self._resume = True
+
+    def prefetch_playlists(self, titles: List[str]):
+        """Fetch tracks of playlists with titles once for this run.
+
+        Ids are shared between all following make_shuffled_playlist()
+        calls, see DeezerTool.share_track_ids(). Titles missing
+        in library are skipped. Return number of fetched playlists.
+        """
+        self._dztool.share_track_ids()
+        playlists = self.get_playlists_by_titles(titles)
+        if not playlists:
+            return 0
+
+        self.printer.print('Prefetching tracks from playlists: '
+                           + ', '.join([pl['title'] for pl in playlists]))
+        for pl, track_ids, seconds in (
+            self._dztool.iter_track_ids_from_playlists(playlists)
+        ):
+            self.printer.print('Got {0} tracks from {1} in {2:.2f}s'
+                               .format(len(track_ids), pl['title'], seconds))
+        return len(playlists)
+
     def make_shuffled_playlist(self, title: str, source_pls: List,
-                               limit: int):
+                               limit: int, update_mode: str = 'reset',
+                               reset_policy: str = 'keep_id',
+                               sparse_fetch: bool = False):
 
         """Create shuffled playlist with `title`.
 
         If it exests then purge it from tracks,
         then populate it from your playlists wich titles listed
-        in `source_pls`, shufflig them before it
-        """
+        in `source_pls`, shufflig them before it.
 
-        self.printer.print('Resetting playlist {0}'.format(title))
+        With update_mode 'diff' existing playlist is not purged,
+        only tracks that differ from new shuffled set are deleted
+        or added, then tracks are sorted in shuffled order.
 
-        # reset playlist by title and get its id
-        target_playlist_id = self.reset_playlist_by_title(title)
-        self._dztool.set_playlist_desctiption(
-            target_playlist_id,
-            'Resetted '+datetime.today().strftime('%H:%M %d.%m.%Y')
-        )
+        reset_policy is passed to reset_playlist_by_title().
+
+        With sparse_fetch and limit, only pages with randomly picked
+        tracks are requested if it takes less requests than fetching
+        all tracks of source playlists.
+
+        Progress is recorded in journal, after enable_resume()
+        interrupted call continues adding picked tracks from place
+        where it stopped, see _resume_shuffled_playlist().
+        """
+        if update_mode not in ('reset', 'diff'):
+            raise DeezerPlaylistError(
+                'Unknown update mode "{0}", it can be either reset or diff'
+                .format(update_mode)
+            )
+
+        entry = self._dztool.journal.get(title)
+        if entry is not None and self._resume:
+            if self._resume_shuffled_playlist(title, entry, source_pls,
+                                              limit):
+                return self
+        elif entry is not None:
+            self.printer.print('Previous run for playlist {0} was'
+                               ' interrupted, starting over, pass --resume'
+                               ' to continue it instead'.format(title))
 
         # check if playlists from source_pls presence in library
-        # find all tracks from playlists from source_pls,
-        # suffle it and cut to limit, then shove to target playlist
+        # before touching target playlist
         self.check_for_absence_of_playlists(source_pls, True)
         playlists = self.get_playlists_by_titles(source_pls)
+        fingerprint = self._get_fingerprint(playlists, limit)
+        phases = dict.fromkeys(('reset', 'fetch', 'shuffle', 'add'), 0)
+        self._dztool.journal.start(title)
+
+        # reset of target and fetching of sources are independent,
+        # so they run at the same time, unless target is source too
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            reset_future = executor.submit(
+                self._timed, phases, 'reset', self._reset_target,
+                title, update_mode, reset_policy
+            )
+            if title in source_pls:
+                reset_future.result()
+                playlists = self.get_playlists_by_titles(source_pls)
+
+            tracks = self._timed(phases, 'fetch',
+                                 self._collect_source_tracks, playlists,
+                                 limit, sparse_fetch)
+            target_playlist_id = reset_future.result()
+
+        # suffle tracks and cut to limit, then shove to target playlist
+        self.printer.print('Shuffling playlist {0}'.format(title))
+        tracks = self._timed(phases, 'shuffle', self._shuffle_tracks,
+                             tracks, limit)
+        self._dztool.journal.save_plan(title, target_playlist_id, tracks,
+                                       update_mode, fingerprint)
+
+        self._timed(phases, 'add', self._fill_target, title,
+                    target_playlist_id, tracks, update_mode)
+        self._finish_target(title, target_playlist_id, tracks, fingerprint)
+
+        self.printer.print('Done playlist {0}'.format(title))
+        # stats are counted for whole run, not only for this playlist
+        self.printer.print(
+            'Requests after playlist {title}: {requests},'
+            ' new connections: {new_connections},'
+            ' reused connections: {reused_connections}'
+            .format(title=title, **self._dztool.get_connections_stats())
+        )
 
-        self.printer.print('Finding all tracks from playlists: '
-                           + ', '.join([pl['title'] for pl in playlists]))
+        retry_stats = self._dztool.get_retry_stats()
+        if retry_stats['retries'] > 0:
+            self.printer.print('Retried {0} failed requests after playlist'
+                               ' {1}'.format(retry_stats['retries'], title))
 
-        tracks = set()
-        duplicates_count = 0
-        tracks_count = 0
+        self.printer.print('Time of playlist {0}: '.format(title) + ', '.join(
+            '{0} {1:.2f}s'.format(phase, seconds)
+            for phase, seconds in phases.items()
+        ))
 
-        for pl in playlists:
-            for track in self._dztool.get_tracks_from_playlist(pl['id']):
-                tracks_count += 1
-                if track['id'] not in tracks:
-                    tracks.add(track['id'])
-                else:
-                    duplicates_count += 1
+        return self
 
-        self.printer.print('Found {0} tracks'.format(tracks_count))
+    def is_regeneration_needed(self, title: str, source_pls: List,
+                               limit: int = None, policy: str = 'always',
+                               min_interval: float = 3600):
+        """Check if playlist should be made again, return bool.
 
-        if duplicates_count > 0:
-            self.printer.print('Rid of {0} duplicates, {1} tracks left'
-                               .format(duplicates_count, len(tracks)))
+        Decision to skip it is printed and recorded in generation log,
+        see get_skip_reason() for policies.
+        """
+        reason = self.get_skip_reason(title, source_pls, limit, policy,
+                                      min_interval)
+        if reason is None:
+            return True
+
+        self.printer.print('Skipping playlist {0}: {1}'.format(title, reason))
+        self._dztool.generation_log.save_decision(title,
+                                                  'skipped: ' + reason)
+        return False
+
+    def get_skip_reason(self, title: str, source_pls: List,
+                        limit: int = None, policy: str = 'always',
+                        min_interval: float = 3600):
+        """Get reason to not make playlist again, return str or None.
+
+        With policy 'always' playlist is always made. With 'on_change'
+        it is skipped while its sources have the same checksums
+        and nb_tracks in playlists listing as on last generation
+        and limit is the same. With 'min_interval' it is skipped
+        until min_interval seconds passed since last generation.
+        Playlist that was not generated by script, was removed
+        since then or was left unfinished is never skipped.
+        """
+        if policy not in ('always', 'on_change', 'min_interval'):
+            raise DeezerPlaylistError(
+                'Unknown regenerate policy "{0}",'
+                ' it can be either always, on_change or min_interval'
+                .format(policy)
+            )
 
-        tracks = list(tracks)
+        record = self._dztool.generation_log.get(title)
+        if (policy == 'always' or record is None
+                or self._dztool.journal.get(title) is not None):
+            return None
 
-        self.printer.print('Shuffling')
-        shuffle(tracks)
-        tracks = tracks[:limit]
+        targets = self.get_playlists_by_titles(title)
+        if (len(targets) != 1
+                or str(targets[0]['id']) != record.get('target_id')):
+            return None
 
-        self.printer.print('Adding {0} tracks to playlist {1}'
-                           .format(len(tracks), title))
+        if policy == 'min_interval':
+            age = time.time() - record.get('generated', 0)
+            if age < min_interval:
+                return ('made {0:.0f}s ago, min_interval is {1:.0f}s'
+                        .format(age, min_interval))
+            return None
 
-        self._dztool.add_tracks_to_playlist(tracks, target_playlist_id)
+        if self.check_for_absence_of_playlists(source_pls):
+            return None
 
-        self.printer.print('Done')
+        fingerprint = self._get_fingerprint(
+            self.get_playlists_by_titles(source_pls), limit
+        )
+        if fingerprint is not None and fingerprint == record.get(
+                'fingerprint'):
+            return 'sources not changed since {0}'.format(
+                datetime.fromtimestamp(record['generated'])
+                .strftime('%H:%M %d.%m.%Y')
+            )
+        return None
+
+    def plan_shuffled_playlist(self, title: str, source_pls: List,
+                               limit: int, update_mode: str = 'reset',
+                               reset_policy: str = 'keep_id',
+                               sparse_fetch: bool = False,
+                               planned_sources: Dict[str, int] = None):
+        """Print requests make_shuffled_playlist() with same params
+        would send and time it would take, without any changes
+        in library. Return Dict with numbers of GET, POST and DELETE
+        requests, seconds and number of tracks it would add.
+
+        Numbers are taken from nb_tracks of playlists listing.
+        Duplicates of tracks and tracks kept by update_mode 'diff'
+        are not known before fetching, so numbers of added and
+        deleted tracks are the most they could be.
+
+        Keyword arguments:
+        planned_sources -- Dict of titles of playlists made by other
+            scenarios of same run to their number of tracks, such
+            sources are taken from memory and do not have to exist
+            in library yet (default None)
+        """
+        if update_mode not in ('reset', 'diff'):
+            raise DeezerPlaylistError(
+                'Unknown update mode "{0}", it can be either reset or diff'
+                .format(update_mode)
+            )
 
-        return self
+        planned_sources = {
+            source: nb_tracks
+            for source, nb_tracks in (planned_sources or {}).items()
+            if source in source_pls and source != title
+        }
+        library_sources = [source for source in source_pls
+                           if source not in planned_sources]
+        self.check_for_absence_of_playlists(library_sources, True)
+        playlists = self.get_playlists_by_titles(library_sources)
+
+        # steps are tuples of phase, action, Dict of numbers of requests
+        # and number of rounds of requests waiting for each other
+        steps = []
+
+        if planned_sources:
+            steps.append(('fetch', 'take {0} tracks of {1} playlists made'
+                          ' before from memory'
+                          .format(sum(planned_sources.values()),
+                                  len(planned_sources)),
+                          {'GET': 0}, 0))
+
+        nb_source_tracks = sum(int(pl['nb_tracks']) for pl in playlists)
+        fetch_cost = self._dztool.estimate_fetch_requests(playlists)
+        if limit is not None and sparse_fetch:
+            fetch_cost = min(fetch_cost, math.ceil(
+                self._dztool.estimate_sparse_requests(playlists, limit)
+            ))
+        steps.append(('fetch', 'fetch {0} tracks of {1} source playlists'
+                      .format(nb_source_tracks, len(playlists)),
+                      {'GET': fetch_cost}, self._get_rounds(fetch_cost)))
+
+        steps.append(self._plan_reset_step(title, update_mode, reset_policy))
+        steps.append(('reset', 'set description', {'POST': 1}, 1))
+
+        nb_source_tracks += sum(planned_sources.values())
+        nb_tracks = (nb_source_tracks if limit is None
+                     else min(limit, nb_source_tracks))
+        add_cost = self._dztool.estimate_add_requests(nb_tracks)
+        if update_mode == 'diff':
+            steps.append(('add', 'add up to {0} tracks and sort them'
+                          .format(nb_tracks), {'POST': add_cost + 1},
+                          add_cost + 1))
+        else:
+            steps.append(('add', 'add up to {0} tracks'.format(nb_tracks),
+                          {'POST': add_cost}, add_cost))
+
+        self.printer.print('Plan for playlist {0}:'.format(title))
+        totals = dict.fromkeys(('GET', 'POST', 'DELETE'), 0)
+        phase_rounds = dict.fromkeys(('reset', 'fetch', 'add'), 0)
+        for phase, action, requests, step_rounds in steps:
+            self.printer.print('  {0}: {1}'.format(action, ', '.join(
+                '{0} {1}'.format(count, method)
+                for method, count in requests.items()
+            )))
+            for method, count in requests.items():
+                totals[method] += count
+            phase_rounds[phase] += step_rounds
+
+        # reset and fetch run at the same time, add runs after them
+        totals['seconds'] = self._dztool.estimate_seconds(
+            max(phase_rounds['reset'], phase_rounds['fetch'])
+            + phase_rounds['add'],
+            totals['GET'] + totals['POST'] + totals['DELETE']
+        )
+        self.print_plan_totals(totals)
+        totals['tracks'] = nb_tracks
+        return totals
+
+    def print_plan_totals(self, totals: Dict):
+        """Print numbers of requests and seconds from plan Dict."""
+        self.printer.print(
+            'Requests: {GET} GET, {POST} POST, {DELETE} DELETE,'
+            ' about {seconds:.1f}s'.format(**totals)
+        )
 
     def get_playlists_by_titles(self, titles: Union[List, str]):
         """Get all playlists with title in list or same as string"""
@@ -83,9 +331,7 @@ class DeezerPlaylist(object):
         if isinstance(titles, str):
             titles = [titles]
 
-        playlists = [pl for pl in self._dztool.get_my_playlists()
-                     if pl['title'] in titles]
-        return playlists
+        return self._dztool.get_playlists_by_titles(titles)
 
     def check_for_absence_of_playlists(self, target_titles: List[str],
                                        raise_exception: bool = False):
@@ -97,10 +343,10 @@ class DeezerPlaylist(object):
         if isinstance(target_titles, str):
             target_titles = [target_titles]
 
-        all_titles = [pl['title'] for pl in self._dztool.get_my_playlists()]
-
+        found_titles = {pl['title'] for pl
+                        in self._dztool.get_playlists_by_titles(target_titles)}
         missing_titles = [title for title in target_titles
-                          if title not in all_titles]
+                          if title not in found_titles]
 
         if missing_titles and raise_exception:
             raise DeezerPlaylistError(
@@ -110,14 +356,24 @@ class DeezerPlaylist(object):
         else:
             return missing_titles
 
-    def reset_playlist_by_title(self, title: str):
+    def reset_playlist_by_title(self, title: str, purge: bool = True,
+                                policy: str = 'keep_id'):
         """Find playlist by title and remove all tracks from it.
 
         If there is several pl with title, it will remove them all
         and create one new.
         If there is no pl with title, it will create one.
+        If purge is False, tracks of single found pl are kept.
+        If policy is 'fastest', single pl is removed and created again
+        when it takes less requests than purge, but its id and
+        followers are lost. With 'keep_id' it is always purged.
         Return cleared or created playlists id
         """
+        if policy not in ('keep_id', 'fastest'):
+            raise DeezerPlaylistError(
+                'Unknown reset policy "{0}",'
+                ' it can be either keep_id or fastest'.format(policy)
+            )
 
         # find all playlists by title
         playlists = self.get_playlists_by_titles(title)
@@ -131,7 +387,13 @@ class DeezerPlaylist(object):
         # if there is only one, delete all tracks from it
         elif len(playlists) == 1:
             target_playlist_id = playlists[0]['id']
-            self._dztool.purge_playlist(target_playlist_id)
+            if purge and self._choose_reset_plan(playlists[0],
+                                                 policy) == 'recreate':
+                self._dztool.remove_playlist(target_playlist_id)
+                target_playlist_id = self._dztool.create_playlist(title)
+            elif purge:
+                self._dztool.purge_playlist(target_playlist_id,
+                                            self._print_purge_progress)
 
         # if there is no one, create new
         else:
@@ -139,6 +401,285 @@ class DeezerPlaylist(object):
 
         return target_playlist_id
 
+    def _reset_target(self, title: str, update_mode: str,
+                      reset_policy: str):
+        """Reset target playlist and mark it in description, return id."""
+        self.printer.print('Resetting playlist {0}'.format(title))
+
+        # reset playlist by title and get its id
+        target_playlist_id = self.reset_playlist_by_title(
+            title, purge=(update_mode == 'reset'), policy=reset_policy
+        )
+        self._dztool.set_playlist_desctiption(
+            target_playlist_id,
+            'Resetted '+datetime.today().strftime('%H:%M %d.%m.%Y')
+        )
+        return target_playlist_id
+
+    def _collect_source_tracks(self, playlists: List[Dict],
+                               limit: int = None,
+                               sparse_fetch: bool = False):
+        """Get unique ids of tracks from playlists, return array.
+
+        If limit is set, only random sample of limit unique ids
+        is kept while tracks are collected, see ReservoirSampler.
+        With sparse_fetch sample could be drawn from few pages,
+        see DeezerTool.sample_track_ids_from_playlists().
+        """
+        self.printer.print('Finding all tracks from playlists: '
+                           + ', '.join([pl['title'] for pl in playlists]))
+
+        if limit is not None and sparse_fetch:
+            full_cost = self._dztool.estimate_fetch_requests(playlists)
+            sparse_cost = self._dztool.estimate_sparse_requests(playlists,
+                                                                limit)
+            if sparse_cost < full_cost:
+                self.printer.print(
+                    'Fetching only pages with random tracks,'
+                    ' about {0:.0f} requests instead of {1}'
+                    .format(sparse_cost, full_cost)
+                )
+                tracks = self._dztool.sample_track_ids_from_playlists(
+                    playlists, limit
+                )
+                self.printer.print('Picked {0} random unique tracks'
+                                   .format(len(tracks)))
+                return tracks
+
+        if limit is not None:
+            sampler = ReservoirSampler(limit)
+            for pl, track_ids, seconds in (
+                self._dztool.iter_track_ids_from_playlists(playlists)
+            ):
+                self.printer.print('Got {0} tracks from {1} in {2:.2f}s'
+                                   .format(len(track_ids), pl['title'],
+                                           seconds))
+                sampler.extend(track_ids)
+
+            self.printer.print('Found {0} tracks, picked {1} random'
+                               ' unique ones'.format(sampler.count,
+                                                     len(sampler)))
+            return sampler.get_sample()
+
+        # ids are kept in compact array, set is only for duplicates check
+        tracks = array('q')
+        seen = set()
+        duplicates_count = 0
+        tracks_count = 0
+
+        # source playlists are fetched concurrently
+        # and merged in order they are ready
+        for pl, track_ids, seconds in (
+            self._dztool.iter_track_ids_from_playlists(playlists)
+        ):
+            self.printer.print('Got {0} tracks from {1} in {2:.2f}s'
+                               .format(len(track_ids), pl['title'], seconds))
+            for track_id in track_ids:
+                tracks_count += 1
+                if track_id not in seen:
+                    seen.add(track_id)
+                    tracks.append(track_id)
+                else:
+                    duplicates_count += 1
+
+        self.printer.print('Found {0} tracks'.format(tracks_count))
+
+        if duplicates_count > 0:
+            self.printer.print('Rid of {0} duplicates, {1} tracks left'
+                               .format(duplicates_count, len(tracks)))
+
+        return tracks
+
+    def _shuffle_tracks(self, tracks: array, limit: int):
+        """Shuffle ids in place and cut them to limit, return array."""
+        shuffle(tracks)
+        return tracks[:limit]
+
+    def _resume_shuffled_playlist(self, title: str, entry: Dict,
+                                  source_pls: List, limit: int):
+        """Continue interrupted make_shuffled_playlist() by its
+        journal entry, return False if it has to be started over.
+
+        If run stopped after tracks were picked, only tracks
+        not added yet are added, sources are not fetched again.
+        Batch could be applied by Deezer while run stopped before
+        it was journalled, so added tracks are counted by tracks
+        in target, as long as they match picked ones.
+        If it stopped before that or target was removed since then,
+        there is nothing to continue. If sources or limit changed
+        since then, or it can't be known, picked tracks are outdated.
+        """
+        if (entry.get('stage') != 'add'
+                or self._dztool.get_playlist_by_id(entry['target_id'])
+                is None):
+            self.printer.print('Previous run for playlist {0} stopped'
+                               ' before tracks were picked, starting over'
+                               .format(title))
+            return False
+
+        fingerprint = self._get_fingerprint(
+            self.get_playlists_by_titles(source_pls), limit
+        )
+        if fingerprint is None or fingerprint != entry.get('fingerprint'):
+            self.printer.print('Sources or limit of playlist {0} changed'
+                               ' since previous run, starting over'
+                               .format(title))
+            return False
+
+        tracks = array('q', entry['tracks'])
+        added = 0
+        if entry['update_mode'] != 'diff':
+            current = self._dztool.get_current_track_ids(entry['target_id'])
+            while (added < min(len(current), len(tracks))
+                   and current[added] == tracks[added]):
+                added += 1
+        self.printer.print('Resuming playlist {0}, {1} of {2} tracks'
+                           ' were added'.format(title, added, len(tracks)))
+        self._fill_target(title, entry['target_id'], tracks,
+                          entry['update_mode'], added)
+        self._finish_target(title, entry['target_id'], tracks,
+                            entry.get('fingerprint'))
+        self.printer.print('Done playlist {0}'.format(title))
+        return True
+
+    def _finish_target(self, title: str, target_playlist_id: int,
+                       tracks: array, fingerprint: str):
+        """Record that target playlist is done."""
+        # scenarios using this playlist as source take tracks from memory
+        self._dztool.set_shared_track_ids(target_playlist_id, tracks)
+        self._dztool.generation_log.save_generation(title, fingerprint,
+                                                    target_playlist_id)
+        self._dztool.journal.finish(title)
+
+    def _fill_target(self, title: str, target_playlist_id: int,
+                     tracks: array, update_mode: str, added: int = 0):
+        """Put shuffled tracks into target playlist.
+
+        Number of added tracks is recorded in journal after each batch.
+
+        Keyword arguments:
+        added -- number of first tracks already added by interrupted
+            run, with update_mode 'diff' it is ignored as only
+            difference is sent anyway (default 0)
+        """
+        if update_mode == 'diff':
+            self.printer.print('Updating playlist {0} with {1} tracks'
+                               .format(title, len(tracks)))
+            update_stats = self._dztool.update_playlist_tracks(
+                tracks, target_playlist_id, keep_order=True
+            )
+            self.printer.print('Removed {removed}, added {added} tracks'
+                               .format(**update_stats))
+        else:
+            def progress(batch_added: int, total: int, seconds: float):
+                self._dztool.journal.save_progress(title,
+                                                   added + batch_added)
+                self._print_add_progress(added + batch_added, len(tracks),
+                                         seconds)
+
+            self.printer.print('Adding {0} tracks to playlist {1}'
+                               .format(len(tracks) - added, title))
+            self._dztool.add_tracks_to_playlist(
+                tracks[added:], target_playlist_id, progress=progress
+            )
+
+    def _timed(self, phases: Dict, phase: str, func, *args):
+        """Call func with args, add its duration to phases, return result."""
+        started = time.monotonic()
+        try:
+            return func(*args)
+        finally:
+            phases[phase] += time.monotonic() - started
+
+    def _choose_reset_plan(self, playlist: Dict, policy: str):
+        """Choose how to clear playlist, return 'purge' or 'recreate'.
+
+        Cost of purge is estimated by nb_tracks from playlists listing,
+        removing and creating playlist costs 2 requests.
+        """
+        plan, cost = self._estimate_reset_plan(playlist, policy)
+        self.printer.print('Clearing playlist by {0}, about {1} requests'
+                           .format(plan, cost))
+        return plan
+
+    def _plan_reset_step(self, title: str, update_mode: str,
+                         reset_policy: str):
+        """Get step of plan for resetting target playlist, return tuple,
+        see plan_shuffled_playlist().
+        """
+        targets = self.get_playlists_by_titles(title)
+
+        if len(targets) > 1:
+            return ('reset', 'remove {0} playlists {1} and create new one'
+                    .format(len(targets), title),
+                    {'DELETE': len(targets), 'POST': 1}, len(targets) + 1)
+
+        if not targets:
+            return ('reset', 'create playlist {0}'.format(title),
+                    {'POST': 1}, 1)
+
+        nb_tracks = int(targets[0].get('nb_tracks', 0))
+        pages = max(-(-nb_tracks
+                      // self._dztool.api._limit_results_per_request), 1)
+        chanks = -(-nb_tracks // self._dztool._limit_items_delete)
+
+        if update_mode == 'diff':
+            # pages of target are requested one by one
+            return ('reset', 'fetch {0} tracks of playlist {1} and delete'
+                    ' up to all of them'.format(nb_tracks, title),
+                    {'GET': pages, 'DELETE': chanks},
+                    pages + self._get_rounds(chanks))
+
+        if self._estimate_reset_plan(targets[0],
+                                     reset_policy)[0] == 'recreate':
+            return ('reset', 'remove playlist {0} and create it again'
+                    .format(title), {'DELETE': 1, 'POST': 1}, 2)
+
+        return ('reset', 'purge {0} tracks of playlist {1}'
+                .format(nb_tracks, title),
+                {'GET': pages, 'DELETE': chanks},
+                self._get_rounds(pages) + self._get_rounds(chanks))
+
+    def _get_fingerprint(self, playlists: List[Dict], limit: int):
+        """Get hash of ids, checksums and nb_tracks of playlists
+        and limit, return str.
+
+        Return None if checksum of any playlist is unknown, for example
+        after it was changed by script, so it can't be compared.
+        """
+        if any(pl.get('checksum') is None for pl in playlists):
+            return None
+
+        state = sorted([str(pl['id']), str(pl['checksum']),
+                        int(pl.get('nb_tracks', 0))] for pl in playlists)
+        return hashlib.sha1(
+            json.dumps([state, limit]).encode()
+        ).hexdigest()
+
+    def _get_rounds(self, requests: int):
+        """Get number of rounds of concurrent requests, return int."""
+        return -(-requests // self._dztool.api.workers)
+
+    def _estimate_reset_plan(self, playlist: Dict, policy: str):
+        """Get cheapest plan allowed by policy and its cost in requests,
+        return tuple, see _choose_reset_plan().
+        """
+        recreate_cost = 2
+        purge_cost = self._dztool.estimate_purge_requests(
+            int(playlist.get('nb_tracks', 0))
+        )
+
+        if policy == 'fastest' and recreate_cost < purge_cost:
+            return 'recreate', recreate_cost
+        return 'purge', purge_cost
+
+    def _print_purge_progress(self, deleted: int, total: int):
+        self.printer.print('Removed {0} of {1} tracks'.format(deleted, total))
+
+    def _print_add_progress(self, added: int, total: int, seconds: float):
+        self.printer.print('Added {0} of {1} tracks in {2:.2f}s'
+                           .format(added, total, seconds))
+
 
 class DeezerPlaylistError(Exception):
     pass
@@ -1,5 +1,8 @@
+import functools
 import re
-from typing import Dict
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List
 from dztoolset.deezerplaylist import DeezerPlaylist
 
 
@@ -12,10 +15,22 @@ class DeezerScenario(object):
         self._scenario_handlers = {
             'shuffled': '_shuffled_scenario_handler'
         }
+        self._scenario_planners = {
+            'shuffled': '_plan_shuffled_scenario'
+        }
 
     def check_and_update_token(self):
         self._dzplaylist.check_and_update_token()
 
+    def disable_cache(self):
+        self._dzplaylist.disable_cache()
+
+    def refresh_playlists(self):
+        self._dzplaylist.refresh_playlists()
+
+    def enable_resume(self):
+        self._dzplaylist.enable_resume()
+
     def exec_scenario(self, scenario: str):
         """Execute scenrio from config by its name."""
         self._check_scenario_name_valid(scenario, True)
@@ -31,6 +46,97 @@ class DeezerScenario(object):
 
         getattr(self, handlerName)(scenario_cfg)
 
+    def exec_scenarios(self, scenarios: List[str], workers: int = None):
+        """Execute several scenarios from config by their names.
+
+        All scenarios are planned first, so error in config of any
+        of them stops run before any playlist is touched. Then each
+        distinct source playlist is fetched once and its tracks are
+        shared between scenarios.
+
+        Scenario could use target of other scenario as source,
+        then it is executed after that scenario and gets its tracks
+        from memory, see _get_dependencies(). Independent scenarios
+        are executed concurrently by workers threads. Failed scenario
+        does not stop others except ones depending on it,
+        DeezerScenarioError is raised after all of them.
+
+        Keyword arguments:
+        scenarios -- List of scenario names
+        workers -- max number of scenarios executed at once,
+            if None it is scenario_workers option from system
+            section (default None)
+        """
+        if workers is None:
+            workers = int(self.config.get('system', 'scenario_workers',
+                                          fallback='2'))
+
+        plans = [self._plan_scenario(scenario) for scenario in scenarios]
+
+        targets = {}
+        for plan in plans:
+            if plan['title'] in targets:
+                raise DeezerScenarioError(
+                    'Scenarios "{0}" and "{1}" have the same title "{2}"'
+                    .format(targets[plan['title']], plan['name'],
+                            plan['title'])
+                )
+            targets[plan['title']] = plan['name']
+
+        dependencies = self._get_dependencies(plans)
+
+        # sources changed by other scenarios are not worth prefetching,
+        # neither are sources of scenarios that are going to be skipped
+        self._dzplaylist.prefetch_playlists(list(dict.fromkeys(
+            source for plan in plans if plan['skip_reason']() is None
+            for source in plan['sources'] if source not in targets
+        )))
+
+        errors = self._run_plans(plans, dependencies, workers)
+
+        if errors:
+            raise DeezerScenarioError(
+                'Failed {0} of {1} scenarios: {2}'
+                .format(len(errors), len(plans), '; '.join(errors))
+            )
+
+        return self
+
+    def plan_scenarios(self, scenarios: List[str]):
+        """Print requests scenarios would send and time they would take
+        without changing anything in library, return Dict with totals.
+
+        Total time of several scenarios is sum of their times,
+        so it is the most they could take. Scenarios are planned
+        in order of their dependencies, and targets of planned ones
+        are passed as planned sources to scenarios using them,
+        see DeezerPlaylist.plan_shuffled_playlist().
+        """
+        plans = [self._plan_scenario(scenario) for scenario in scenarios]
+        dependencies = self._get_dependencies(plans)
+        plans_by_name = {plan['name']: plan for plan in plans}
+
+        totals = dict.fromkeys(('GET', 'POST', 'DELETE', 'seconds'), 0)
+        planned = {}
+        done = set()
+        while len(done) < len(plans):
+            for name in plans_by_name:
+                if name in done or not dependencies[name] <= done:
+                    continue
+                plan = plans_by_name[name]
+                estimate = plan['estimate'](planned_sources=planned)
+                for key in totals:
+                    totals[key] += estimate[key]
+                planned[plan['title']] = estimate['tracks']
+                done.add(name)
+
+        if len(plans) > 1:
+            self._dzplaylist.printer.print('All {0} scenarios:'
+                                           .format(len(plans)))
+            self._dzplaylist.print_plan_totals(totals)
+
+        return totals
+
     def get_list_of_scenarios(self):
         """Get list of scenarios names from config, return List of str"""
         scenarios = [key for key, val in self.config.get().items()
@@ -63,7 +169,139 @@ class DeezerScenario(object):
         if self._check_scenario_name_valid(scenario_name, True):
             return self.config.get(scenario_name)
 
+    def _plan_scenario(self, scenario: str):
+        """Check config of scenario by its name, return plan Dict.
+
+        Plan has scenario name, title of target playlist, List
+        of source titles, callable executing scenario, callable
+        printing and returning its estimate without executing it
+        and callable returning reason to skip scenario or None.
+        """
+        self._check_scenario_name_valid(scenario, True)
+        scenario_cfg = self.config.get(scenario)
+
+        try:
+            planner_name = self._scenario_planners[scenario_cfg['type']]
+        except KeyError:
+            raise DeezerScenarioError(
+                '"{0}" is not valid scenario type'
+                .format(scenario_cfg['type'])
+            )
+
+        return dict(getattr(self, planner_name)(scenario_cfg),
+                    name=scenario)
+
+    def _get_dependencies(self, plans: List[Dict]):
+        """Build graph of scenarios using targets of other scenarios
+        as sources, return Dict of scenario name to set of names
+        of scenarios it depends on.
+
+        Raise DeezerScenarioError if scenarios depend on each other
+        in cycle. Scenario using its own target as source does not
+        depend on itself, make_shuffled_playlist() waits for reset
+        of target and reads it after that, like it always did.
+        """
+        names_by_title = {plan['title']: plan['name'] for plan in plans}
+        dependencies = {
+            plan['name']: {names_by_title[source]
+                           for source in plan['sources']
+                           if source in names_by_title
+                           and source != plan['title']}
+            for plan in plans
+        }
+
+        # depth first search, path holds names of scenarios being visited
+        visited = set()
+
+        def visit(name: str, path: List[str]):
+            if name in path:
+                cycle = path[path.index(name):] + [name]
+                raise DeezerScenarioError(
+                    'Scenarios depend on each other: {0}'
+                    .format(' -> '.join(cycle))
+                )
+            if name in visited:
+                return
+            for dependency in sorted(dependencies[name]):
+                visit(dependency, path + [name])
+            visited.add(name)
+
+        for name in dependencies:
+            visit(name, [])
+
+        return dependencies
+
+    def _run_plans(self, plans: List[Dict], dependencies: Dict,
+                   workers: int):
+        """Execute plans in workers threads, each one as soon
+        as all plans it depends on are done, return List of errors.
+
+        Plans depending on failed ones are skipped.
+        """
+        plans_by_name = {plan['name']: plan for plan in plans}
+        waiting = {name: set(names) for name, names in dependencies.items()}
+        done = set()
+        failed = set()
+        errors = []
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            running = {}
+            while waiting or running:
+                for name in [name for name in plans_by_name
+                             if name in waiting and waiting[name] <= done]:
+                    del waiting[name]
+                    future = executor.submit(self._run_plan,
+                                             plans_by_name[name])
+                    running[future] = name
+
+                finished = wait(running, return_when=FIRST_COMPLETED).done
+                for future in finished:
+                    name = running.pop(future)
+                    error = future.result()
+                    if error is None:
+                        done.add(name)
+                    else:
+                        failed.add(name)
+                        errors.append(error)
+
+                # skipping is repeated for dependents of skipped ones
+                while True:
+                    skipped = [name for name in waiting
+                               if waiting[name] & failed]
+                    if not skipped:
+                        break
+                    for name in skipped:
+                        del waiting[name]
+                        errors.append('{0}: skipped after failure of {1}'
+                                      .format(name, ', '.join(
+                                          sorted(dependencies[name] & failed)
+                                      )))
+                    failed.update(skipped)
+
+        return errors
+
+    def _run_plan(self, plan: Dict):
+        """Execute planned scenario, return error message or None."""
+        started = time.monotonic()
+        try:
+            plan['run']()
+        except Exception as e:
+            self._dzplaylist.printer.print(
+                'Scenario {0} failed: {1}'.format(plan['name'], e)
+            )
+            return '{0}: {1}'.format(plan['name'], e)
+
+        self._dzplaylist.printer.print(
+            'Scenario {0} done in {1:.2f}s'
+            .format(plan['name'], time.monotonic() - started)
+        )
+        return None
+
     def _shuffled_scenario_handler(self, scenario_config: Dict):
+        self._plan_shuffled_scenario(scenario_config)['run']()
+        return self
+
+    def _plan_shuffled_scenario(self, scenario_config: Dict):
         if 'title' not in scenario_config or not scenario_config['title']:
             raise DeezerScenarioError('Scenario config section must'
                                       ' contain title option')
@@ -81,9 +319,46 @@ class DeezerScenario(object):
         else:
             limit = None
 
-        self._dzplaylist.make_shuffled_playlist(title, source_pls, limit)
+        update_mode = scenario_config.get('update', 'reset')
+        if update_mode not in ('reset', 'diff'):
+            raise DeezerScenarioError('Option update must be'
+                                      ' either reset or diff')
 
-        return self
+        reset_policy = scenario_config.get('reset_policy', 'keep_id')
+        if reset_policy not in ('keep_id', 'fastest'):
+            raise DeezerScenarioError('Option reset_policy must be'
+                                      ' either keep_id or fastest')
+
+        sparse_fetch = (scenario_config.get('sparse_fetch', 'no').lower()
+                        in ('yes', 'true', 'on', '1'))
+
+        regenerate = scenario_config.get('regenerate', 'always')
+        if regenerate not in ('always', 'on_change', 'min_interval'):
+            raise DeezerScenarioError('Option regenerate must be either'
+                                      ' always, on_change or min_interval')
+
+        min_interval = float(scenario_config.get('min_interval', '3600'))
+
+        args = (title, source_pls, limit, update_mode, reset_policy,
+                sparse_fetch)
+        skip_args = (title, source_pls, limit, regenerate, min_interval)
+        return {
+            'title': title,
+            'sources': source_pls,
+            'run': functools.partial(self._run_shuffled_scenario, args,
+                                     skip_args),
+            'estimate': functools.partial(
+                self._dzplaylist.plan_shuffled_playlist, *args
+            ),
+            'skip_reason': functools.partial(
+                self._dzplaylist.get_skip_reason, *skip_args
+            )
+        }
+
+    def _run_shuffled_scenario(self, args: tuple, skip_args: tuple):
+        """Make shuffled playlist unless regenerate policy skips it."""
+        if self._dzplaylist.is_regeneration_needed(*skip_args):
+            self._dzplaylist.make_shuffled_playlist(*args)
 
     def _check_scenario_name_valid(self, scenario_name: str,
                                    raise_exception: bool = False):
@@ -0,0 +1,123 @@
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class DeezerSession(object):
+    """Pooled keep-alive HTTP session shared by DeezerApi and DeezerAuth.
+
+    Connections are kept in pool and reused by next requests to the same
+    host, so there is no new TCP+TLS handshake on each page or chunk.
+    """
+
+    def __init__(self, pool_size: int = 10, keep_alive: bool = True,
+                 connect_timeout: float = 5, read_timeout: float = 30):
+        """Set up session and its connection pool.
+
+        Keyword arguments:
+        pool_size -- max number of connections kept alive per host
+            (default 10)
+        keep_alive -- if False, each connection is closed after response
+            (default True)
+        connect_timeout -- seconds to wait for connection (default 5)
+        read_timeout -- seconds to wait for response (default 30)
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self._adapter = _CountingAdapter(pool_connections=pool_size,
+                                         pool_maxsize=pool_size)
+        self._session = requests.Session()
+        self._session.mount('http://', self._adapter)
+        self._session.mount('https://', self._adapter)
+
+        if not keep_alive:
+            self._session.headers['Connection'] = 'close'
+
+    def get(self, url: str, params: Dict = None, headers: Dict = None):
+        """Send GET request, return response object from requests lib."""
+        return self.request('GET', url, params, headers)
+
+    def post(self, url: str, params: Dict = None):
+        """Send POST request, return response object from requests lib.
+
+        Params are sent as form data like requests.post does.
+        """
+        return self._session.request('POST', url, data=params,
+                                     timeout=self.timeout)
+
+    def delete(self, url: str, params: Dict = None):
+        """Send DELETE request, return response object from requests lib."""
+        return self.request('DELETE', url, params)
+
+    def request(self, method: str, url: str, params: Dict = None,
+                headers: Dict = None):
+        """Send request with params in query string."""
+        return self._session.request(method, url, params=params,
+                                     headers=headers, timeout=self.timeout)
+
+    def get_stats(self):
+        """Get counters of connections usage, return Dict with keys:
+            'requests' - number of sent requests
+            'new_connections' - number of opened connections
+            'reused_connections' - number of requests sent
+                through already opened connection
+        """
+        return self._adapter.get_stats()
+
+    def close(self):
+        """Close all pooled connections."""
+        self._session.close()
+
+
+class _CountingAdapter(HTTPAdapter):
+    """Transport adapter that counts sent requests and opened connections.
+
+    Connections are counted on actual socket connect, so connection
+    that was dropped by server and silently reopened by pool
+    is counted as new one.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._lock = threading.Lock()
+        self._requests_count = 0
+        self._connections_count = 0
+        super(_CountingAdapter, self).__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(_CountingAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: self._make_counting_pool_cls(pool_cls)
+            for scheme, pool_cls
+            in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def send(self, *args, **kwargs):
+        with self._lock:
+            self._requests_count += 1
+        return super(_CountingAdapter, self).send(*args, **kwargs)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'requests': self._requests_count,
+                'new_connections': self._connections_count,
+                'reused_connections': (self._requests_count
+                                       - self._connections_count)
+            }
+
+    def _count_connection(self):
+        with self._lock:
+            self._connections_count += 1
+
+    def _make_counting_pool_cls(self, pool_cls):
+        """Subclass urllib3 pool so its connections report on connect."""
+        adapter = self
+
+        class CountingConnection(pool_cls.ConnectionCls):
+            def connect(self):
+                adapter._count_connection()
+                return super(CountingConnection, self).connect()
+
+        return type(pool_cls.__name__, (pool_cls,),
+                    {'ConnectionCls': CountingConnection})
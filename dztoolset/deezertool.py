@@ -1,7 +1,26 @@
-from typing import List, Union
+import bisect
+import os
+import threading
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from random import randrange, shuffle
+from typing import Callable, Dict, List, Union
+from urllib.parse import quote
 
 from dztoolset.deezerauth import DeezerAuth
 from dztoolset.deezerapi import DeezerApi
+from dztoolset.deezersession import DeezerSession
+from dztoolset.ratelimiter import RateLimiter
+from dztoolset.retrypolicy import RetryPolicy
+from dztoolset.responsecache import ResponseCache
+from dztoolset.trackstore import TrackStore
+from dztoolset.tokencache import TokenCache
+from dztoolset.listingcache import ListingCache
+from dztoolset.generationlog import GenerationLog
+from dztoolset.journal import MutationJournal
+from dztoolset.track import Track
 
 
 class DeezerTool(object):
@@ -11,17 +30,35 @@ class DeezerTool(object):
 
     def __init__(self, config: 'DeezerConfig'):
         self._limit_items_delete = 500
+        self._limit_items_add = 500
+        self._limit_bytes_add = 4096
+        # only for estimates, real ids are sent as they are
+        self._expected_id_length = 10
+        self._expected_latency = 0.3
         self._myplaylists = None
+        self._playlists_index = None
+        self._listing_lock = threading.Lock()
+        self._shared_track_ids = None
 
         self.config = config
-        self.auth = DeezerAuth()
-        self.api = DeezerApi()
+        self.session = self._build_session()
+        self.token_cache = self._build_token_cache()
+        self.auth = DeezerAuth(self.session, self.token_cache)
+        self.api = DeezerApi(self.session, self._build_rate_limiter(),
+                             self._build_retry_policy(), self._build_cache())
         self.auth.set_params(self.config.get('system', 'port'),
                              self.config.get('auth', 'secret'),
                              self.config.get('auth', 'app_id'),
                              self.config.get('auth', 'token'),
                              self.config.get('system', 'browser'))
         self.api.token = config.get('auth', 'token')
+        self.api.token_refresher = self.refresh_token
+        self._token_lock = threading.Lock()
+        self.api.workers = int(config.get('system', 'workers', fallback='4'))
+        self.track_store = self._build_track_store()
+        self.listing_cache = self._build_listing_cache()
+        self.generation_log = self._build_generation_log()
+        self.journal = self._build_journal()
 
     @property
     def user(self):
@@ -34,22 +71,279 @@ class DeezerTool(object):
             self._update_token()
         return self
 
+    def disable_cache(self):
+        """Send all requests to Deezer ignoring cached responses."""
+        self.api.cache = None
+        self.track_store = None
+        self.listing_cache = None
+        return self
+
+    def share_track_ids(self, enabled: bool = True):
+        """Keep ids of fetched playlists in memory for this run.
+
+        While enabled, tracks of each playlist are fetched only once,
+        ids of playlists changed after that are dropped and fetched
+        again on next call. It is for several scenarios in one run
+        using same source playlists.
+        """
+        self._shared_track_ids = {} if enabled else None
+        return self
+
+    def set_shared_track_ids(self, playlist_id: Union[str, int],
+                             track_ids: List[int]):
+        """Share ids just written to playlist, so it is not fetched
+        again while share_track_ids() is enabled.
+
+        Ids must be exactly the tracks of playlist in their order.
+        """
+        if self._shared_track_ids is not None:
+            self._shared_track_ids[str(playlist_id)] = array('q', track_ids)
+        return self
+
     def get_my_playlists(self, forced: bool = False):
         """Request all playlists from Deezer and cache it.
 
         On next calls playlists will be returned from cache.
+        Between runs listing is kept in self.listing_cache.
         For forced request pass forced param.
         """
-        if forced or not self._myplaylists:
-            self._myplaylists = self.api.get_request('/user/me/playlists',
-                                                     'list')
+        playlists = None if forced else self.get_loaded_playlists()
+        if playlists is None:
+            if forced and self.api.cache is not None:
+                self.api.cache.invalidate(['/user/me/playlists'])
+            playlists = list(
+                self.api.iter_request('/user/me/playlists', parallel=True)
+            )
+            self.set_my_playlists(playlists)
+
+        return playlists
+
+    def get_loaded_playlists(self):
+        """Get listing of playlists without requests, return List or None.
+
+        It is listing loaded in this run or fresh one from
+        self.listing_cache, None means that it has to be requested.
+        """
+        if self._myplaylists:
+            return self._myplaylists
+
+        playlists = None
+        if self.listing_cache is not None:
+            playlists = self.listing_cache.get(self.api.token)
+        if playlists is not None:
+            self._myplaylists = playlists
+        return playlists
+
+    def set_my_playlists(self, playlists: List[Dict]):
+        """Use listing of playlists requested elsewhere, like by
+        AsyncDeezerTool, and keep it in self.listing_cache.
+        """
+        self._myplaylists = playlists
+        if self.listing_cache is not None:
+            self.listing_cache.save(self.api.token, playlists)
+        return self
+
+    def get_playlists_by_titles(self, titles: List[str]):
+        """Get playlists with any of titles from your library,
+        return List of Dicts.
+
+        Playlists are looked up in index built once for listing
+        from get_my_playlists().
+        """
+        index = self._get_playlists_index()['title']
+        playlists = []
+        for title in dict.fromkeys(titles):
+            playlists.extend(index.get(title, []))
+        return playlists
 
-        return self._myplaylists
+    def get_playlist_by_id(self, id: Union[str, int]):
+        """Get playlist from your library by id, return Dict or None."""
+        return self._get_playlists_index()['id'].get(str(id))
 
     def get_tracks_from_playlist(self, playlist_id: int):
+        """Request all tracks from playlist, return List of Dicts.
+
+        Pages of tracks are requested concurrently.
+        """
+        uri = '/playlist/{0}/tracks'.format(playlist_id)
+        return list(self.api.iter_request(uri, parallel=True))
+
+    def iter_tracks_from_playlist(self, playlist_id: int):
+        """Generator yields tracks from playlist page by page."""
+        uri = '/playlist/{0}/tracks'.format(playlist_id)
+        return self.api.iter_request(uri)
+
+    def iter_track_records(self, playlist_id: int):
+        """Generator yields tracks from playlist as Track records."""
+        uri = '/playlist/{0}/tracks'.format(playlist_id)
+        for track in self.api.iter_request(uri, parallel=True):
+            yield Track.from_dict(track)
+
+    def get_track_ids_from_playlist(self, playlist: Dict):
+        """Get ids of all tracks from playlist, return array of int.
+
+        Only ids are taken from each page of tracks, pages are dropped
+        right after that, and ids are packed in array('q'), 8 bytes
+        per id instead of whole track Dict.
+
+        If ids are shared by share_track_ids() or checksum of playlist
+        is the same as in local track store, they are taken without
+        requests to Deezer, else tracks are fetched and store is updated.
+        Cached responses of playlist are dropped before that, they could
+        be older than checksum and would be stored under it for good.
+
+        Keyword arguments:
+        playlist -- Dict from get_my_playlists() with id and checksum
+        """
+        checksum = playlist.get('checksum')
+        track_ids = self._get_stored_track_ids(playlist)
+        if track_ids is not None:
+            return track_ids
+
+        if self.track_store is not None and checksum is not None:
+            self._drop_cached_playlist(playlist['id'])
+
+        uri = '/playlist/{0}/tracks'.format(playlist['id'])
+        track_ids = array('q', (track['id'] for track
+                                in self.api.iter_request(uri, parallel=True)))
+
+        if self.track_store is not None and checksum is not None:
+            self.track_store.save(playlist['id'], checksum, track_ids)
+        if self._shared_track_ids is not None:
+            self._shared_track_ids[str(playlist['id'])] = track_ids
+
+        return track_ids
+
+    def get_current_track_ids(self, playlist_id: Union[str, int]):
+        """Request ids of tracks that are in playlist right now,
+        return array of int.
+
+        Cached responses, local track store and shared ids are
+        not used, they could miss changes made by interrupted run.
+        """
+        self._drop_cached_playlist(playlist_id)
         uri = '/playlist/{0}/tracks'.format(playlist_id)
-        tracks = self.api.get_request(uri, 'list')
-        return tracks
+        return array('q', (track['id'] for track
+                           in self.api.iter_request(uri, parallel=True)))
+
+    def iter_track_ids_from_playlists(self, playlists: List[Dict]):
+        """Generator yields ids of tracks of several playlists.
+
+        Playlists are fetched concurrently by self.api.workers threads,
+        for each of them tuple of playlist Dict, array of ids and
+        seconds spent on fetching is yielded as soon as it is ready.
+        """
+        def fetch(playlist: Dict):
+            started = time.monotonic()
+            track_ids = self.get_track_ids_from_playlist(playlist)
+            return playlist, track_ids, time.monotonic() - started
+
+        with ThreadPoolExecutor(max_workers=self.api.workers) as executor:
+            futures = [executor.submit(fetch, playlist)
+                       for playlist in playlists]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def estimate_fetch_requests(self, playlists: List[Dict]):
+        """Estimate requests to fetch all tracks of playlists, return int.
+
+        Playlists found in local track store cost nothing.
+        """
+        page_size = self.api._limit_results_per_request
+        requests = 0
+        for playlist in playlists:
+            if self._get_stored_track_ids(playlist) is None:
+                requests += max(-(-int(playlist['nb_tracks']) // page_size),
+                                1)
+        return requests
+
+    def estimate_sparse_requests(self, playlists: List[Dict], size: int):
+        """Estimate requests of sample_track_ids_from_playlists(),
+        return float.
+
+        It is expected number of distinct pages hit by size random
+        positions, pages of playlists from local track store are free.
+        """
+        page_size = self.api._limit_results_per_request
+        total = sum(int(playlist['nb_tracks']) for playlist in playlists)
+        if total == 0:
+            return 0
+
+        requests = 0
+        for playlist in playlists:
+            nb_tracks = int(playlist['nb_tracks'])
+            if (nb_tracks == 0
+                    or self._get_stored_track_ids(playlist) is not None):
+                continue
+            pages = -(-nb_tracks // page_size)
+            hits = size * nb_tracks / total
+            requests += pages * (1 - (1 - 1 / pages) ** hits)
+        return requests
+
+    def sample_track_ids_from_playlists(self, playlists: List[Dict],
+                                        size: int):
+        """Get random unique ids of tracks from playlists, return array.
+
+        Random positions of tracks are drawn across all playlists
+        by their nb_tracks, and only pages holding that positions
+        are requested. If some positions turn out to be duplicates
+        or missing, more positions are drawn until sample is full
+        or all positions are used. Track that is in several playlists
+        has proportionally more chances to be picked.
+        Cached pages of playlists not found in local track store
+        are dropped first, they could be older than nb_tracks.
+
+        Keyword arguments:
+        playlists -- List of Dicts from get_my_playlists() with nb_tracks
+        size -- number of ids to pick
+        """
+        page_size = self.api._limit_results_per_request
+        starts = []
+        total = 0
+        for playlist in playlists:
+            starts.append(total)
+            total += int(playlist['nb_tracks'])
+
+        pages = {}
+        for playlist in playlists:
+            track_ids = self._get_stored_track_ids(playlist)
+            if track_ids is None:
+                self._drop_cached_playlist(playlist['id'])
+                continue
+            for index in range(0, len(track_ids), page_size):
+                key = (playlist['id'], index)
+                pages[key] = track_ids[index:index+page_size]
+
+        picked = array('q')
+        seen = set()
+        used = set()
+
+        while len(picked) < size and len(used) < total:
+            positions = self._draw_positions(total, size - len(picked), used)
+            located = []
+            for position in positions:
+                n = bisect.bisect_right(starts, position) - 1
+                offset = position - starts[n]
+                index = offset - offset % page_size
+                located.append((playlists[n]['id'], index, offset - index))
+
+            missing = {(playlist_id, index)
+                       for playlist_id, index, i in located
+                       if (playlist_id, index) not in pages}
+            with ThreadPoolExecutor(max_workers=self.api.workers) as executor:
+                for key, track_ids in zip(
+                    missing, executor.map(self._get_page_of_track_ids,
+                                          missing)
+                ):
+                    pages[key] = track_ids
+
+            for playlist_id, index, i in located:
+                page = pages[(playlist_id, index)]
+                if i < len(page) and page[i] not in seen:
+                    seen.add(page[i])
+                    picked.append(page[i])
+
+        return picked
 
     def create_playlist(self, title: str):
         """Create playlist with title in your Deezer library.
@@ -58,6 +352,7 @@ class DeezerTool(object):
         uri = '/user/{0}/playlists'.format(self.user['id'])
         response = self.api.post_request(uri, 'single', {'title': title})
         new_playlist_id = response['id']
+        self.playlist_created(new_playlist_id, title)
         return new_playlist_id
 
     def remove_playlist(self, id: Union[str, int]):
@@ -67,40 +362,489 @@ class DeezerTool(object):
         """
         uri = '/playlist/{0}'.format(id)
         response = self.api.delete_request(uri, 'single')
+        self.playlist_removed(id)
         return response
 
-    def purge_playlist(self, id: Union[str, int]):
-        """Remove all tracks from playlist by id.
+    def purge_playlist(self, id: Union[str, int],
+                       progress: Callable[[int, int], None] = None):
+        """Remove all tracks from playlist by id, return number of them.
         It will not warning you or ask, so think carefully.
+
+        Ids are collected first, because deleting tracks while paging
+        by index would shift pages, then chunks of ids are deleted
+        concurrently, see _delete_tracks(). Cached responses are not
+        used for that, tracks missed in stale ones would be left.
+
+        Keyword arguments:
+        id -- id of playlist
+        progress -- callable receiving number of deleted tracks and
+            number of all tracks after each chunk (default None)
         """
-        uri = '/playlist/{0}/tracks'.format(id)
+        self._drop_cached_playlist(id)
         track_ids = [str(track['id']) for track
                      in self.get_tracks_from_playlist(id)]
+        self._delete_tracks(id, track_ids, progress)
+        self.playlist_tracks_changed(id, lambda nb_tracks: 0)
+        return len(track_ids)
+
+    def update_playlist_tracks(self, track_ids: List[int], playlist_id: int,
+                               keep_order: bool = False):
+        """Make playlist contain exactly tracks from track_ids, return Dict.
+
+        Only difference between current and desired tracks is sent:
+        tracks missing in track_ids are deleted, new ones are added.
+        Deezer deletes all copies of track at once, so track that is
+        in playlist several times is deleted and added again once.
+        Current tracks are always requested, not taken from cache.
+        Returned Dict has counts of 'removed' and 'added' tracks.
+
+        Keyword arguments:
+        track_ids -- ids of tracks that should be in playlist
+        playlist_id -- id of playlist to update
+        keep_order -- if True, after update tracks are sorted
+            in order of track_ids with one more request (default False)
+        """
+        uri = '/playlist/{0}/tracks'.format(playlist_id)
+        desired = [str(track_id) for track_id in track_ids]
+        self._drop_cached_playlist(playlist_id)
+        current = [str(track['id']) for track
+                   in self.iter_tracks_from_playlist(playlist_id)]
+
+        desired_set = set(desired)
+        counts = Counter(current)
+        duplicated = {track_id for track_id, count in counts.items()
+                      if count > 1}
+        to_remove = [track_id for track_id in counts
+                     if track_id not in desired_set
+                     or track_id in duplicated]
+        to_add = [track_id for track_id in desired
+                  if track_id not in counts or track_id in duplicated]
+        kept = [track_id for track_id in current
+                if track_id in desired_set and track_id not in duplicated]
+
+        self._delete_tracks(playlist_id, to_remove)
+
+        if to_add:
+            self.add_tracks_to_playlist(to_add, playlist_id)
+
+        if keep_order and desired != kept + to_add:
+            self.api.post_request(uri, 'single', {'order': ','.join(desired)})
+
+        self.playlist_tracks_changed(playlist_id,
+                                     lambda nb_tracks: len(desired))
+        return {'removed': sum(counts[track_id] for track_id in to_remove),
+                'added': len(to_add)}
+
+    def estimate_purge_requests(self, nb_tracks: int):
+        """Estimate number of requests to purge playlist, return int.
+
+        It is requests for all pages of tracks and for all chunks
+        of deleted ids.
+        """
+        pages = -(-nb_tracks // self.api._limit_results_per_request)
+        chanks = -(-nb_tracks // self._limit_items_delete)
+        return max(pages, 1) + chanks
+
+    def estimate_add_requests(self, nb_tracks: int):
+        """Estimate number of requests to add tracks, return int.
+
+        Batches are limited by count and by size of ids, ids are
+        expected to be self._expected_id_length digits long.
+        """
+        per_batch = min(self._limit_items_add,
+                        (self._limit_bytes_add + 3)
+                        // (self._expected_id_length + 3))
+        return -(-nb_tracks // per_batch)
+
+    def estimate_seconds(self, rounds: int, requests: int):
+        """Estimate wall clock time of requests, return float.
 
-        for chank in self._split_list_by_chanks(
-            track_ids, self._limit_items_delete
-        ):
-            self.api.delete_request(uri, 'single', {'songs': ','.join(chank)})
+        It is the longest of two bounds: rounds of requests waiting
+        for each other, each taking self._expected_latency seconds,
+        and time rate limiter holds requests after its bucket is empty.
 
-    def add_tracks_to_playlist(self, track_ids: List[int], playlist_id: int):
-        """Add tracks by ids to playlist, return bool."""
+        Keyword arguments:
+        rounds -- number of requests sent one after another
+        requests -- number of all requests
+        """
+        limiter = self.api.rate_limiter
+        throttled = max(requests - limiter.capacity, 0)
+        return max(rounds * self._expected_latency,
+                   throttled * limiter.period / limiter.capacity)
+
+    def add_tracks_to_playlist(
+        self, track_ids: List[int], playlist_id: int,
+        progress: Callable[[int, int, float], None] = None
+    ):
+        """Add tracks by ids to playlist, return bool.
+
+        Ids are sent by batches no longer than self._limit_items_add ids
+        and self._limit_bytes_add bytes of encoded songs param.
+        Deezer appends tracks in order of arrival, so batches are sent
+        one after another to keep order of track_ids.
+
+        Keyword arguments:
+        track_ids -- ids of tracks in order they should be added
+        playlist_id -- id of playlist
+        progress -- callable receiving number of added tracks,
+            number of all tracks and seconds spent on last batch
+            (default None)
+        """
         uri = '/playlist/{0}/tracks'.format(playlist_id)
         track_ids = [str(track_id) for track_id in track_ids]
-        response = self.api.post_request(
-            uri, 'single', {'songs': ','.join(track_ids)}
-        )
+        response = True
+        added = 0
+
+        for batch in self.iter_add_batches(track_ids):
+            started = time.monotonic()
+            response = self.api.post_request(
+                uri, 'single', {'songs': ','.join(batch)}
+            ) and response
+            added += len(batch)
+            if progress is not None:
+                progress(added, len(track_ids), time.monotonic() - started)
+
+        self.playlist_tracks_changed(playlist_id,
+                                     lambda nb_tracks: nb_tracks + added)
         return response
 
+    def iter_add_batches(self, track_ids: List[str]):
+        """Generator splits ids by batches to add in one request,
+        no longer than self._limit_items_add ids and
+        self._limit_bytes_add bytes of encoded songs param.
+        """
+        return self._split_ids_by_size(track_ids, self._limit_items_add,
+                                       self._limit_bytes_add)
+
+    def iter_delete_chanks(self, track_ids: List[str]):
+        """Generator splits ids by chunks to delete in one request,
+        no longer than self._limit_items_delete ids.
+        """
+        return self._split_list_by_chanks(track_ids,
+                                          self._limit_items_delete)
+
+    def playlist_created(self, playlist_id: Union[str, int], title: str):
+        """Add playlist created by request to loaded listing."""
+        self._edit_listing(lambda playlists: playlists + [
+            {'id': playlist_id, 'title': title, 'nb_tracks': 0}
+        ])
+        return self
+
+    def playlist_removed(self, playlist_id: Union[str, int]):
+        """Forget playlist removed by request in loaded listing,
+        local track store and shared ids.
+        """
+        self._edit_listing(lambda playlists: [
+            playlist for playlist in playlists
+            if str(playlist['id']) != str(playlist_id)
+        ])
+        if self.track_store is not None:
+            self.track_store.remove(playlist_id)
+        self._drop_shared_track_ids(playlist_id)
+        return self
+
+    def playlist_tracks_changed(self, playlist_id: Union[str, int],
+                                nb_tracks: Callable[[int], int]):
+        """Update nb_tracks of playlist in loaded listing after its
+        tracks were changed by request and drop its checksum and
+        shared ids, so its tracks will not be taken from local track
+        store or memory.
+
+        Keyword arguments:
+        playlist_id -- id of changed playlist
+        nb_tracks -- callable receiving old number of tracks
+            and returning new one
+        """
+        def edit(playlists: List[Dict]):
+            return [
+                dict(playlist, checksum=None,
+                     nb_tracks=nb_tracks(int(playlist.get('nb_tracks', 0))))
+                if str(playlist['id']) == str(playlist_id) else playlist
+                for playlist in playlists
+            ]
+
+        self._drop_shared_track_ids(playlist_id)
+        self._edit_listing(edit)
+        return self
+
+    def refresh_token(self, rejected_token: str):
+        """Get valid token after Deezer rejected one in api request.
+
+        Several requests could be rejected at once, so only first
+        of them checks token and authorizes again if needed.
+        """
+        with self._token_lock:
+            if self.api.token != rejected_token:
+                return
+
+            self.auth.token = self.api.token
+            if not self.auth.check_token(forced=True):
+                self._update_token()
+
     def set_playlist_desctiption(self, playlist_id: int, desctiption: str):
         """Set description to playlist with id from self.target_playlist_id"""
         uri = '/playlist/{0}'.format(playlist_id)
         self.api.post_request(uri, 'single', {'description': desctiption})
 
+    def get_connections_stats(self):
+        """Get counters of new and reused http connections, return Dict."""
+        return self.session.get_stats()
+
+    def get_retry_stats(self):
+        """Get counters of retried requests, return Dict."""
+        return self.api.retry_policy.get_stats()
+
+    def _build_session(self):
+        """Create pooled http session with params from system section."""
+        return DeezerSession(
+            pool_size=int(self.config.get('system', 'pool_size',
+                                          fallback='10')),
+            keep_alive=self.config.get_bool('system', 'keep_alive',
+                                            fallback=True),
+            connect_timeout=float(self.config.get('system', 'connect_timeout',
+                                                  fallback='5')),
+            read_timeout=float(self.config.get('system', 'read_timeout',
+                                               fallback='30'))
+        )
+
+    def _build_rate_limiter(self):
+        """Create limiter with quota of account from auth section."""
+        return RateLimiter(
+            requests=int(self.config.get('auth', 'rate_limit',
+                                         fallback='50')),
+            period=float(self.config.get('auth', 'rate_period',
+                                         fallback='5'))
+        )
+
+    def _build_retry_policy(self):
+        """Create retry policy with params from system section."""
+        return RetryPolicy(
+            max_attempts=int(self.config.get('system', 'retry_attempts',
+                                             fallback='4')),
+            backoff_base=float(self.config.get('system', 'retry_backoff',
+                                               fallback='0.5')),
+            backoff_cap=float(self.config.get('system', 'retry_backoff_cap',
+                                              fallback='8'))
+        )
+
+    def _build_cache(self):
+        """Create response cache in config dir, return None if disabled.
+
+        ttl option is list of endpoint patterns with ttl in seconds,
+        like '/user/me/playlists: 300, /playlist/*/tracks: 3600'
+        """
+        if not self.config.get_bool('cache', 'enabled', fallback=False):
+            return None
+
+        ttls = {}
+        for item in self.config.get('cache', 'ttl', fallback='').split(','):
+            if ':' in item:
+                pattern, ttl = item.rsplit(':', 1)
+                ttls[pattern.strip()] = float(ttl)
+
+        return ResponseCache(
+            os.path.join(os.path.dirname(self.config.path), 'cache'),
+            ttls,
+            int(float(self.config.get('cache', 'max_size',
+                                      fallback='50')) * 1024 * 1024)
+        )
+
+    def _build_listing_cache(self):
+        """Create listing cache in config dir, return None if disabled."""
+        if not self.config.get_bool('cache', 'enabled', fallback=False):
+            return None
+
+        return ListingCache(
+            os.path.join(os.path.dirname(self.config.path),
+                         'playlists.json'),
+            float(self.config.get('cache', 'playlists_ttl', fallback='300'))
+        )
+
+    def _build_generation_log(self):
+        """Create record of generated playlists in config dir."""
+        return GenerationLog(os.path.join(os.path.dirname(self.config.path),
+                                          'generations.json'))
+
+    def _build_journal(self):
+        """Create journal of playlists in progress in config dir."""
+        return MutationJournal(os.path.join(os.path.dirname(self.config.path),
+                                            'journal'))
+
+    def _edit_listing(self, edit: Callable[[List[Dict]], List[Dict]]):
+        """Change loaded listing of playlists after it was changed
+        by request, instead of fetching it again.
+
+        Keyword arguments:
+        edit -- callable receiving copy of listing and returning new one
+        """
+        with self._listing_lock:
+            playlists = self._myplaylists
+            if playlists is None and self.listing_cache is not None:
+                playlists = self.listing_cache.get(self.api.token)
+            if playlists is None:
+                return
+
+            self._myplaylists = edit(list(playlists))
+            if self.listing_cache is not None:
+                self.listing_cache.save(self.api.token, self._myplaylists,
+                                        keep_age=True)
+
+    def _drop_cached_playlist(self, playlist_id: Union[str, int]):
+        """Remove cached responses of playlist and its tracks."""
+        if self.api.cache is not None:
+            self.api.cache.invalidate(['/playlist/{0}'.format(playlist_id)])
+
+    def _drop_shared_track_ids(self, playlist_id: Union[str, int]):
+        """Forget shared ids of playlist after it was changed."""
+        if self._shared_track_ids is not None:
+            self._shared_track_ids.pop(str(playlist_id), None)
+
+    def _build_track_store(self):
+        """Create local track store in config dir, return None if disabled."""
+        if not self.config.get_bool('cache', 'track_store', fallback=False):
+            return None
+
+        return TrackStore(os.path.join(os.path.dirname(self.config.path),
+                                       'tracks.db'))
+
+    def _delete_tracks(self, playlist_id: Union[str, int],
+                       track_ids: List[str],
+                       progress: Callable[[int, int], None] = None):
+        """Delete tracks from playlist by chunks in self.api.workers threads.
+
+        Requests still pass rate limiter of api, so concurrency
+        only hides round trip time. Every chunk is tried even if
+        some of them failed, then DeezerToolError is raised
+        with number of tracks left in playlist.
+        """
+        uri = '/playlist/{0}/tracks'.format(playlist_id)
+        chanks = list(self.iter_delete_chanks(track_ids))
+        if not chanks:
+            return
+
+        deleted = 0
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.api.workers) as executor:
+            futures = {
+                executor.submit(self.api.delete_request, uri, 'single',
+                                {'songs': ','.join(chank)}): chank
+                for chank in chanks
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append((futures[future], e))
+                    continue
+                deleted += len(futures[future])
+                if progress is not None:
+                    progress(deleted, len(track_ids))
+
+        if errors:
+            raise DeezerToolError(
+                'Failed to delete {0} of {1} tracks from playlist {2}: {3}'
+                .format(len(track_ids) - deleted, len(track_ids),
+                        playlist_id, errors[0][1])
+            )
+
+    def _get_playlists_index(self):
+        """Get index of playlists by title and by id, return Dict.
+
+        Index is built again only when listing of playlists
+        was fetched again, for example after create or remove.
+        """
+        playlists = self.get_my_playlists()
+        index = self._playlists_index
+        if index is not None and index['source'] is playlists:
+            return index
+
+        index = {'source': playlists, 'title': {}, 'id': {}}
+        for playlist in playlists:
+            index['title'].setdefault(playlist['title'], []).append(playlist)
+            index['id'][str(playlist['id'])] = playlist
+
+        self._playlists_index = index
+        return index
+
+    def _get_stored_track_ids(self, playlist: Dict):
+        """Get ids of playlist shared in this run or from local track
+        store if they are up to date with checksum of playlist,
+        return array or None.
+        """
+        if self._shared_track_ids is not None:
+            track_ids = self._shared_track_ids.get(str(playlist['id']))
+            if track_ids is not None:
+                return track_ids
+
+        checksum = playlist.get('checksum')
+        if self.track_store is None or checksum is None:
+            return None
+
+        return self.track_store.get_track_ids(playlist['id'], checksum)
+
+    def _get_page_of_track_ids(self, key: tuple):
+        """Request one page of tracks by playlist id and index of page,
+        return array of ids.
+        """
+        playlist_id, index = key
+        uri = '/playlist/{0}/tracks'.format(playlist_id)
+        page = self.api.get_request(uri, 'single', {'index': index})
+        return array('q', (track['id'] for track in page.get('data', [])))
+
+    def _draw_positions(self, total: int, count: int, used: set):
+        """Draw count random positions below total that are not in used,
+        add them to used, return List of int.
+        """
+        if total - len(used) <= count:
+            positions = [position for position in range(total)
+                         if position not in used]
+            shuffle(positions)
+        else:
+            positions = []
+            while len(positions) < count:
+                position = randrange(total)
+                if position not in used:
+                    used.add(position)
+                    positions.append(position)
+
+        used.update(positions)
+        return positions
+
     def _split_list_by_chanks(self, items_list: List, chank_size: int):
         """Generator splits list by chnks of chank_size elements."""
         for i in range(0, len(items_list), chank_size):
             yield items_list[i:i+chank_size]
 
+    def _split_ids_by_size(self, ids: List[str], max_count: int,
+                           max_bytes: int):
+        """Generator splits ids by batches limited by count and by size
+        of their comma separated list after url encoding.
+        """
+        batch = []
+        size = 0
+        for item in ids:
+            # encoded comma before every id except first one
+            item_size = len(quote(item)) + (3 if batch else 0)
+            if batch and (len(batch) >= max_count
+                          or size + item_size > max_bytes):
+                yield batch
+                batch = []
+                item_size = len(quote(item))
+                size = 0
+            batch.append(item)
+            size += item_size
+
+        if batch:
+            yield batch
+
+    def _build_token_cache(self):
+        """Create record of token checks in config dir."""
+        return TokenCache(
+            os.path.join(os.path.dirname(self.config.path), 'token.json'),
+            float(self.config.get('auth', 'token_check_interval',
+                                  fallback='3600'))
+        )
+
     def _update_token(self):
         """Authorize in Deezer and write new token in config file."""
         self.auth.authorize()
@@ -63,6 +63,14 @@ def build_cli_parser():
         help='name or number of scenario. Pass -l argument to see full list'
     )
 
+    parser.add_argument(
+        '-a', '--all',
+        action='store_const',
+        const=True,
+        help='create playlists from all scenarios, each source playlist'
+             ' is requested only once'
+    )
+
     parser.add_argument(
         '-l', '--list',
         action='store_const',
@@ -85,6 +93,14 @@ def build_cli_parser():
         help='show info about selected scenario but not do anithing'
     )
 
+    parser.add_argument(
+        '-p', '--plan',
+        action='store_const',
+        const=True,
+        help='show requests and time selected scenario would take'
+             ' but not change anything'
+    )
+
     parser.add_argument(
         '-e', '--edit',
         action='store_const',
@@ -100,6 +116,29 @@ def build_cli_parser():
         help=('edit config with passed program instead of editor from config')
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_const',
+        const=True,
+        help=('request everything from Deezer ignoring cached responses')
+    )
+
+    parser.add_argument(
+        '-r', '--refresh',
+        action='store_const',
+        const=True,
+        help=('request list of your playlists from Deezer instead of'
+              ' using saved one')
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_const',
+        const=True,
+        help=('continue interrupted run adding tracks it picked'
+              ' instead of starting over')
+    )
+
     parser.add_argument(
         '-d', '--debug',
         action='store_const',
@@ -138,7 +177,11 @@ def print_list_scenarios(dz: DeezerScenario, verbosity: bool = False):
 
 
 def process_cli_scenario_call(scenario_input: str, dz: DeezerScenario,
-                              info_flag: bool = False):
+                              info_flag: bool = False,
+                              no_cache_flag: bool = False,
+                              refresh_flag: bool = False,
+                              plan_flag: bool = False,
+                              resume_flag: bool = False):
     if scenario_input.isnumeric():
         scenario_index = int(scenario_input)
         scenario_name = dz.get_scenario_name_by_index(scenario_index)
@@ -152,8 +195,44 @@ def process_cli_scenario_call(scenario_input: str, dz: DeezerScenario,
             dz.get_scenario_config(scenario_name)
         )
     else:
+        if no_cache_flag:
+            dz.disable_cache()
         dz.check_and_update_token()
-        dz.exec_scenario(scenario_name)
+        if refresh_flag:
+            dz.refresh_playlists()
+        if resume_flag:
+            dz.enable_resume()
+        if plan_flag:
+            dz.plan_scenarios([scenario_name])
+        else:
+            dz.exec_scenario(scenario_name)
+
+
+def process_cli_all_scenarios_call(dz: DeezerScenario,
+                                   info_flag: bool = False,
+                                   no_cache_flag: bool = False,
+                                   refresh_flag: bool = False,
+                                   plan_flag: bool = False,
+                                   resume_flag: bool = False):
+    scenarios = dz.get_list_of_scenarios()
+
+    if info_flag:
+        for i in range(len(scenarios)):
+            print_info_about_scenario(
+                i, scenarios[i], dz.get_scenario_config(scenarios[i])
+            )
+    else:
+        if no_cache_flag:
+            dz.disable_cache()
+        dz.check_and_update_token()
+        if refresh_flag:
+            dz.refresh_playlists()
+        if resume_flag:
+            dz.enable_resume()
+        if plan_flag:
+            dz.plan_scenarios(scenarios)
+        else:
+            dz.exec_scenarios(scenarios)
 
 
 def edit_config(config: DeezerConfig, editor=None):
@@ -183,7 +262,7 @@ def main(custom_args=None, config_path=CONFIG_PATH):
             edit_config(config, args.editor)
             sys.exit()
 
-        if not args.scenario and not args.list:
+        if not args.scenario and not args.list and not args.all:
             print_help_and_exit(parser)
 
         dz = DeezerScenario(config)
@@ -193,7 +272,15 @@ def main(custom_args=None, config_path=CONFIG_PATH):
             sys.exit()
 
         if args.scenario:
-            process_cli_scenario_call(args.scenario, dz, args.info)
+            process_cli_scenario_call(args.scenario, dz, args.info,
+                                      args.no_cache, args.refresh,
+                                      args.plan, args.resume)
+            sys.exit()
+
+        if args.all:
+            process_cli_all_scenarios_call(dz, args.info, args.no_cache,
+                                           args.refresh, args.plan,
+                                           args.resume)
             sys.exit()
 
     except DeezerApiRequestError as e:
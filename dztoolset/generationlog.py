@@ -0,0 +1,67 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Union
+
+from dztoolset.jsonfile import write_json
+
+
+class GenerationLog(object):
+    """Persistent record of last generation of shuffled playlists.
+
+    For each title of target playlist it keeps fingerprint of sources
+    it was generated from, id of target, time of generation
+    and last decision whether playlist was generated or skipped.
+    """
+
+    def __init__(self, path: str):
+        """Keyword arguments:
+        path -- path to json file, it will be created on first save
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def get(self, title: str):
+        """Get record of playlist by title, return Dict or None."""
+        return self._load().get(title)
+
+    def save_generation(self, title: str, fingerprint: str,
+                        target_id: Union[str, int]):
+        """Remember that playlist was generated from sources
+        with fingerprint, fingerprint could be None if it is unknown.
+        """
+        self._update(title, {
+            'fingerprint': fingerprint,
+            'target_id': str(target_id),
+            'generated': time.time(),
+            'decision': 'generated',
+            'decided': time.time()
+        })
+
+    def save_decision(self, title: str, decision: str):
+        """Remember decision about playlist, like reason to skip it."""
+        self._update(title, {'decision': decision, 'decided': time.time()})
+
+    def clear(self):
+        """Forget all records."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _load(self):
+        try:
+            with open(self.path) as log_file:
+                return json.load(log_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _update(self, title: str, fields: Dict):
+        """Update record of playlist, records of others are kept,
+        so scenarios running at the same time do not lose them.
+        """
+        with self._lock:
+            data = self._load()
+            data[title] = dict(data.get(title, {}), **fields)
+            write_json(self.path, data)
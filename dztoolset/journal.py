@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Union
+
+from dztoolset.jsonfile import write_json
+
+
+class MutationJournal(object):
+    """Persistent journal of changes of shuffled playlists in progress.
+
+    Each target playlist has its own entry in separate file in journal
+    dir. Entry is started before target is reset, then it gets id
+    of target and planned list of tracks, and number of added tracks
+    after each batch. Entry is removed when playlist is done,
+    so entry left after run means that run was interrupted.
+    """
+
+    def __init__(self, path: str):
+        """Keyword arguments:
+        path -- journal directory, it will be created on first write
+        """
+        self.path = path
+
+    def get(self, title: str):
+        """Get entry of unfinished playlist by title, return Dict or None.
+
+        Entry has stage 'reset' while target is reset and sources
+        are fetched, then stage 'add' with target_id, tracks,
+        update_mode, fingerprint and number of added tracks.
+        """
+        try:
+            with open(self._get_filename(title)) as entry_file:
+                return json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+    def start(self, title: str):
+        """Start new entry of playlist, replacing unfinished one."""
+        self._write(title, {'title': title, 'stage': 'reset',
+                            'started': time.time()})
+
+    def save_plan(self, title: str, target_id: Union[str, int],
+                  tracks: List[int], update_mode: str,
+                  fingerprint: str = None):
+        """Record that target is reset and tracks are picked."""
+        entry = self.get(title) or {'title': title, 'started': time.time()}
+        entry.update({
+            'stage': 'add',
+            'target_id': str(target_id),
+            'tracks': list(tracks),
+            'update_mode': update_mode,
+            'fingerprint': fingerprint,
+            'added': 0
+        })
+        self._write(title, entry)
+
+    def save_progress(self, title: str, added: int):
+        """Record number of tracks from plan already added to target."""
+        entry = self.get(title)
+        if entry is not None:
+            entry['added'] = added
+            self._write(title, entry)
+
+    def finish(self, title: str):
+        """Remove entry of playlist after it is done."""
+        try:
+            os.remove(self._get_filename(title))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove all entries."""
+        if os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
+
+    def _get_filename(self, title: str):
+        digest = hashlib.sha1(title.encode()).hexdigest()
+        return os.path.join(self.path, '{0}.json'.format(digest))
+
+    def _write(self, title: str, entry: Dict):
+        """Write entry atomically, so interrupted write keeps old one."""
+        write_json(self._get_filename(title), entry)
@@ -0,0 +1,30 @@
+import json
+import os
+import threading
+
+
+def write_json(path: str, data):
+    """Write data as json file atomically, so readers never see half
+    of it and interrupted write keeps previous file.
+
+    Data is written to temporary file unique for process and thread,
+    then it replaces file at path. Directory of path is created
+    if it does not exist.
+
+    Keyword arguments:
+    path -- path to json file
+    data -- data serializable to json
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = '{0}.{1}.{2}.tmp'.format(path, os.getpid(),
+                                        threading.get_ident())
+    try:
+        with open(tmp_path, 'w') as json_file:
+            json.dump(data, json_file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List
+
+from dztoolset.jsonfile import write_json
+
+
+class ListingCache(object):
+    """Persistent copy of listing of playlists from your library.
+
+    Listing lives for ttl seconds and belongs to token it was
+    fetched with, so listing of other account is never used.
+    DeezerTool updates it when it creates, removes or changes
+    playlists, so it stays correct between runs.
+    """
+
+    def __init__(self, path: str, ttl: float = 300):
+        """Keyword arguments:
+        path -- path to json file, it will be created on first save
+        ttl -- seconds while listing is used without new request,
+            0 means it is never used (default 300)
+        """
+        self.path = path
+        self.ttl = ttl
+
+    def get(self, token: str):
+        """Get saved listing, return List of Dicts.
+
+        Return None if there is no listing for token or it is too old.
+        """
+        if self.ttl <= 0:
+            return None
+
+        try:
+            with open(self.path) as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        if (data.get('token_hash') != self._hash(token)
+                or time.time() - data.get('stored', 0) >= self.ttl):
+            return None
+
+        return data.get('playlists')
+
+    def save(self, token: str, playlists: List[Dict],
+             keep_age: bool = False):
+        """Save listing fetched with token.
+
+        Keyword arguments:
+        token -- auth token listing belongs to
+        playlists -- List of playlist Dicts
+        keep_age -- if True, listing is updated in place and keeps
+            time it was fetched, so it is not prolonged (default False)
+        """
+        stored = time.time()
+        if keep_age:
+            try:
+                with open(self.path) as cache_file:
+                    stored = json.load(cache_file).get('stored', stored)
+            except (OSError, ValueError):
+                pass
+
+        data = {
+            'token_hash': self._hash(token),
+            'playlists': playlists,
+            'stored': stored
+        }
+        write_json(self.path, data)
+
+    def clear(self):
+        """Remove saved listing."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _hash(self, token: str):
+        return hashlib.sha256(token.encode()).hexdigest()
@@ -0,0 +1,54 @@
+import threading
+import time
+
+
+class RateLimiter(object):
+    """Thread-safe token bucket limiting rate of requests.
+
+    Bucket holds up to `requests` tokens and refills continuously,
+    so no more than `requests` requests are sent per `period` seconds.
+    Each request takes one token, if bucket is empty caller
+    waits until token appears.
+    """
+
+    def __init__(self, requests: int = 50, period: float = 5):
+        """Keyword arguments:
+        requests -- number of requests allowed per period (default 50)
+        period -- length of period in seconds (default 5)
+        """
+        self.capacity = requests
+        self.period = period
+        self._rate = requests / period
+        self._tokens = float(requests)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self):
+        """Take one token, wait for it if bucket is empty."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self._rate
+                self.waited += delay
+
+            time.sleep(delay)
+
+    def drain(self):
+        """Empty bucket so next token appears only after whole period.
+
+        Use it when server answered that quota is exceeded anyway.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = 1 - self.capacity
+
+    def _refill(self):
+        """Add tokens for time passed since last refill."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity,
+                           self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
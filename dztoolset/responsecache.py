@@ -0,0 +1,192 @@
+import fnmatch
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List
+from urllib.parse import quote, urlsplit, parse_qsl, urlencode
+
+from dztoolset.jsonfile import write_json
+
+
+class ResponseCache(object):
+    """Persistent cache of GET responses from Deezer api.
+
+    Each response stored in separate file in cache dir, keyed by path
+    and params of request except access_token. Answers of /user/me
+    endpoints depend on account, so their keys have hash of token
+    instead, like in ListingCache. Entry lives for ttl
+    of its endpoint, after that it is revalidated with ETag or
+    Last-Modified if server sent them. Least recently used entries
+    are evicted when size of cache exceeds max_size.
+    """
+
+    def __init__(self, path: str, ttls: Dict[str, float],
+                 max_size: int = 50 * 1024 * 1024):
+        """Keyword arguments:
+        path -- cache directory, it will be created on first write
+        ttls -- Dict of endpoint path pattern to ttl in seconds,
+            patterns are fnmatch ones, like '/playlist/*/tracks',
+            responses of endpoints without pattern are not cached
+        max_size -- max size of all entries in bytes (default 50 Mb)
+        """
+        self.path = path
+        self.ttls = ttls
+        self.max_size = max_size
+
+    def get(self, url: str, params: Dict = None):
+        """Get cached entry of request, return CacheEntry or None.
+
+        Returned entry could be stale, check it with is_fresh().
+        """
+        path, key = self._make_key(url, params)
+        ttl = self._get_ttl(path)
+        if ttl is None:
+            return None
+
+        filename = self._get_filename(path, key)
+        try:
+            with open(filename) as entry_file:
+                data = json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+        return CacheEntry(filename, data, ttl)
+
+    def store(self, url: str, params: Dict, response):
+        """Store response of request if its endpoint is cacheable.
+
+        Keyword arguments:
+        url -- full url of request
+        params -- Dict with parameters of request or None
+        response -- response object from requests lib
+        """
+        path, key = self._make_key(url, params)
+        if self._get_ttl(path) is None:
+            return
+
+        data = {
+            'key': key,
+            'text': response.text,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'stored': time.time()
+        }
+
+        write_json(self._get_filename(path, key), data)
+        self._evict()
+
+    def revalidated(self, entry: 'CacheEntry'):
+        """Mark stale entry as fresh after server answered not modified."""
+        entry.data['stored'] = time.time()
+        write_json(entry.filename, entry.data)
+
+    def invalidate(self, paths: List[str]):
+        """Remove entries of endpoints with paths and paths under them.
+
+        For example '/playlist/5' removes '/playlist/5/tracks' too.
+        """
+        if not os.path.isdir(self.path):
+            return
+
+        prefixes = []
+        for path in paths:
+            prefixes.append(quote(path, safe='') + '__')
+            prefixes.append(quote(path + '/', safe=''))
+
+        for name in os.listdir(self.path):
+            if name.startswith(tuple(prefixes)):
+                self._remove(os.path.join(self.path, name))
+
+    def clear(self):
+        """Remove all entries."""
+        if os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                self._remove(os.path.join(self.path, name))
+
+    def _make_key(self, url: str, params: Dict = None):
+        """Get endpoint path and key of request, return tuple."""
+        parts = urlsplit(url)
+        all_params = dict(parse_qsl(parts.query))
+        all_params.update(params or {})
+        token = all_params.pop('access_token', None)
+        if parts.path == '/user/me' or parts.path.startswith('/user/me/'):
+            all_params['@token'] = hashlib.sha256(
+                str(token).encode()
+            ).hexdigest()
+        key = parts.path + '?' + urlencode(sorted(
+            (str(k), str(v)) for k, v in all_params.items()
+        ))
+        return parts.path, key
+
+    def _get_ttl(self, path: str):
+        """Get ttl of endpoint, return float or None if not cacheable."""
+        for pattern, ttl in self.ttls.items():
+            if fnmatch.fnmatchcase(path, pattern):
+                return ttl
+        return None
+
+    def _get_filename(self, path: str, key: str):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.path,
+                            '{0}__{1}.json'.format(quote(path, safe=''),
+                                                   digest))
+
+    def _evict(self):
+        """Remove least recently used entries until cache fits max_size."""
+        entries = []
+        for name in os.listdir(self.path):
+            filename = os.path.join(self.path, name)
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filename))
+
+        size = sum(entry[1] for entry in entries)
+        for mtime, entry_size, filename in sorted(entries):
+            if size <= self.max_size:
+                break
+            self._remove(filename)
+            size -= entry_size
+
+    def _remove(self, filename: str):
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+
+class CacheEntry(object):
+    """Cached response, it looks like response object from requests lib."""
+
+    status_code = 200
+
+    def __init__(self, filename: str, data: Dict, ttl: float):
+        self.filename = filename
+        self.data = data
+        self.ttl = ttl
+
+    @property
+    def text(self):
+        return self.data['text']
+
+    def is_fresh(self):
+        """Check if entry is younger than ttl, return bool."""
+        return time.time() - self.data['stored'] < self.ttl
+
+    def get_validators(self):
+        """Get headers for conditional request, return Dict."""
+        headers = {}
+        if self.data.get('etag'):
+            headers['If-None-Match'] = self.data['etag']
+        if self.data.get('last_modified'):
+            headers['If-Modified-Since'] = self.data['last_modified']
+        return headers
+
+    def touch(self):
+        """Mark entry as recently used for LRU eviction."""
+        try:
+            os.utime(self.filename)
+        except OSError:
+            pass
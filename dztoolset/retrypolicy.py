@@ -0,0 +1,80 @@
+import random
+import threading
+import time
+
+import requests
+
+
+class RetryPolicy(object):
+    """Decide if failed request should be sent again and how long to wait.
+
+    Delay grows exponentially with each attempt up to cap, and real delay
+    is random value between zero and it (full jitter), so concurrent
+    workers do not retry at the same moment.
+
+    Only idempotent methods are retried after any transient failure.
+    Other methods, like POST that adds tracks, are retried only if
+    request surely did not reach server, so tracks are not added twice.
+    """
+
+    def __init__(self, max_attempts: int = 4, backoff_base: float = 0.5,
+                 backoff_cap: float = 8,
+                 idempotent_methods=('get', 'delete')):
+        """Keyword arguments:
+        max_attempts -- max number of attempts to send request,
+            including first one (default 4)
+        backoff_base -- delay before second attempt in seconds (default 0.5)
+        backoff_cap -- max delay between attempts in seconds (default 8)
+        idempotent_methods -- methods safe to repeat after any failure
+            (default ('get', 'delete'))
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.idempotent_methods = idempotent_methods
+        self._lock = threading.Lock()
+        self._stats = {'retries': 0, 'gave_up': 0}
+
+    def should_retry(self, method: str, attempt: int, error: Exception):
+        """Check if request should be sent again, return bool.
+
+        Keyword arguments:
+        method -- http method of failed request, like 'get'
+        attempt -- number of attempts already made
+        error -- exception request failed with
+        """
+        if attempt >= self.max_attempts or not self._is_safe(method, error):
+            self._count('gave_up')
+            return False
+
+        self._count('retries')
+        return True
+
+    def get_delay(self, attempt: int):
+        """Get random delay before next attempt in seconds."""
+        ceiling = min(self.backoff_cap, self.backoff_base * 2 ** (attempt-1))
+        return random.uniform(0, ceiling)
+
+    def wait(self, attempt: int):
+        """Sleep before next attempt."""
+        time.sleep(self.get_delay(attempt))
+
+    def get_stats(self):
+        """Get counters of retries, return Dict with keys:
+            'retries' - number of requests sent again
+            'gave_up' - number of failures that were not retried
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _is_safe(self, method: str, error: Exception):
+        """Check if it is safe to repeat request failed with error."""
+        if method in self.idempotent_methods:
+            return True
+
+        # connection was not established, so server got nothing
+        return isinstance(error, requests.exceptions.ConnectTimeout)
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._stats[counter] += 1
@@ -0,0 +1,64 @@
+import hashlib
+import heapq
+import os
+from array import array
+from random import shuffle
+
+
+class ReservoirSampler(object):
+    """Keep uniform random sample of distinct ids from stream of ids.
+
+    Every id gets random priority from keyed hash, so all copies
+    of id get the same priority, and sample is ids with smallest
+    priorities seen so far. Duplicates are dropped on the fly
+    and memory is bound by size of sample, not by size of stream.
+    """
+
+    def __init__(self, size: int):
+        """Keyword arguments:
+        size -- max number of ids in sample
+        """
+        self.size = size
+        self.count = 0
+        self._key = os.urandom(16)
+        self._heap = []
+        self._members = set()
+
+    def add(self, item: int):
+        """Offer id to sample, return True if it is in sample now."""
+        self.count += 1
+        if item in self._members:
+            return False
+
+        # heap keeps negative priorities, so its top is the largest one
+        priority = -self._get_priority(item)
+
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, (priority, item))
+        elif priority > self._heap[0][0]:
+            dropped = heapq.heapreplace(self._heap, (priority, item))
+            self._members.discard(dropped[1])
+        else:
+            return False
+
+        self._members.add(item)
+        return True
+
+    def extend(self, items):
+        """Offer all ids from iterable to sample."""
+        for item in items:
+            self.add(item)
+
+    def get_sample(self):
+        """Get sample in random order, return array of int."""
+        sample = array('q', self._members)
+        shuffle(sample)
+        return sample
+
+    def __len__(self):
+        return len(self._members)
+
+    def _get_priority(self, item: int):
+        digest = hashlib.blake2b(int(item).to_bytes(8, 'little', signed=True),
+                                 digest_size=8, key=self._key).digest()
+        return int.from_bytes(digest, 'little')
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict
+
+from dztoolset.jsonfile import write_json
+
+
+class TokenCache(object):
+    """Persistent record of last successful check of auth token.
+
+    It keeps info about user fetched on check and time of check,
+    so token is not checked with request to Deezer on every run.
+    Token itself is not stored, only its hash to know that record
+    belongs to current token.
+    """
+
+    def __init__(self, path: str, check_interval: float = 3600):
+        """Keyword arguments:
+        path -- path to json file, it will be created on first save
+        check_interval -- seconds while checked token is considered
+            valid without new check, 0 means always check (default 3600)
+        """
+        self.path = path
+        self.check_interval = check_interval
+
+    def get_user(self, token: str):
+        """Get user info saved on last check of token, return Dict.
+
+        Return None if token was not checked or check is too old.
+        """
+        if not token or self.check_interval <= 0:
+            return None
+
+        try:
+            with open(self.path) as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        if (data.get('token_hash') != self._hash(token)
+                or time.time() - data.get('checked', 0)
+                >= self.check_interval):
+            return None
+
+        return data.get('user')
+
+    def save(self, token: str, user: Dict):
+        """Remember that token is valid and belongs to user."""
+        data = {
+            'token_hash': self._hash(token),
+            'user': user,
+            'checked': time.time()
+        }
+        write_json(self.path, data)
+
+    def clear(self):
+        """Forget last check, so token will be checked on next run."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _hash(self, token: str):
+        return hashlib.sha256(token.encode()).hexdigest()
@@ -0,0 +1,38 @@
+from typing import Dict
+
+
+class Track(object):
+    """Lightweight record of track with only fields script needs.
+
+    Full track from Deezer api has dozens of fields, links and nested
+    dicts, this record keeps few of them in slots without instance dict.
+    """
+
+    __slots__ = ('id', 'title', 'artist', 'album', 'duration')
+
+    def __init__(self, id: int, title: str = '', artist: str = '',
+                 album: str = '', duration: int = 0):
+        self.id = id
+        self.title = title
+        self.artist = artist
+        self.album = album
+        self.duration = duration
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        """Create record from track Dict of Deezer api, return Track."""
+        return cls(int(data['id']),
+                   data.get('title', ''),
+                   data.get('artist', {}).get('name', ''),
+                   data.get('album', {}).get('title', ''),
+                   int(data.get('duration', 0)))
+
+    def __eq__(self, other):
+        if not isinstance(other, Track):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in self.__slots__)
+
+    def __repr__(self):
+        return 'Track({0!r}, {1!r}, {2!r})'.format(self.id, self.title,
+                                                   self.artist)
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import List, Union
+
+
+class TrackStore(object):
+    """Local SQLite store of track ids of playlists with their checksums.
+
+    Deezer changes checksum of playlist on any change of its tracks,
+    so while checksum is the same, stored ids could be used instead
+    of fetching all tracks again.
+    """
+
+    def __init__(self, path: str):
+        """Keyword arguments:
+        path -- path to database file, it will be created if missing
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def connection(self):
+        """Connection to database, opened on first use."""
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._connection = sqlite3.connect(self.path,
+                                               check_same_thread=False)
+            self._create_tables()
+
+        return self._connection
+
+    def get_track_ids(self, playlist_id: Union[int, str], checksum: str):
+        """Get stored track ids of playlist, return array of int.
+
+        Return None if playlist is not stored or its checksum changed.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT checksum FROM playlists WHERE id = ?',
+                (int(playlist_id),)
+            ).fetchone()
+
+            if row is None or row[0] != str(checksum):
+                return None
+
+            rows = self.connection.execute(
+                'SELECT track_id FROM playlist_tracks'
+                ' WHERE playlist_id = ? ORDER BY position',
+                (int(playlist_id),)
+            ).fetchall()
+
+        return array('q', (row[0] for row in rows))
+
+    def save(self, playlist_id: Union[int, str], checksum: str,
+             track_ids: List[int]):
+        """Replace stored track ids and checksum of playlist."""
+        playlist_id = int(playlist_id)
+        with self._lock, self.connection:
+            self._delete(playlist_id)
+            self.connection.execute(
+                'INSERT INTO playlists (id, checksum, nb_tracks, synced)'
+                ' VALUES (?, ?, ?, ?)',
+                (playlist_id, str(checksum), len(track_ids), time.time())
+            )
+            self.connection.executemany(
+                'INSERT INTO playlist_tracks (playlist_id, position, track_id)'
+                ' VALUES (?, ?, ?)',
+                [(playlist_id, position, int(track_id))
+                 for position, track_id in enumerate(track_ids)]
+            )
+
+    def remove(self, playlist_id: Union[int, str]):
+        """Remove playlist from store."""
+        with self._lock, self.connection:
+            self._delete(int(playlist_id))
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _delete(self, playlist_id: int):
+        self.connection.execute('DELETE FROM playlist_tracks'
+                                ' WHERE playlist_id = ?', (playlist_id,))
+        self.connection.execute('DELETE FROM playlists WHERE id = ?',
+                                (playlist_id,))
+
+    def _create_tables(self):
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS playlists ('
+                ' id INTEGER PRIMARY KEY,'
+                ' checksum TEXT NOT NULL,'
+                ' nb_tracks INTEGER NOT NULL,'
+                ' synced REAL NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS playlist_tracks ('
+                ' playlist_id INTEGER NOT NULL,'
+                ' position INTEGER NOT NULL,'
+                ' track_id INTEGER NOT NULL,'
+                ' PRIMARY KEY (playlist_id, position))'
+            )
@@ -0,0 +1,168 @@
+import json
+import re
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import pytest
+from dztoolset.deezerconfig import DeezerConfig
+
+
+class DeezerStub(object):
+    """In-memory imitation of Deezer api library for offline tests."""
+
+    def __init__(self):
+        self.url = ''
+        self.user = {'type': 'user', 'id': 1, 'name': 'stub'}
+        self.playlists = {}
+        self.requests = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def add_playlist(self, title: str, tracks=()):
+        """Add playlist to library, return its id."""
+        with self._lock:
+            playlist_id = self._next_id
+            self._next_id += 1
+            self.playlists[playlist_id] = {'id': playlist_id,
+                                           'title': title,
+                                           'tracks': list(tracks)}
+        return playlist_id
+
+    def count_requests(self, method: str = None, path: str = None):
+        """Count received requests with method and path."""
+        return len([1 for m, p, params in self.requests
+                    if (method is None or m == method)
+                    and (path is None or p == path)])
+
+    def handle(self, method: str, path: str, params):
+        with self._lock:
+            self.requests.append((method, path, params))
+
+        match = re.fullmatch(r'/playlist/(\d+)(/tracks)?', path)
+
+        if method == 'GET' and path == '/user/me':
+            return self.user
+
+        if method == 'GET' and path == '/user/me/playlists':
+            return self._paginate(path, params, [
+                {'id': pl['id'], 'title': pl['title'],
+                 'nb_tracks': len(pl['tracks']),
+                 'checksum': str(hash(tuple(pl['tracks'])))}
+                for pl in self.playlists.values()
+            ])
+
+        if method == 'POST' and re.fullmatch(r'/user/\d+/playlists', path):
+            return {'id': self.add_playlist(params['title'])}
+
+        if not match or int(match.group(1)) not in self.playlists:
+            return {'error': {'type': 'DataException',
+                              'message': 'no data', 'code': 800}}
+
+        playlist = self.playlists[int(match.group(1))]
+        songs = [int(song) for song in params.get('songs', '').split(',')
+                 if song]
+
+        if match.group(2) and method == 'GET':
+            return self._paginate(path, params,
+                                  [{'id': t} for t in playlist['tracks']])
+        elif match.group(2) and method == 'POST' and 'order' in params:
+            order = [int(song) for song in params['order'].split(',')]
+            with self._lock:
+                playlist['tracks'].sort(key=order.index)
+            return True
+        elif match.group(2) and method == 'POST':
+            with self._lock:
+                playlist['tracks'].extend(songs)
+            return True
+        elif match.group(2) and method == 'DELETE':
+            with self._lock:
+                playlist['tracks'] = [t for t in playlist['tracks']
+                                      if t not in songs]
+            return True
+        elif method == 'DELETE':
+            with self._lock:
+                del self.playlists[playlist['id']]
+            return True
+        elif method == 'POST':
+            return True
+
+    def _paginate(self, path: str, params, items):
+        limit = int(params.get('limit', 25))
+        index = int(params.get('index', 0))
+        page = {'data': items[index:index+limit], 'total': len(items)}
+        if index + limit < len(items):
+            next_params = dict(params, index=index+limit)
+            page['next'] = '{0}{1}?{2}'.format(
+                self.url, path, urlencode(next_params)
+            )
+        return page
+
+
+class _StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._answer('GET')
+
+    def do_POST(self):
+        self._answer('POST')
+
+    def do_DELETE(self):
+        self._answer('DELETE')
+
+    def _answer(self, method):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            params.update(parse_qsl(self.rfile.read(length).decode()))
+
+        body = json.dumps(
+            self.server.stub.handle(method, url.path, params)
+        ).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    """Get path to config file in tmp_path, return str.
+
+    Local stores are made next to config, so each test has own.
+    """
+    return str(tmp_path / 'testcfg.ini')
+
+
+@pytest.fixture
+def config(config_path):
+    """Create config with default data in tmp_path, return DeezerConfig."""
+    with pytest.raises(SystemExit):
+        DeezerConfig(config_path)
+    return DeezerConfig(config_path)
+
+
+@pytest.fixture
+def deezer_stub():
+    """Start local http server imitating Deezer api, yield DeezerStub."""
+    server = _StubServer(('localhost', 0), _StubHandler)
+    server.stub = DeezerStub()
+    server.stub.url = 'http://localhost:{0}'.format(server.server_address[1])
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    yield server.stub
+
+    server.shutdown()
+    server.server_close()
@@ -62,6 +62,12 @@ class TestConfig(object):
         assert (self.cfg.get('section', 'test_option')
                 == self.default_data['section']['test_option'])
 
+    def test_get_option_fallback(self):
+        """Test getting missing option with fallback value."""
+        assert self.cfg.get('section', 'missing_option', fallback='1') == '1'
+        assert self.cfg.get('missing_section', 'option', fallback=None) is None
+        assert self.cfg.get_bool('section', 'missing_option', fallback=True)
+
     def test_get_section(self):
         """Test getting section."""
         assert self.cfg.get('section') == self.default_data['section']
@@ -1,6 +1,11 @@
-import requests
+import json
 import pytest
+import requests
 import pytest_mock
+from dztoolset.deezersession import DeezerSession
+from dztoolset.ratelimiter import RateLimiter
+from dztoolset.retrypolicy import RetryPolicy
+from dztoolset.responsecache import ResponseCache
 from dztoolset.deezerapi import (DeezerApi, DeezerApiError,
                                  DeezerApiRequestError)
 
@@ -11,6 +16,8 @@ class MockResponse(object):
 
     def __init__(self):
         self.text = ''
+        self.status_code = 200
+        self.headers = {}
 
 
 class TestDeezerApi(object):
@@ -42,10 +49,10 @@ class TestDeezerApi(object):
     def test_get_request_single(self, mocker):
         mock_response = MockResponse()
         mock_response.text = '{"test_data":"test"}'
-        mocker.patch('requests.get', return_value=mock_response)
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
 
         data = self.api.get_request(self.test_uri, 'single', self.test_params)
-        requests.get.assert_called_once_with(
+        DeezerSession.get.assert_called_once_with(
             self.base_url+self.test_uri,
             self.test_params_after_add_required
         )
@@ -58,12 +65,12 @@ class TestDeezerApi(object):
         )
         mock_response2 = MockResponse()
         mock_response2.text = '{"data": [{"test_data2":"test2"}]}'
-        mocker.patch('requests.get',
-                     side_effect=[mock_response1, mock_response2])
+        mocker.patch.object(DeezerSession, 'get',
+                            side_effect=[mock_response1, mock_response2])
 
         data = self.api.get_request(self.test_uri, 'list', self.test_params)
 
-        requests.get.assert_has_calls([
+        DeezerSession.get.assert_has_calls([
             mocker.call(
                 self.base_url+self.test_uri,
                 self.test_params_after_add_required
@@ -74,13 +81,126 @@ class TestDeezerApi(object):
         ])
         assert data == [{"test_data1": "test1"}, {"test_data2": "test2"}]
 
+    def test_iter_request(self, mocker):
+        mock_response1 = MockResponse()
+        mock_response1.text = (
+            '{"data": [{"id": 1}, {"id": 2}], "next": "next_url"}'
+        )
+        mock_response2 = MockResponse()
+        mock_response2.text = '{"data": [{"id": 3}]}'
+        mocker.patch.object(DeezerSession, 'get',
+                            side_effect=[mock_response1, mock_response2])
+
+        items = self.api.iter_request(self.test_uri, self.test_params)
+
+        # nothing requested until iteration starts
+        DeezerSession.get.assert_not_called()
+        assert next(items) == {"id": 1}
+        assert next(items) == {"id": 2}
+        DeezerSession.get.assert_called_once_with(
+            self.base_url+self.test_uri,
+            self.test_params_after_add_required
+        )
+        assert list(items) == [{"id": 3}]
+        DeezerSession.get.assert_called_with('next_url')
+
+    def test_iter_request_many_pages(self, mocker):
+        pages_count = 3000
+        mock_responses = []
+        for n in range(pages_count):
+            mock_response = MockResponse()
+            mock_response.text = '{{"data": [{0}]{1}}}'.format(
+                n, ', "next": "next_url"' if n < pages_count - 1 else ''
+            )
+            mock_responses.append(mock_response)
+        mocker.patch.object(DeezerSession, 'get', side_effect=mock_responses)
+        mocker.patch.object(RateLimiter, 'acquire')
+
+        # more pages than recursion limit allows to follow recursively
+        data = self.api.get_request(self.test_uri, 'list', self.test_params)
+
+        assert data == list(range(pages_count))
+
+    def test_iter_request_parallel(self, mocker):
+        total = 10
+        page_size = 3
+
+        def get_page(url, params=None):
+            index = params.get('index', 0)
+            items = list(range(index, min(index + page_size, total)))
+            mock_response = MockResponse()
+            mock_response.text = json.dumps({
+                "data": items,
+                "total": total,
+                "next": "next_url"
+            })
+            return mock_response
+
+        mocker.patch.object(DeezerSession, 'get', side_effect=get_page)
+
+        data = list(self.api.iter_request(self.test_uri, self.test_params,
+                                          parallel=True))
+
+        assert data == list(range(total))
+        assert DeezerSession.get.call_count == 4
+        for index in (3, 6, 9):
+            DeezerSession.get.assert_any_call(
+                self.base_url+self.test_uri,
+                dict(self.test_params_after_add_required, index=index)
+            )
+
+    def test_iter_request_parallel_short_first_page(self, mocker):
+        total = 10
+        page_size = 3
+
+        def get_page(url, params=None):
+            index = params.get('index', 0)
+            # server skipped one unavailable item of first page
+            items = list(range(index, min(index + page_size, total)))
+            if index == 0:
+                items = items[1:]
+            mock_response = MockResponse()
+            mock_response.text = json.dumps({
+                "data": items,
+                "total": total,
+                "next": "next_url?limit=3&index={0}".format(index + page_size)
+            })
+            return mock_response
+
+        mocker.patch.object(DeezerSession, 'get', side_effect=get_page)
+
+        data = list(self.api.iter_request(self.test_uri, self.test_params,
+                                          parallel=True))
+
+        assert data == list(range(1, total))
+        assert DeezerSession.get.call_count == 4
+        for index in (3, 6, 9):
+            DeezerSession.get.assert_any_call(
+                self.base_url+self.test_uri,
+                dict(self.test_params_after_add_required, index=index)
+            )
+
+    def test_iter_request_parallel_without_total(self, mocker):
+        mock_response1 = MockResponse()
+        mock_response1.text = '{"data": [1, 2], "next": "next_url"}'
+        mock_response2 = MockResponse()
+        mock_response2.text = '{"data": [3]}'
+        mocker.patch.object(DeezerSession, 'get',
+                            side_effect=[mock_response1, mock_response2])
+
+        data = list(self.api.iter_request(self.test_uri, self.test_params,
+                                          parallel=True))
+
+        assert data == [1, 2, 3]
+        DeezerSession.get.assert_called_with('next_url')
+
     def test_get_request_boolean_response(self, mocker):
         mock_response = MockResponse()
         mock_response.text = 'true'
-        mocker.patch('requests.get', return_value=mock_response)
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
 
         data = self.api.get_request(self.test_uri, 'single', self.test_params)
-        requests.get.assert_called_once_with(
+        DeezerSession.get.assert_called_once_with(
             self.base_url+self.test_uri,
             self.test_params_after_add_required
         )
@@ -90,10 +210,10 @@ class TestDeezerApi(object):
     def test_post_request(self, mocker):
         mock_response = MockResponse()
         mock_response.text = '{"test_data":"test"}'
-        mocker.patch('requests.post', return_value=mock_response)
+        mocker.patch.object(DeezerSession, 'post', return_value=mock_response)
 
         data = self.api.post_request(self.test_uri, 'single', self.test_params)
-        requests.post.assert_called_once_with(
+        DeezerSession.post.assert_called_once_with(
             self.base_url+self.test_uri,
             self.test_params_after_add_required
         )
@@ -102,15 +222,16 @@ class TestDeezerApi(object):
     def test_delete_request(self, mocker):
         mock_response = MockResponse()
         mock_response.text = 'true'
-        mocker.patch('requests.delete', return_value=mock_response)
+        mocker.patch.object(DeezerSession, 'delete',
+                            return_value=mock_response)
 
         data = self.api.delete_request(self.test_uri, 'single',
                                        self.test_params)
 
         # delete request works with GET parameters in url string
         # so we get url string of request and test it for all we need
-        assert len(requests.delete.mock_calls) == 1
-        (name, args, kwargs) = requests.delete.mock_calls[0]
+        assert len(DeezerSession.delete.mock_calls) == 1
+        (name, args, kwargs) = DeezerSession.delete.mock_calls[0]
         (url,) = args
 
         # url begins with http://address.com?
@@ -130,8 +251,8 @@ class TestDeezerApi(object):
         mock_response2.text = (
             '{"error":{"message":"Error message", "code": "errorcode"}}'
         )
-        mocker.patch(
-            'requests.get',
+        mocker.patch.object(
+            DeezerSession, 'get',
             side_effect=[mock_response1, mock_response1, mock_response2]
         )
 
@@ -145,7 +266,7 @@ class TestDeezerApi(object):
         with pytest.raises(DeezerApiRequestError):
             self.api.get_request(self.test_uri, 'list', self.test_params)
 
-        requests.get.assert_has_calls([
+        DeezerSession.get.assert_has_calls([
             mocker.call(
                 self.base_url+self.test_uri,
                 self.test_params_after_add_required
@@ -159,3 +280,212 @@ class TestDeezerApi(object):
                 self.test_params_after_add_required
             )
         ])
+
+    def test_quota_exceeded_retry(self, mocker):
+        mock_response1 = MockResponse()
+        mock_response1.text = (
+            '{"error":{"message":"Quota limit exceeded", "code": 4}}'
+        )
+        mock_response2 = MockResponse()
+        mock_response2.text = '{"test_data":"test"}'
+        mocker.patch.object(DeezerSession, 'get',
+                            side_effect=[mock_response1, mock_response2])
+        mocker.patch.object(RateLimiter, 'drain')
+
+        data = self.api.get_request(self.test_uri, 'single', self.test_params)
+
+        assert data == {"test_data": "test"}
+        assert DeezerSession.get.call_count == 2
+        RateLimiter.drain.assert_called_once()
+
+    def test_quota_exceeded_retries_exhausted(self, mocker):
+        self.api.quota_retries = 2
+        mock_response = MockResponse()
+        mock_response.text = (
+            '{"error":{"message":"Quota limit exceeded", "code": 4}}'
+        )
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
+        mocker.patch.object(RateLimiter, 'drain')
+
+        with pytest.raises(DeezerApiRequestError) as error_info:
+            self.api.get_request(self.test_uri, 'single', self.test_params)
+
+        assert error_info.value.code == 4
+        assert DeezerSession.get.call_count == 3
+
+    def test_token_refresh(self, mocker):
+        mock_response1 = MockResponse()
+        mock_response1.text = (
+            '{"error":{"type":"OAuthException",'
+            ' "message":"Invalid OAuth access token.", "code": 300}}'
+        )
+        mock_response2 = MockResponse()
+        mock_response2.text = '{"test_data":"test"}'
+        mocker.patch.object(DeezerSession, 'delete',
+                            side_effect=[mock_response1, mock_response2])
+        rejected = []
+
+        def refresher(token):
+            rejected.append(token)
+            self.api.token = 'new_token'
+
+        self.api.token_refresher = refresher
+
+        data = self.api.delete_request(self.test_uri, 'single',
+                                       self.test_params)
+
+        assert data == {"test_data": "test"}
+        assert rejected == [self.token]
+        url = DeezerSession.delete.call_args_list[1][0][0]
+        assert 'access_token=new_token' in url
+        assert self.token not in url
+
+    def test_token_refresh_once(self, mocker):
+        mock_response = MockResponse()
+        mock_response.text = (
+            '{"error":{"message":"Invalid OAuth access token.", "code": 300}}'
+        )
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
+        refresher = mocker.Mock()
+        self.api.token_refresher = refresher
+
+        with pytest.raises(DeezerApiRequestError) as error_info:
+            self.api.get_request(self.test_uri, 'single', self.test_params)
+
+        assert error_info.value.code == 300
+        refresher.assert_called_once_with(self.token)
+        assert DeezerSession.get.call_count == 2
+
+    def test_token_refresh_parallel_pages(self, mocker):
+        total = 10
+        page_size = 3
+        self.api.workers = 1
+
+        def get_page(url, params=None):
+            index = params.get('index', 0)
+            mock_response = MockResponse()
+            if index and params['access_token'] != 'new_token':
+                mock_response.text = (
+                    '{"error":{"message":"Invalid OAuth access token.",'
+                    ' "code": 300}}'
+                )
+                return mock_response
+            mock_response.text = json.dumps({
+                "data": list(range(index, min(index + page_size, total))),
+                "total": total,
+                "next": "next_url?index={0}".format(index + page_size)
+            })
+            return mock_response
+
+        def refresher(token):
+            self.api.token = 'new_token'
+
+        mocker.patch.object(DeezerSession, 'get', side_effect=get_page)
+        self.api.token_refresher = refresher
+
+        data = list(self.api.iter_request(self.test_uri, self.test_params,
+                                          parallel=True))
+
+        assert data == list(range(total))
+        # only first of later pages is sent with rejected token
+        assert DeezerSession.get.call_count == 5
+
+    def test_requests_pass_rate_limiter(self, mocker):
+        mock_response = MockResponse()
+        mock_response.text = '{"test_data":"test"}'
+        mocker.patch.object(DeezerSession, 'post', return_value=mock_response)
+        mocker.patch.object(RateLimiter, 'acquire')
+
+        self.api.post_request(self.test_uri, 'single', self.test_params)
+
+        RateLimiter.acquire.assert_called_once()
+
+    def test_transient_error_retry(self, mocker):
+        mock_response1 = MockResponse()
+        mock_response1.status_code = 502
+        mock_response1.text = '<html>Bad Gateway</html>'
+        mock_response2 = MockResponse()
+        mock_response2.text = '{"test_data":"test"}'
+        mocker.patch.object(
+            DeezerSession, 'get',
+            side_effect=[requests.exceptions.ConnectionError(),
+                         mock_response1, mock_response2]
+        )
+        mocker.patch.object(RetryPolicy, 'wait')
+
+        data = self.api.get_request(self.test_uri, 'single', self.test_params)
+
+        assert data == {"test_data": "test"}
+        assert DeezerSession.get.call_count == 3
+        assert RetryPolicy.wait.call_count == 2
+        assert self.api.retry_policy.get_stats()['retries'] == 2
+
+    def test_transient_error_post_not_retried(self, mocker):
+        mocker.patch.object(DeezerSession, 'post',
+                            side_effect=requests.exceptions.ReadTimeout())
+        mocker.patch.object(RetryPolicy, 'wait')
+
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            self.api.post_request(self.test_uri, 'single', self.test_params)
+
+        DeezerSession.post.assert_called_once()
+        RetryPolicy.wait.assert_not_called()
+        assert self.api.retry_policy.get_stats()['gave_up'] == 1
+
+    def test_invalid_url_not_retried(self, mocker):
+        mocker.patch.object(RetryPolicy, 'wait')
+
+        with pytest.raises(requests.exceptions.MissingSchema):
+            self.api.get_request_strict('api.deezer.com/user/me')
+
+        RetryPolicy.wait.assert_not_called()
+        assert self.api.retry_policy.get_stats()['gave_up'] == 0
+
+    def test_cached_get_request(self, mocker, tmp_path):
+        self.api.cache = ResponseCache(str(tmp_path), {self.test_uri: 100})
+        mock_response = MockResponse()
+        mock_response.text = '{"test_data":"test"}'
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
+
+        data1 = self.api.get_request(self.test_uri, 'single', self.test_params)
+        data2 = self.api.get_request(self.test_uri, 'single', self.test_params)
+
+        assert data1 == data2 == {"test_data": "test"}
+        DeezerSession.get.assert_called_once()
+
+    def test_cached_get_request_revalidation(self, mocker, tmp_path):
+        self.api.cache = ResponseCache(str(tmp_path), {self.test_uri: 0})
+        mock_response1 = MockResponse()
+        mock_response1.text = '{"test_data":"test"}'
+        mock_response1.headers = {'ETag': '"tag"'}
+        mock_response2 = MockResponse()
+        mock_response2.status_code = 304
+        mocker.patch.object(DeezerSession, 'get',
+                            side_effect=[mock_response1, mock_response2])
+
+        self.api.get_request(self.test_uri, 'single', self.test_params)
+        data = self.api.get_request(self.test_uri, 'single', self.test_params)
+
+        assert data == {"test_data": "test"}
+        DeezerSession.get.assert_called_with(
+            self.base_url+self.test_uri,
+            self.test_params_after_add_required,
+            headers={'If-None-Match': '"tag"'}
+        )
+
+    def test_mutation_invalidates_cache(self, mocker, tmp_path):
+        uri = '/playlist/5/tracks'
+        self.api.cache = ResponseCache(str(tmp_path), {uri: 100})
+        mock_response = MockResponse()
+        mock_response.text = '{"data": [], "total": 0}'
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
+        mock_response_true = MockResponse()
+        mock_response_true.text = 'true'
+        mocker.patch.object(DeezerSession, 'post',
+                            return_value=mock_response_true)
+
+        self.api.get_request(uri, 'list')
+        self.api.post_request(uri, 'single', {'songs': '1'})
+        self.api.get_request(uri, 'list')
+
+        assert DeezerSession.get.call_count == 2
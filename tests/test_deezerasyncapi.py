@@ -0,0 +1,185 @@
+import asyncio
+import json
+import pytest
+import pytest_mock
+from dztoolset.deezerasyncapi import AsyncDeezerApi, SessionTransport
+from dztoolset.deezerapi import DeezerApiError, DeezerApiRequestError
+from dztoolset.ratelimiter import RateLimiter
+from dztoolset.retrypolicy import RetryPolicy
+
+assert callable(pytest_mock.mocker)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class MockResponse(object):
+
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+class MockTransport(object):
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    async def request(self, method, url, params=None):
+        self.calls.append((method, url, params))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class TestAsyncDeezerApi(object):
+
+    def setup(self):
+        self.api = AsyncDeezerApi(concurrency=2)
+        self.api.token = 'test_token'
+
+    def teardown(self):
+        self.api = None
+
+    def test_init_api(self):
+        assert isinstance(self.api.transport, SessionTransport)
+        assert isinstance(self.api.rate_limiter, RateLimiter)
+        assert isinstance(self.api.retry_policy, RetryPolicy)
+
+    def test_get_list_from_stub(self, deezer_stub):
+        self.api._base_url = deezer_stub.url
+        self.api._limit_results_per_request = 3
+        playlist_id = deezer_stub.add_playlist('pl', range(10))
+
+        tracks = run(self.api.get_request(
+            '/playlist/{0}/tracks'.format(playlist_id), 'list'
+        ))
+
+        assert [t['id'] for t in tracks] == list(range(10))
+        assert deezer_stub.count_requests('GET') == 4
+
+    def test_post_and_delete_on_stub(self, deezer_stub):
+        self.api._base_url = deezer_stub.url
+        playlist_id = deezer_stub.add_playlist('pl')
+        uri = '/playlist/{0}/tracks'.format(playlist_id)
+
+        assert run(self.api.post_request(uri, 'single', {'songs': '1,2,3'}))
+        assert run(self.api.delete_request(uri, 'single', {'songs': '2'}))
+
+        assert deezer_stub.playlists[playlist_id]['tracks'] == [1, 3]
+
+    def test_follow_next_without_total(self):
+        self.api.transport = MockTransport([
+            MockResponse('{"data": [1], "next": "next_url"}'),
+            MockResponse('{"data": [2]}'),
+        ])
+
+        data = run(self.api.get_request('/test', 'list'))
+
+        assert data == [1, 2]
+        assert self.api.transport.calls[1] == ('get', 'next_url', None)
+
+    def test_errors(self):
+        self.api.transport = MockTransport([
+            MockResponse('{"test_data": "test"}'),
+            MockResponse('{"error": {"message": "Error", "code": 800}}'),
+        ])
+
+        with pytest.raises(DeezerApiError):
+            run(self.api.get_request('/test', 'list'))
+
+        with pytest.raises(DeezerApiRequestError):
+            run(self.api.get_request('/test'))
+
+    def test_transient_error_retry(self, mocker):
+        mocker.patch.object(RetryPolicy, 'get_delay', return_value=0)
+        self.api.transport = MockTransport([
+            MockResponse('', 503),
+            MockResponse('{"test_data": "test"}'),
+        ])
+
+        data = run(self.api.get_request('/test'))
+
+        assert data == {"test_data": "test"}
+        assert len(self.api.transport.calls) == 2
+
+    def test_concurrency_bounded(self, deezer_stub, mocker):
+        self.api._base_url = deezer_stub.url
+        in_flight = []
+        max_in_flight = []
+        request = SessionTransport.request
+
+        async def counting_request(transport, *args):
+            in_flight.append(1)
+            max_in_flight.append(len(in_flight))
+            try:
+                return await request(transport, *args)
+            finally:
+                in_flight.pop()
+
+        mocker.patch.object(SessionTransport, 'request', counting_request)
+
+        async def many_requests():
+            return await asyncio.gather(*[
+                self.api.get_request('/user/me') for i in range(6)
+            ])
+
+        users = run(many_requests())
+
+        assert len(users) == 6
+        assert max(max_in_flight) <= 2
+
+    def test_refresh_rejected_token(self):
+        self.api.transport = MockTransport([
+            MockResponse('{"error": {"message": "Invalid", "code": 300}}'),
+            MockResponse('{"test_data": "test"}'),
+        ])
+
+        def refresh(rejected_token):
+            assert rejected_token == 'test_token'
+            self.api.token = 'new_token'
+
+        self.api.token_refresher = refresh
+
+        data = run(self.api.get_request('/test'))
+
+        assert data == {"test_data": "test"}
+        assert self.api.transport.calls[1][2]['access_token'] == 'new_token'
+
+    def test_token_refresh_list_pages(self):
+        calls = []
+
+        class TokenTransport(object):
+
+            async def request(self, method, url, params=None):
+                calls.append(params)
+                index = params.get('index', 0)
+                if index and params['access_token'] != 'new_token':
+                    return MockResponse(
+                        '{"error": {"message": "Invalid", "code": 300}}'
+                    )
+                return MockResponse(json.dumps({
+                    'data': [index + 1, index + 2], 'total': 6,
+                    'next': 'u?index={0}'.format(index + 2)
+                }))
+
+        self.api.concurrency = 1
+        self.api.transport = TokenTransport()
+
+        def refresh(rejected_token):
+            self.api.token = 'new_token'
+
+        self.api.token_refresher = refresh
+
+        data = run(self.api.get_request('/test', 'list'))
+
+        assert data == [1, 2, 3, 4, 5, 6]
+        # only first of later pages is sent with rejected token
+        assert len(calls) == 4
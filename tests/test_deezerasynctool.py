@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+import pytest_mock
+from dztoolset.deezerasynctool import AsyncDeezerTool
+from dztoolset.deezerasyncapi import AsyncDeezerApi
+from dztoolset.deezertool import DeezerTool
+
+assert callable(pytest_mock.mocker)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestAsyncDeezerTool(object):
+
+    @pytest.fixture(autouse=True)
+    def setup_tool(self, config):
+        self.dztool = DeezerTool(config)
+        self.dztool.api.token = 'test_token'
+        self.dztool._limit_items_delete = 2
+        self.tool = AsyncDeezerTool(self.dztool)
+
+    @pytest.fixture
+    def stub(self, deezer_stub, mocker):
+        self.tool.api._base_url = deezer_stub.url
+        self.tool.api._limit_results_per_request = 2
+        mocker.patch.object(DeezerTool, 'user',
+                            new_callable=mocker.PropertyMock,
+                            return_value=deezer_stub.user)
+        return deezer_stub
+
+    def test_init_instance(self):
+        assert isinstance(self.tool.api, AsyncDeezerApi)
+        assert self.tool.api.token == 'test_token'
+        assert self.tool.api.rate_limiter is self.dztool.api.rate_limiter
+        assert self.tool.api.transport.session is self.dztool.session
+
+    def test_get_my_playlists(self, stub):
+        for n in range(5):
+            stub.add_playlist('playlist_{0}'.format(n))
+
+        playlists = run(self.tool.get_my_playlists())
+        cached = run(self.tool.get_my_playlists())
+
+        assert [pl['title'] for pl in playlists] == [
+            'playlist_{0}'.format(n) for n in range(5)
+        ]
+        assert cached is playlists
+        assert stub.count_requests('GET', '/user/me/playlists') == 3
+
+    def test_create_add_purge_remove(self, stub):
+        async def scenario():
+            playlist_id = await self.tool.create_playlist('new')
+            await self.tool.add_tracks_to_playlist([1, 2, 3, 4, 5],
+                                                   playlist_id)
+            tracks = await self.tool.get_tracks_from_playlist(playlist_id)
+            await self.tool.purge_playlist(playlist_id)
+            purged = await self.tool.get_tracks_from_playlist(playlist_id)
+            await self.tool.remove_playlist(playlist_id)
+            return playlist_id, tracks, purged
+
+        playlist_id, tracks, purged = run(scenario())
+
+        assert [t['id'] for t in tracks] == [1, 2, 3, 4, 5]
+        assert purged == []
+        assert playlist_id not in stub.playlists
+        # five tracks deleted by chunks of two
+        assert stub.count_requests(
+            'DELETE', '/playlist/{0}/tracks'.format(playlist_id)
+        ) == 3
+
+    def test_many_fetches_in_one_loop(self, stub):
+        ids = [stub.add_playlist('pl', range(n, n + 5)) for n in range(4)]
+
+        async def fetch_all():
+            return await asyncio.gather(*[
+                self.tool.get_tracks_from_playlist(id) for id in ids
+            ])
+
+        packs = run(fetch_all())
+
+        assert [[t['id'] for t in pack] for pack in packs] == [
+            list(range(n, n + 5)) for n in range(4)
+        ]
+
+    def test_add_tracks_by_batches(self, stub):
+        self.dztool._limit_items_add = 2
+        playlist_id = stub.add_playlist('pl')
+
+        run(self.tool.add_tracks_to_playlist([1, 2, 3, 4, 5], playlist_id))
+
+        assert stub.playlists[playlist_id]['tracks'] == [1, 2, 3, 4, 5]
+        assert stub.count_requests(
+            'POST', '/playlist/{0}/tracks'.format(playlist_id)
+        ) == 3
+
+    def test_changes_seen_by_dztool(self, stub, mocker):
+        stub.add_playlist('old', [1, 2])
+        invalidate = mocker.patch.object(self.dztool.api.cache, 'invalidate')
+        playlists = run(self.tool.get_my_playlists())
+        assert self.dztool.get_my_playlists() is playlists
+
+        async def scenario():
+            playlist_id = await self.tool.create_playlist('new')
+            await self.tool.add_tracks_to_playlist([1, 2, 3], playlist_id)
+            return playlist_id
+
+        playlist_id = run(scenario())
+
+        new = self.dztool.get_playlist_by_id(playlist_id)
+        assert new['nb_tracks'] == 3
+        assert new['checksum'] is None
+        assert stub.count_requests('GET', '/user/me/playlists') == 1
+        invalidate.assert_called_with(
+            ['/user/me/playlists', '/playlist/{0}'.format(playlist_id)]
+        )
+
+        run(self.tool.remove_playlist(playlist_id))
+
+        assert self.dztool.get_playlist_by_id(playlist_id) is None
+
+    def test_token_of_dztool(self, stub):
+        self.dztool.api.token = 'new_token'
+
+        run(self.tool.get_tracks_from_playlist(stub.add_playlist('pl')))
+
+        assert stub.requests[-1][2]['access_token'] == 'new_token'
@@ -1,9 +1,10 @@
 import webbrowser
-import requests
 from http.server import HTTPServer
 import pytest_mock
+from dztoolset.deezersession import DeezerSession
 import pytest
 import dztoolset.deezerauth as deezerauth
+from dztoolset.tokencache import TokenCache
 
 assert callable(pytest_mock.mocker)
 
@@ -97,7 +98,7 @@ class TestDeezerAuth(object):
         mock_response = MockResponse()
         mock_response.text = f'{{"access_token": "{self.token}"}}'
 
-        mocker.patch('requests.get', return_value=mock_response)
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
 
         self.auth.code = self.test_code
         self.auth._fetch_token()
@@ -105,7 +106,7 @@ class TestDeezerAuth(object):
         url = self.auth._url_token.format(
             self.app_id, self.secret, self.test_code
         )
-        requests.get.assert_called_once_with(url)
+        DeezerSession.get.assert_called_once_with(url)
 
     def test__fetch_token_error_no_code(self):
         assert not hasattr(self.auth, 'code')
@@ -116,7 +117,7 @@ class TestDeezerAuth(object):
         mock_response = MockResponse()
         mock_response.text = '{"error": "error_message"}'
 
-        mocker.patch('requests.get', return_value=mock_response)
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
 
         self.auth.code = self.test_code
         with pytest.raises(deezerauth.DeezerAuthError):
@@ -161,7 +162,7 @@ class TestDeezerAuth(object):
     def test_check_token(self, mocker):
         mock_response = MockResponse()
         mock_response.text = '{"type": "user", "data": "value"}'
-        mocker.patch('requests.get', return_value=mock_response)
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
 
         self.auth.token = self.token
         check = self.auth.check_token()
@@ -170,12 +171,12 @@ class TestDeezerAuth(object):
         assert isinstance(check, bool)
 
         url = self.auth._url_check_token.format(self.token)
-        requests.get.assert_called_once_with(url)
+        DeezerSession.get.assert_called_once_with(url)
 
     def test_check_token_fails(self, mocker):
         mock_response = MockResponse()
         mock_response.text = '{"error": "error_data"}'
-        mocker.patch('requests.get', return_value=mock_response)
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
 
         self.auth.token = self.token
         check = self.auth.check_token()
@@ -184,25 +185,55 @@ class TestDeezerAuth(object):
         assert isinstance(check, bool)
 
         url = self.auth._url_check_token.format(self.token)
-        requests.get.assert_called_once_with(url)
+        DeezerSession.get.assert_called_once_with(url)
 
     def test_check_token_error(self, mocker):
         mock_response = MockResponse()
         mock_response.text = '{"garbage_data": "data"}'
-        mocker.patch('requests.get', return_value=mock_response)
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
 
         self.auth.token = self.token
         with pytest.raises(deezerauth.DeezerAuthError):
             self.auth.check_token()
 
         url = self.auth._url_check_token.format(self.token)
-        requests.get.assert_called_once_with(url)
+        DeezerSession.get.assert_called_once_with(url)
+
+    def test_check_token_cached(self, mocker, tmp_path):
+        mock_response = MockResponse()
+        mock_response.text = '{"type": "user", "id": 5}'
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
+        self.auth.token_cache = TokenCache(str(tmp_path / 'token.json'))
+        self.auth.token = self.token
+
+        assert self.auth.check_token()
+
+        other_auth = deezerauth.DeezerAuth(token_cache=self.auth.token_cache)
+        other_auth.token = self.token
+
+        assert other_auth.check_token()
+        assert other_auth.user == {"type": "user", "id": 5}
+        DeezerSession.get.assert_called_once()
+
+        assert other_auth.check_token(forced=True)
+        assert DeezerSession.get.call_count == 2
+
+    def test_check_token_fails_clears_cache(self, mocker, tmp_path):
+        mock_response = MockResponse()
+        mock_response.text = '{"error": "error_data"}'
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
+        self.auth.token_cache = TokenCache(str(tmp_path / 'token.json'))
+        self.auth.token_cache.save(self.token, {"type": "user", "id": 5})
+        self.auth.token = self.token
+
+        assert not self.auth.check_token(forced=True)
+        assert self.auth.token_cache.get_user(self.token) is None
 
     def test_user_prop(self, mocker):
         mock_response = MockResponse()
         mock_response.text = '{"type": "user", "data": "value"}'
         mock_response_data = {"type": "user", "data": "value"}
-        mocker.patch('requests.get', return_value=mock_response)
+        mocker.patch.object(DeezerSession, 'get', return_value=mock_response)
 
         self.auth.token = self.token
 
@@ -214,4 +245,4 @@ class TestDeezerAuth(object):
         assert user2 == mock_response_data
 
         url = self.auth._url_check_token.format(self.token)
-        requests.get.assert_called_once_with(url)
+        DeezerSession.get.assert_called_once_with(url)
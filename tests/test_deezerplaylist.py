@@ -1,10 +1,10 @@
 import pytest
-import os
 from typing import List
 import itertools
+from array import array
+import threading
 import pytest_mock
 from dztoolset.deezerplaylist import DeezerPlaylist, DeezerPlaylistError
-from dztoolset.deezerconfig import DeezerConfig
 from dztoolset.deezertool import DeezerTool
 from dztoolset.printer import Printer
 
@@ -14,7 +14,6 @@ assert callable(pytest_mock.mocker)
 class TestDeezerPlaylist(object):
 
     def setup_class(self):
-        self.config_path = './tests/testcfg.ini'
         self.test_playlists_set = [
             {"id": "0", "title": "playlist_0"},
             {"id": "1", "title": "playlist_1"},
@@ -26,17 +25,10 @@ class TestDeezerPlaylist(object):
             {"id": "7", "title": "playlist_double"},
         ]
 
-    def setup(self):
-        with pytest.raises(SystemExit):
-            DeezerConfig(self.config_path)
-        config = DeezerConfig(self.config_path)
+    @pytest.fixture(autouse=True)
+    def setup_playlist(self, config):
         self.pl = DeezerPlaylist(config)
 
-    def teardown(self):
-        if os.path.isfile(self.config_path):
-            os.remove(self.config_path)
-        self.pl = None
-
     def test_init_instance(self):
         assert isinstance(self.pl._dztool, DeezerTool)
         assert isinstance(self.pl.printer, Printer)
@@ -48,6 +40,29 @@ class TestDeezerPlaylist(object):
 
         DeezerTool.check_and_update_token.assert_called_once()
 
+    def test_refresh_playlists(self, mocker):
+        mocker.patch.object(DeezerTool, 'get_my_playlists')
+
+        self.pl.refresh_playlists()
+
+        DeezerTool.get_my_playlists.assert_called_once_with(forced=True)
+
+    def test_prefetch_playlists(self, mocker):
+        playlists = [{'id': 1, 'title': 'pl 1'}, {'id': 2, 'title': 'pl 2'}]
+        mocker.patch.object(DeezerTool, 'share_track_ids')
+        mocker.patch.object(DeezerTool, 'get_playlists_by_titles',
+                            return_value=playlists)
+        mocker.patch.object(DeezerTool, 'iter_track_ids_from_playlists',
+                            return_value=iter([(pl, [1], 0.1)
+                                               for pl in playlists]))
+
+        assert self.pl.prefetch_playlists(['pl 1', 'pl 2', 'pl 3']) == 2
+
+        DeezerTool.share_track_ids.assert_called_once()
+        DeezerTool.iter_track_ids_from_playlists.assert_called_once_with(
+            playlists
+        )
+
     def test_get_playlists_by_titles_single(self, mocker):
         mocker.patch.object(DeezerTool, 'get_my_playlists',
                             return_value=self.test_playlists_set)
@@ -186,7 +201,7 @@ class TestDeezerPlaylist(object):
 
         DeezerTool.get_my_playlists.assert_called_once()
         DeezerTool.purge_playlist.assert_called_once_with(
-            self.test_playlists_set[2]["id"]
+            self.test_playlists_set[2]["id"], self.pl._print_purge_progress
         )
         DeezerTool.remove_playlist.assert_not_called()
         DeezerTool.create_playlist.assert_not_called()
@@ -230,14 +245,14 @@ class TestDeezerPlaylist(object):
         ]
 
         src_tracks_0 = [
-            {"id": "1"},
-            {"id": "2"},
-            {"id": "3"},
+            {"id": 1},
+            {"id": 2},
+            {"id": 3},
         ]
         src_tracks_1 = [
-            {"id": "4"},
-            {"id": "3"},
-            {"id": "5"},
+            {"id": 4},
+            {"id": 3},
+            {"id": 5},
         ]
         src_track_packs = [src_tracks_0, src_tracks_1]
 
@@ -247,9 +262,13 @@ class TestDeezerPlaylist(object):
         mocker.patch.object(DeezerPlaylist, 'check_for_absence_of_playlists')
         mocker.patch.object(DeezerPlaylist, 'get_playlists_by_titles',
                             return_value=src_playlists)
-        mocker.patch.object(DeezerTool, 'get_tracks_from_playlist',
-                            side_effect=src_track_packs)
+        mocker.patch.object(DeezerTool, 'get_track_ids_from_playlist',
+                            side_effect=[[t['id'] for t in pack]
+                                         for pack in src_track_packs])
         mocker.patch.object(DeezerTool, 'add_tracks_to_playlist')
+        mocker.patch.object(DeezerTool, 'set_shared_track_ids')
+        mocker.patch.object(DeezerTool, 'update_playlist_tracks',
+                            return_value={'removed': 0, 'added': 0})
 
         return (target_playlist_title, target_playlist_id,
                 src_playlists, src_track_packs)
@@ -274,15 +293,16 @@ class TestDeezerPlaylist(object):
         )
 
         (DeezerPlaylist.reset_playlist_by_title
-            .assert_called_once_with(target_playlist_title))
+            .assert_called_once_with(target_playlist_title, purge=True,
+                                     policy='keep_id'))
         DeezerTool.set_playlist_desctiption.assert_called_once()
         (DeezerPlaylist.check_for_absence_of_playlists
             .assert_called_once_with(src_playlists_titles, True))
         (DeezerPlaylist.get_playlists_by_titles
             .assert_called_once_with(src_playlists_titles))
-        DeezerTool.get_tracks_from_playlist.assert_has_calls([
-            mocker.call(pl["id"]) for pl in src_playlists
-        ])
+        DeezerTool.get_track_ids_from_playlist.assert_has_calls([
+            mocker.call(pl) for pl in src_playlists
+        ], any_order=True)
 
         # due to shuffled order of ids, get list of ids from mock call args,
         # and assert its length and each of src_tracks_ids
@@ -293,6 +313,135 @@ class TestDeezerPlaylist(object):
         for id in src_tracks_ids:
             assert id in ids
 
+        # written tracks are shared with scenarios using target as source
+        DeezerTool.set_shared_track_ids.assert_called_once_with(
+            target_playlist_id, ids
+        )
+
+        record = self.pl._dztool.generation_log.get(target_playlist_title)
+        assert record['target_id'] == str(target_playlist_id)
+        assert record['decision'] == 'generated'
+        assert self.pl._dztool.journal.get(target_playlist_title) is None
+
+    def test_make_shuffled_playlist_resume(self, mocker, fx_shuffled):
+        (target_playlist_title, target_playlist_id,
+            src_playlists, src_track_packs) = fx_shuffled
+        src_titles = [pl["title"] for pl in src_playlists]
+        journal = self.pl._dztool.journal
+        DeezerPlaylist.get_playlists_by_titles.return_value = [
+            dict(pl, checksum='c' + pl['id'], nb_tracks=3)
+            for pl in src_playlists
+        ]
+
+        def add_and_fail(track_ids, playlist_id, progress):
+            progress(2, len(track_ids), 0.1)
+            raise Exception('connection lost')
+
+        DeezerTool.add_tracks_to_playlist.side_effect = add_and_fail
+
+        with pytest.raises(Exception):
+            self.pl.make_shuffled_playlist(target_playlist_title,
+                                           src_titles, 100)
+
+        entry = journal.get(target_playlist_title)
+        assert entry['stage'] == 'add'
+        assert entry['target_id'] == str(target_playlist_id)
+        assert sorted(entry['tracks']) == [1, 2, 3, 4, 5]
+        assert entry['added'] == 2
+
+        DeezerTool.add_tracks_to_playlist.reset_mock(side_effect=True)
+        DeezerPlaylist.reset_playlist_by_title.reset_mock()
+        DeezerTool.get_track_ids_from_playlist.reset_mock()
+        mocker.patch.object(DeezerTool, 'get_playlist_by_id',
+                            return_value={'id': target_playlist_id})
+        mocker.patch.object(DeezerTool, 'get_current_track_ids',
+                            return_value=array('q', entry['tracks'][:2]))
+        self.pl.enable_resume()
+
+        self.pl.make_shuffled_playlist(target_playlist_title,
+                                       src_titles, 100)
+
+        DeezerPlaylist.reset_playlist_by_title.assert_not_called()
+        DeezerTool.get_track_ids_from_playlist.assert_not_called()
+        DeezerTool.get_current_track_ids.assert_called_once_with(
+            str(target_playlist_id)
+        )
+        (ids, pl_id), kwargs = DeezerTool.add_tracks_to_playlist.call_args
+        assert list(ids) == entry['tracks'][2:]
+        assert pl_id == str(target_playlist_id)
+        assert journal.get(target_playlist_title) is None
+
+    def test_make_shuffled_playlist_resume_not_journalled(self, mocker,
+                                                          fx_shuffled):
+        (target_playlist_title, target_playlist_id,
+            src_playlists, src_track_packs) = fx_shuffled
+        DeezerPlaylist.get_playlists_by_titles.return_value = [
+            dict(pl, checksum='c' + pl['id'], nb_tracks=3)
+            for pl in src_playlists
+        ]
+        fingerprint = self.pl._get_fingerprint(
+            DeezerPlaylist.get_playlists_by_titles.return_value, 100
+        )
+        journal = self.pl._dztool.journal
+        journal.save_plan(target_playlist_title, target_playlist_id,
+                          [5, 4, 3, 2, 1], 'update', fingerprint)
+        journal.save_progress(target_playlist_title, 2)
+        mocker.patch.object(DeezerTool, 'get_playlist_by_id',
+                            return_value={'id': target_playlist_id})
+        # last batch was added, but run stopped before it was journalled
+        mocker.patch.object(DeezerTool, 'get_current_track_ids',
+                            return_value=array('q', [5, 4, 3, 2]))
+        self.pl.enable_resume()
+
+        self.pl.make_shuffled_playlist(target_playlist_title,
+                                       [pl["title"] for pl in src_playlists],
+                                       100)
+
+        (ids, pl_id), kwargs = DeezerTool.add_tracks_to_playlist.call_args
+        assert list(ids) == [1]
+
+    def test_make_shuffled_playlist_resume_changed_sources(self, mocker,
+                                                           fx_shuffled):
+        (target_playlist_title, target_playlist_id,
+            src_playlists, src_track_packs) = fx_shuffled
+        src_titles = [pl["title"] for pl in src_playlists]
+        DeezerPlaylist.get_playlists_by_titles.return_value = [
+            dict(pl, checksum='c' + pl['id'], nb_tracks=3)
+            for pl in src_playlists
+        ]
+        fingerprint = self.pl._get_fingerprint(
+            DeezerPlaylist.get_playlists_by_titles.return_value, 100
+        )
+        self.pl._dztool.journal.save_plan(target_playlist_title,
+                                          target_playlist_id, [1, 2, 3],
+                                          'update', fingerprint)
+        mocker.patch.object(DeezerTool, 'get_playlist_by_id',
+                            return_value={'id': target_playlist_id})
+        self.pl.enable_resume()
+
+        # limit changed since interrupted run
+        self.pl.make_shuffled_playlist(target_playlist_title, src_titles, 3)
+
+        DeezerPlaylist.reset_playlist_by_title.assert_called_once()
+        (ids, pl_id), kwargs = DeezerTool.add_tracks_to_playlist.call_args
+        assert len(ids) == 3
+        assert self.pl._dztool.journal.get(target_playlist_title) is None
+
+    def test_make_shuffled_playlist_resume_before_plan(self, fx_shuffled):
+        (target_playlist_title, target_playlist_id,
+            src_playlists, src_track_packs) = fx_shuffled
+        self.pl._dztool.journal.start(target_playlist_title)
+        self.pl.enable_resume()
+
+        self.pl.make_shuffled_playlist(target_playlist_title,
+                                       [pl["title"] for pl in src_playlists],
+                                       100)
+
+        # nothing to continue, so playlist is made from scratch
+        DeezerPlaylist.reset_playlist_by_title.assert_called_once()
+        DeezerTool.add_tracks_to_playlist.assert_called_once()
+        assert self.pl._dztool.journal.get(target_playlist_title) is None
+
     def test_make_shuffled_playlist_limit(self, fx_shuffled):
         limit = 3
 
@@ -322,3 +471,282 @@ class TestDeezerPlaylist(object):
         assert len(ids) == limit
         for id in ids:
             assert id in src_tracks_ids
+
+    def test_make_shuffled_playlist_diff(self, fx_shuffled):
+        (target_playlist_title, target_playlist_id,
+            src_playlists, src_track_packs) = fx_shuffled
+
+        self.pl.make_shuffled_playlist(
+            target_playlist_title,
+            [pl["title"] for pl in src_playlists],
+            100,
+            'diff'
+        )
+
+        (DeezerPlaylist.reset_playlist_by_title
+            .assert_called_once_with(target_playlist_title, purge=False,
+                                     policy='keep_id'))
+        DeezerTool.add_tracks_to_playlist.assert_not_called()
+        DeezerTool.update_playlist_tracks.assert_called_once()
+        (name, args, kwargs) = DeezerTool.update_playlist_tracks.mock_calls[0]
+        assert sorted(args[0]) == [1, 2, 3, 4, 5]
+        assert args[1] == target_playlist_id
+        assert kwargs == {'keep_order': True}
+
+    def test_make_shuffled_playlist_overlap(self, mocker, fx_shuffled):
+        (target_playlist_title, target_playlist_id,
+            src_playlists, src_track_packs) = fx_shuffled
+        fetch_started = threading.Event()
+
+        def reset(title, purge, policy):
+            # reset waits for fetch, so it will pass only if they overlap
+            assert fetch_started.wait(5)
+            return target_playlist_id
+
+        def fetch(playlist):
+            fetch_started.set()
+            return [1, 2, 3]
+
+        DeezerPlaylist.reset_playlist_by_title.side_effect = reset
+        DeezerTool.get_track_ids_from_playlist.side_effect = fetch
+        printed = []
+        mocker.patch.object(Printer, 'print', side_effect=printed.append)
+
+        self.pl.make_shuffled_playlist(
+            target_playlist_title,
+            [pl["title"] for pl in src_playlists],
+            100
+        )
+
+        DeezerTool.add_tracks_to_playlist.assert_called_once()
+        # lines of scenarios running at the same time are told by title
+        title = target_playlist_title
+        assert 'Shuffling playlist {0}'.format(title) in printed
+        assert 'Done playlist {0}'.format(title) in printed
+        assert printed[-1].startswith(
+            'Time of playlist {0}: reset '.format(title)
+        )
+        for phase in ('fetch', 'shuffle', 'add'):
+            assert ' {0} '.format(phase) in printed[-1]
+
+    def test_make_shuffled_playlist_sparse(self, mocker, fx_shuffled):
+        (target_playlist_title, target_playlist_id,
+            src_playlists, src_track_packs) = fx_shuffled
+        mocker.patch.object(DeezerTool, 'estimate_fetch_requests',
+                            return_value=100)
+        mocker.patch.object(DeezerTool, 'estimate_sparse_requests',
+                            return_value=2)
+        mocker.patch.object(DeezerTool, 'sample_track_ids_from_playlists',
+                            return_value=array('q', [4, 2]))
+
+        self.pl.make_shuffled_playlist(
+            target_playlist_title,
+            [pl["title"] for pl in src_playlists],
+            2,
+            sparse_fetch=True
+        )
+
+        DeezerTool.sample_track_ids_from_playlists.assert_called_once_with(
+            src_playlists, 2
+        )
+        DeezerTool.get_track_ids_from_playlist.assert_not_called()
+        (name, args, kwargs) = DeezerTool.add_tracks_to_playlist.mock_calls[0]
+        assert sorted(args[0]) == [2, 4]
+
+    def test_make_shuffled_playlist_sparse_costly(self, mocker, fx_shuffled):
+        (target_playlist_title, target_playlist_id,
+            src_playlists, src_track_packs) = fx_shuffled
+        mocker.patch.object(DeezerTool, 'estimate_fetch_requests',
+                            return_value=2)
+        mocker.patch.object(DeezerTool, 'estimate_sparse_requests',
+                            return_value=2)
+        mocker.patch.object(DeezerTool, 'sample_track_ids_from_playlists')
+
+        self.pl.make_shuffled_playlist(
+            target_playlist_title,
+            [pl["title"] for pl in src_playlists],
+            2,
+            sparse_fetch=True
+        )
+
+        DeezerTool.sample_track_ids_from_playlists.assert_not_called()
+        assert DeezerTool.get_track_ids_from_playlist.call_count == 2
+
+    def test_get_skip_reason(self, mocker):
+        playlists = [
+            {'id': 1, 'title': 'src', 'nb_tracks': 10, 'checksum': 'a'},
+            {'id': 2, 'title': 'target', 'nb_tracks': 5, 'checksum': 'b'},
+        ]
+        mocker.patch.object(
+            DeezerTool, 'get_playlists_by_titles',
+            side_effect=lambda titles: [pl for pl in playlists
+                                        if pl['title'] in titles]
+        )
+        log = self.pl._dztool.generation_log
+
+        # never generated by script
+        assert self.pl.get_skip_reason('target', ['src'], 5,
+                                       'on_change') is None
+
+        log.save_generation('target', self.pl._get_fingerprint(
+            playlists[:1], 5
+        ), 2)
+
+        assert self.pl.get_skip_reason('target', ['src'], 5,
+                                       'always') is None
+        assert 'not changed' in self.pl.get_skip_reason('target', ['src'],
+                                                        5, 'on_change')
+        assert self.pl.get_skip_reason('target', ['src'], 6,
+                                       'on_change') is None
+        assert 'min_interval' in self.pl.get_skip_reason(
+            'target', ['src'], 5, 'min_interval', 60
+        )
+        assert self.pl.get_skip_reason('target', ['src'], 5,
+                                       'min_interval', 0) is None
+
+        # source changed or its checksum is unknown
+        playlists[0] = dict(playlists[0], checksum='c')
+        assert self.pl.get_skip_reason('target', ['src'], 5,
+                                       'on_change') is None
+        playlists[0] = dict(playlists[0], checksum=None)
+        assert self.pl.get_skip_reason('target', ['src'], 5,
+                                       'on_change') is None
+
+        # previous run was interrupted
+        playlists[0] = dict(playlists[0], checksum='a')
+        self.pl._dztool.journal.start('target')
+        assert self.pl.get_skip_reason('target', ['src'], 5,
+                                       'on_change') is None
+        self.pl._dztool.journal.finish('target')
+
+        # target was removed or replaced
+        log.save_generation('target', None, 3)
+        assert self.pl.get_skip_reason('target', ['src'], 5,
+                                       'min_interval', 60) is None
+
+        with pytest.raises(DeezerPlaylistError):
+            self.pl.get_skip_reason('target', ['src'], 5, 'sometimes')
+
+    def test_is_regeneration_needed(self, mocker):
+        mocker.patch.object(DeezerPlaylist, 'get_skip_reason',
+                            side_effect=[None, 'no changes'])
+        mocker.patch.object(Printer, 'print')
+
+        assert self.pl.is_regeneration_needed('target', ['src'])
+        assert not self.pl.is_regeneration_needed('target', ['src'])
+
+        Printer.print.assert_called_once_with(
+            'Skipping playlist target: no changes'
+        )
+        assert (self.pl._dztool.generation_log.get('target')['decision']
+                == 'skipped: no changes')
+
+    def test_plan_shuffled_playlist(self, mocker):
+        playlists = [
+            {'id': 1, 'title': 'src 1', 'nb_tracks': 1000},
+            {'id': 2, 'title': 'src 2', 'nb_tracks': 500},
+            {'id': 3, 'title': 'target', 'nb_tracks': 1200},
+        ]
+        mocker.patch.object(
+            DeezerTool, 'get_playlists_by_titles',
+            side_effect=lambda titles: [pl for pl in playlists
+                                        if pl['title'] in titles]
+        )
+        mocker.patch.object(DeezerTool, 'purge_playlist')
+        mocker.patch.object(DeezerTool, 'remove_playlist')
+        mocker.patch.object(DeezerTool, 'create_playlist')
+        mocker.patch.object(DeezerTool, 'add_tracks_to_playlist')
+        mocker.patch.object(DeezerTool, 'set_playlist_desctiption')
+        mocker.patch.object(Printer, 'print')
+        self.pl._dztool.api._limit_results_per_request = 100
+        self.pl._dztool.api.workers = 4
+        self.pl._dztool._expected_latency = 0.5
+
+        totals = self.pl.plan_shuffled_playlist('target', ['src 1', 'src 2'],
+                                                1000)
+
+        # 15 pages of sources, 12 pages and 3 chunks of purge,
+        # description and 4 batches of 315 ids; purge and description
+        # take 5 rounds, more than 4 rounds of fetch, then 4 of add
+        assert totals == {'GET': 27, 'POST': 5, 'DELETE': 3,
+                          'seconds': (5 + 4) * 0.5, 'tracks': 1000}
+        Printer.print.assert_any_call(
+            '  purge 1200 tracks of playlist target: 12 GET, 3 DELETE'
+        )
+        for method in ('purge_playlist', 'remove_playlist',
+                       'create_playlist', 'add_tracks_to_playlist',
+                       'set_playlist_desctiption'):
+            getattr(DeezerTool, method).assert_not_called()
+
+        totals = self.pl.plan_shuffled_playlist('new', ['src 1'], None,
+                                                'diff')
+
+        assert totals['GET'] == 10
+        assert totals['POST'] == 1 + 1 + 4 + 1
+        assert totals['DELETE'] == 0
+
+        with pytest.raises(DeezerPlaylistError):
+            self.pl.plan_shuffled_playlist('target', ['src 3'], None)
+
+        # playlist of other scenario does not exist yet, but it will
+        totals = self.pl.plan_shuffled_playlist(
+            'next', ['src 1', 'planned'], None,
+            planned_sources={'planned': 300, 'other': 50}
+        )
+
+        assert totals['GET'] == 10
+        assert totals['tracks'] == 1300
+        Printer.print.assert_any_call(
+            '  take 300 tracks of 1 playlists made before from memory: 0 GET'
+        )
+
+    def test_make_shuffled_playlist_unknown_mode(self, fx_shuffled):
+        with pytest.raises(DeezerPlaylistError):
+            self.pl.make_shuffled_playlist('title', ['pl'], 100, 'sometimes')
+
+    def test_reset_playlist_by_title_no_purge(self, fx_reset):
+        assert fx_reset
+
+        self.pl.reset_playlist_by_title(self.test_playlists_set[1]['title'],
+                                        purge=False)
+
+        DeezerTool.purge_playlist.assert_not_called()
+        DeezerTool.create_playlist.assert_not_called()
+
+    def test_reset_playlist_by_title_fastest(self, mocker, fx_reset):
+        assert fx_reset
+        big_playlist = {"id": "8", "title": "big", "nb_tracks": 2000}
+        DeezerTool.get_my_playlists.return_value = [big_playlist]
+        DeezerTool.create_playlist.return_value = "9"
+
+        target_id = self.pl.reset_playlist_by_title('big', policy='fastest')
+
+        assert target_id == "9"
+        DeezerTool.purge_playlist.assert_not_called()
+        DeezerTool.remove_playlist.assert_called_once_with("8")
+        DeezerTool.create_playlist.assert_called_once_with('big')
+
+    def test_reset_playlist_by_title_fastest_small(self, mocker, fx_reset):
+        assert fx_reset
+        small_playlist = {"id": "8", "title": "small", "nb_tracks": 0}
+        DeezerTool.get_my_playlists.return_value = [small_playlist]
+
+        target_id = self.pl.reset_playlist_by_title('small', policy='fastest')
+
+        assert target_id == "8"
+        DeezerTool.purge_playlist.assert_called_once()
+        DeezerTool.remove_playlist.assert_not_called()
+
+    def test_reset_playlist_by_title_keep_id(self, mocker, fx_reset):
+        assert fx_reset
+        big_playlist = {"id": "8", "title": "big", "nb_tracks": 2000}
+        DeezerTool.get_my_playlists.return_value = [big_playlist]
+
+        target_id = self.pl.reset_playlist_by_title('big')
+
+        assert target_id == "8"
+        DeezerTool.purge_playlist.assert_called_once()
+        DeezerTool.remove_playlist.assert_not_called()
+
+        with pytest.raises(DeezerPlaylistError):
+            self.pl.reset_playlist_by_title('big', policy='sometimes')
@@ -1,4 +1,3 @@
-import os
 from typing import Dict, List
 import pytest
 import pytest_mock
@@ -11,20 +10,10 @@ assert callable(pytest_mock.mocker)
 
 class TestDezeerScanario(object):
 
-    def setup_class(self):
-        self.config_path = './tests/testcfg.ini'
-
-    def setup(self):
-        with pytest.raises(SystemExit):
-            DeezerConfig(self.config_path)
-        config = DeezerConfig(self.config_path)
+    @pytest.fixture(autouse=True)
+    def setup_scenario(self, config):
         self.sc = DeezerScenario(config)
 
-    def teardown(self):
-        if os.path.isfile(self.config_path):
-            os.remove(self.config_path)
-        self.sc = None
-
     def test_init_instance(self):
         assert isinstance(self.sc._dzplaylist, DeezerPlaylist)
         assert isinstance(self.sc.config, DeezerConfig)
@@ -38,6 +27,11 @@ class TestDezeerScanario(object):
         self.sc.check_and_update_token()
         DeezerPlaylist.check_and_update_token.assert_called_once()
 
+    def test_enable_resume(self, mocker):
+        mocker.patch.object(DeezerPlaylist, 'enable_resume')
+        self.sc.enable_resume()
+        DeezerPlaylist.enable_resume.assert_called_once()
+
     def test_exec_scenario(self, mocker):
         scenario_name = 'pl_test'
         scenario_config = {"type": "shuffled", "data": "value"}
@@ -160,9 +154,63 @@ class TestDezeerScanario(object):
         DeezerPlaylist.make_shuffled_playlist.assert_called_once_with(
             scenario_config['title'],
             source_list,
-            int(scenario_config['limit'])
+            int(scenario_config['limit']),
+            'reset',
+            'keep_id',
+            False
         )
 
+    def test__shuffled_scenario_handler_update_mode(self, mocker):
+        scenario_config = {
+            'title': 'Test scenario',
+            'source': 'Playlist 1',
+            'update': 'diff'
+        }
+        mocker.patch.object(DeezerPlaylist, 'make_shuffled_playlist')
+
+        self.sc._shuffled_scenario_handler(scenario_config)
+
+        DeezerPlaylist.make_shuffled_playlist.assert_called_once_with(
+            'Test scenario', ['Playlist 1'], None, 'diff', 'keep_id', False
+        )
+
+        scenario_config['update'] = 'sometimes'
+        with pytest.raises(DeezerScenarioError):
+            self.sc._shuffled_scenario_handler(scenario_config)
+
+    def test__shuffled_scenario_handler_sparse_fetch(self, mocker):
+        scenario_config = {
+            'title': 'Test scenario',
+            'source': 'Playlist 1',
+            'limit': '10',
+            'sparse_fetch': 'yes'
+        }
+        mocker.patch.object(DeezerPlaylist, 'make_shuffled_playlist')
+
+        self.sc._shuffled_scenario_handler(scenario_config)
+
+        DeezerPlaylist.make_shuffled_playlist.assert_called_once_with(
+            'Test scenario', ['Playlist 1'], 10, 'reset', 'keep_id', True
+        )
+
+    def test__shuffled_scenario_handler_reset_policy(self, mocker):
+        scenario_config = {
+            'title': 'Test scenario',
+            'source': 'Playlist 1',
+            'reset_policy': 'fastest'
+        }
+        mocker.patch.object(DeezerPlaylist, 'make_shuffled_playlist')
+
+        self.sc._shuffled_scenario_handler(scenario_config)
+
+        DeezerPlaylist.make_shuffled_playlist.assert_called_once_with(
+            'Test scenario', ['Playlist 1'], None, 'reset', 'fastest', False
+        )
+
+        scenario_config['reset_policy'] = 'slowest'
+        with pytest.raises(DeezerScenarioError):
+            self.sc._shuffled_scenario_handler(scenario_config)
+
     def test__shuffled_scenario_handler_missing_config_keys(self, mocker):
         source_list = ['Playlist 1', 'Playlist 2']
         scenario_config_without_title = {
@@ -190,5 +238,204 @@ class TestDezeerScanario(object):
         DeezerPlaylist.make_shuffled_playlist.assert_called_once_with(
             scenario_config_without_limit['title'],
             source_list,
-            None
-        )
\ No newline at end of file
+            None,
+            'reset',
+            'keep_id',
+            False
+        )
+
+    def test_exec_scenarios(self, mocker):
+        configs = {
+            'pl_a': {'type': 'shuffled', 'title': 'A', 'source': 'X, Y'},
+            'pl_c': {'type': 'shuffled', 'title': 'C', 'source': 'A'},
+            'pl_b': {'type': 'shuffled', 'title': 'B', 'source': 'Y, Z'},
+        }
+        mocker.patch.object(DeezerConfig, 'get',
+                            side_effect=lambda name: configs[name])
+        mocker.patch.object(DeezerPlaylist, 'prefetch_playlists')
+        mocker.patch.object(DeezerPlaylist, 'make_shuffled_playlist')
+
+        self.sc.exec_scenarios(['pl_a', 'pl_c', 'pl_b'], workers=2)
+
+        DeezerPlaylist.prefetch_playlists.assert_called_once_with(
+            ['X', 'Y', 'Z']
+        )
+        calls = DeezerPlaylist.make_shuffled_playlist.call_args_list
+        assert len(calls) == 3
+        assert {call[0][0] for call in calls[:2]} == {'A', 'B'}
+        # scenario with target of other one as source goes last
+        assert calls[2] == mocker.call('C', ['A'], None, 'reset',
+                                       'keep_id', False)
+
+    def test_exec_scenarios_errors(self, mocker):
+        configs = {
+            'pl_a': {'type': 'shuffled', 'title': 'A', 'source': 'X'},
+            'pl_b': {'type': 'shuffled', 'title': 'A', 'source': 'Y'},
+            'pl_c': {'type': 'shuffled', 'title': 'C', 'source': 'Y'},
+            'pl_d': {'type': 'shuffled', 'source': 'Y'},
+        }
+        mocker.patch.object(DeezerConfig, 'get',
+                            side_effect=lambda name: configs[name])
+        mocker.patch.object(DeezerPlaylist, 'prefetch_playlists')
+        mocker.patch.object(DeezerPlaylist, 'make_shuffled_playlist',
+                            side_effect=[Exception('fail'), None])
+
+        with pytest.raises(DeezerScenarioError):
+            self.sc.exec_scenarios(['pl_a', 'pl_d'], workers=1)
+        with pytest.raises(DeezerScenarioError):
+            self.sc.exec_scenarios(['pl_a', 'pl_b'], workers=1)
+
+        DeezerPlaylist.make_shuffled_playlist.assert_not_called()
+
+        # failed scenario does not stop others
+        with pytest.raises(DeezerScenarioError):
+            self.sc.exec_scenarios(['pl_a', 'pl_c'], workers=1)
+
+        assert DeezerPlaylist.make_shuffled_playlist.call_count == 2
+
+    def test_exec_scenarios_chain(self, mocker):
+        configs = {
+            'pl_c': {'type': 'shuffled', 'title': 'C', 'source': 'B, X'},
+            'pl_b': {'type': 'shuffled', 'title': 'B', 'source': 'A'},
+            'pl_a': {'type': 'shuffled', 'title': 'A', 'source': 'X'},
+            'pl_d': {'type': 'shuffled', 'title': 'D', 'source': 'D, Y'},
+        }
+        mocker.patch.object(DeezerConfig, 'get',
+                            side_effect=lambda name: configs[name])
+        mocker.patch.object(DeezerPlaylist, 'prefetch_playlists')
+        mocker.patch.object(DeezerPlaylist, 'make_shuffled_playlist')
+
+        self.sc.exec_scenarios(['pl_c', 'pl_b', 'pl_a', 'pl_d'], workers=4)
+
+        DeezerPlaylist.prefetch_playlists.assert_called_once_with(
+            ['X', 'Y']
+        )
+        titles = [call[0][0] for call
+                  in DeezerPlaylist.make_shuffled_playlist.call_args_list]
+        assert sorted(titles) == ['A', 'B', 'C', 'D']
+        assert titles.index('A') < titles.index('B') < titles.index('C')
+
+    def test_exec_scenarios_cycle(self, mocker):
+        configs = {
+            'pl_a': {'type': 'shuffled', 'title': 'A', 'source': 'C'},
+            'pl_b': {'type': 'shuffled', 'title': 'B', 'source': 'A'},
+            'pl_c': {'type': 'shuffled', 'title': 'C', 'source': 'B'},
+        }
+        mocker.patch.object(DeezerConfig, 'get',
+                            side_effect=lambda name: configs[name])
+        mocker.patch.object(DeezerPlaylist, 'prefetch_playlists')
+        mocker.patch.object(DeezerPlaylist, 'make_shuffled_playlist')
+
+        with pytest.raises(DeezerScenarioError) as excinfo:
+            self.sc.exec_scenarios(['pl_a', 'pl_b', 'pl_c'], workers=2)
+
+        assert 'pl_a -> pl_c -> pl_b -> pl_a' in str(excinfo.value)
+        DeezerPlaylist.prefetch_playlists.assert_not_called()
+        DeezerPlaylist.make_shuffled_playlist.assert_not_called()
+
+    def test_exec_scenarios_skip_dependents(self, mocker):
+        configs = {
+            'pl_a': {'type': 'shuffled', 'title': 'A', 'source': 'X'},
+            'pl_b': {'type': 'shuffled', 'title': 'B', 'source': 'A'},
+            'pl_c': {'type': 'shuffled', 'title': 'C', 'source': 'B'},
+            'pl_d': {'type': 'shuffled', 'title': 'D', 'source': 'X'},
+        }
+        mocker.patch.object(DeezerConfig, 'get',
+                            side_effect=lambda name: configs[name])
+        mocker.patch.object(DeezerPlaylist, 'prefetch_playlists')
+        mocker.patch.object(
+            DeezerPlaylist, 'make_shuffled_playlist',
+            side_effect=lambda title, *args: title == 'A' and 1 / 0
+        )
+
+        with pytest.raises(DeezerScenarioError) as excinfo:
+            self.sc.exec_scenarios(['pl_a', 'pl_b', 'pl_c', 'pl_d'],
+                                   workers=2)
+
+        assert 'Failed 3 of 4' in str(excinfo.value)
+        assert 'pl_c: skipped after failure of pl_b' in str(excinfo.value)
+        titles = [call[0][0] for call
+                  in DeezerPlaylist.make_shuffled_playlist.call_args_list]
+        assert sorted(titles) == ['A', 'D']
+
+    def test_plan_scenarios(self, mocker):
+        configs = {
+            'pl_b': {'type': 'shuffled', 'title': 'B', 'source': 'A',
+                     'limit': '5'},
+            'pl_a': {'type': 'shuffled', 'title': 'A', 'source': 'X'},
+        }
+        mocker.patch.object(DeezerConfig, 'get',
+                            side_effect=lambda name: configs[name])
+        mocker.patch.object(DeezerPlaylist, 'print_plan_totals')
+        mocker.patch.object(DeezerPlaylist, 'make_shuffled_playlist')
+        received = []
+
+        def estimate(title, *args, planned_sources=None):
+            received.append(dict(planned_sources))
+            return {'GET': 2, 'POST': 3, 'DELETE': 1, 'seconds': 1.5,
+                    'tracks': 7}
+
+        mocker.patch.object(DeezerPlaylist, 'plan_shuffled_playlist',
+                            side_effect=estimate)
+
+        totals = self.sc.plan_scenarios(['pl_b', 'pl_a'])
+
+        assert totals == {'GET': 4, 'POST': 6, 'DELETE': 2, 'seconds': 3}
+        # pl_b uses target of pl_a, so it is planned after it
+        DeezerPlaylist.plan_shuffled_playlist.assert_has_calls([
+            mocker.call('A', ['X'], None, 'reset', 'keep_id', False,
+                        planned_sources=mocker.ANY),
+            mocker.call('B', ['A'], 5, 'reset', 'keep_id', False,
+                        planned_sources=mocker.ANY),
+        ])
+        assert received == [{}, {'A': 7}]
+        DeezerPlaylist.print_plan_totals.assert_called_once_with(totals)
+        DeezerPlaylist.make_shuffled_playlist.assert_not_called()
+
+    def test__shuffled_scenario_handler_regenerate(self, mocker):
+        scenario_config = {
+            'title': 'Test scenario',
+            'source': 'Playlist 1',
+            'regenerate': 'on_change'
+        }
+        mocker.patch.object(DeezerPlaylist, 'is_regeneration_needed',
+                            side_effect=[False, True])
+        mocker.patch.object(DeezerPlaylist, 'make_shuffled_playlist')
+
+        self.sc._shuffled_scenario_handler(scenario_config)
+
+        DeezerPlaylist.is_regeneration_needed.assert_called_once_with(
+            'Test scenario', ['Playlist 1'], None, 'on_change', 3600
+        )
+        DeezerPlaylist.make_shuffled_playlist.assert_not_called()
+
+        self.sc._shuffled_scenario_handler(scenario_config)
+
+        DeezerPlaylist.make_shuffled_playlist.assert_called_once()
+
+        scenario_config['regenerate'] = 'never'
+        with pytest.raises(DeezerScenarioError):
+            self.sc._shuffled_scenario_handler(scenario_config)
+
+    def test_exec_scenarios_skip_prefetch(self, mocker):
+        configs = {
+            'pl_a': {'type': 'shuffled', 'title': 'A', 'source': 'X',
+                     'regenerate': 'on_change'},
+            'pl_b': {'type': 'shuffled', 'title': 'B', 'source': 'Y'},
+        }
+        mocker.patch.object(DeezerConfig, 'get',
+                            side_effect=lambda name: configs[name])
+        mocker.patch.object(
+            DeezerPlaylist, 'get_skip_reason',
+            side_effect=lambda title, *args: title == 'A' and 'no changes'
+            or None
+        )
+        mocker.patch.object(DeezerPlaylist, 'prefetch_playlists')
+        mocker.patch.object(DeezerPlaylist, 'make_shuffled_playlist')
+
+        self.sc.exec_scenarios(['pl_a', 'pl_b'], workers=2)
+
+        DeezerPlaylist.prefetch_playlists.assert_called_once_with(['Y'])
+        DeezerPlaylist.make_shuffled_playlist.assert_called_once_with(
+            'B', ['Y'], None, 'reset', 'keep_id', False
+        )
@@ -0,0 +1,85 @@
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+import requests
+import pytest_mock
+from dztoolset.deezersession import DeezerSession
+
+assert callable(pytest_mock.mocker)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"data": "value"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestDeezerSession(object):
+
+    def setup_class(self):
+        self.server = HTTPServer(('localhost', 0), StubHandler)
+        self.url = 'http://localhost:{0}/test'.format(
+            self.server.server_address[1]
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def teardown_class(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def setup(self):
+        self.session = DeezerSession(pool_size=2, connect_timeout=1,
+                                     read_timeout=1)
+
+    def teardown(self):
+        self.session.close()
+        self.session = None
+
+    def test_init_session(self):
+        assert self.session.timeout == (1, 1)
+        assert self.session.get_stats() == {
+            'requests': 0,
+            'new_connections': 0,
+            'reused_connections': 0
+        }
+
+    def test_connections_reused(self):
+        for i in range(3):
+            response = self.session.get(self.url, {'index': i})
+            assert response.text == '{"data": "value"}'
+
+        assert self.session.get_stats() == {
+            'requests': 3,
+            'new_connections': 1,
+            'reused_connections': 2
+        }
+
+    def test_keep_alive_disabled(self):
+        self.session = DeezerSession(keep_alive=False)
+        for i in range(2):
+            self.session.get(self.url)
+
+        stats = self.session.get_stats()
+        assert stats['requests'] == 2
+        assert stats['new_connections'] == 2
+        assert stats['reused_connections'] == 0
+
+    def test_post_sends_form_data(self, mocker):
+        mocker.patch.object(requests.Session, 'request')
+
+        self.session.post(self.url, {'songs': '1,2'})
+
+        requests.Session.request.assert_called_once_with(
+            'POST', self.url, data={'songs': '1,2'},
+            timeout=self.session.timeout
+        )
@@ -1,10 +1,15 @@
 import os
+from array import array
 import pytest
 import pytest_mock
 from dztoolset.deezertool import DeezerTool, DeezerToolError
 from dztoolset.deezerauth import DeezerAuth
 from dztoolset.deezerapi import DeezerApi
 from dztoolset.deezerconfig import DeezerConfig
+from dztoolset.responsecache import ResponseCache
+from dztoolset.trackstore import TrackStore
+from dztoolset.track import Track
+from dztoolset.listingcache import ListingCache
 
 assert callable(pytest_mock.mocker)
 
@@ -12,27 +17,64 @@ assert callable(pytest_mock.mocker)
 class TestDeezerTool(object):
 
     def setup_class(self):
-        self.config_path = './tests/testcfg.ini'
         self.token = 'test_token'
 
-    def setup(self):
-        assert not os.path.isfile(self.config_path)
-        with pytest.raises(SystemExit):
-            DeezerConfig(self.config_path)
-        self.config = DeezerConfig(self.config_path)
-        self.tool = DeezerTool(self.config)
-
-    def teardown(self):
-        if os.path.isfile(self.config_path):
-            os.remove(self.config_path)
-        self.config = None
-        self.tool = None
+    @pytest.fixture(autouse=True)
+    def setup_tool(self, config):
+        self.config = config
+        self.tool = DeezerTool(config)
 
     def test_init_instance(self):
         assert isinstance(self.tool.config, DeezerConfig)
         assert isinstance(self.tool.auth, DeezerAuth)
         assert isinstance(self.tool.api, DeezerApi)
 
+    def test_listing_cache(self):
+        assert isinstance(self.tool.listing_cache, ListingCache)
+        assert self.tool.listing_cache.path == os.path.join(
+            os.path.dirname(self.config.path), 'playlists.json')
+        assert self.tool.listing_cache.ttl == 300
+
+        self.tool.disable_cache()
+
+        assert self.tool.listing_cache is None
+
+    def test_listing_updates(self, mocker):
+        mocker.patch.object(DeezerApi, 'iter_request')
+        self.tool.set_my_playlists([{'id': 5, 'title': 'pl',
+                                     'nb_tracks': 2, 'checksum': 'abc'}])
+
+        self.tool.playlist_created(6, 'new')
+        self.tool.playlist_tracks_changed(5, lambda nb_tracks: nb_tracks + 3)
+
+        assert self.tool.get_my_playlists() == [
+            {'id': 5, 'title': 'pl', 'nb_tracks': 5, 'checksum': None},
+            {'id': 6, 'title': 'new', 'nb_tracks': 0},
+        ]
+
+        self.tool.playlist_removed(6)
+
+        assert [pl['id'] for pl in self.tool.get_loaded_playlists()] == [5]
+        DeezerApi.iter_request.assert_not_called()
+
+    def test_cache(self):
+        assert isinstance(self.tool.api.cache, ResponseCache)
+        assert self.tool.api.cache.path == os.path.join(
+            os.path.dirname(self.config.path), 'cache')
+        assert self.tool.api.cache.ttls == {
+            '/user/me/playlists': 300,
+            '/playlist/*/tracks': 3600
+        }
+
+        assert isinstance(self.tool.track_store, TrackStore)
+        assert self.tool.track_store.path == os.path.join(
+            os.path.dirname(self.config.path), 'tracks.db')
+
+        self.tool.disable_cache()
+
+        assert self.tool.api.cache is None
+        assert self.tool.track_store is None
+
     def test_user_prop(self, mocker):
         user_data = {"userdata": "data"}
         mocker.patch.object(DeezerAuth, 'user', return_value=user_data)
@@ -56,6 +98,24 @@ class TestDeezerTool(object):
         DeezerAuth.check_token.assert_called_once()
         DeezerTool._update_token.assert_called_once()
 
+    def test_token_cache(self):
+        assert self.tool.auth.token_cache is self.tool.token_cache
+        assert self.tool.token_cache.path == os.path.join(
+            os.path.dirname(self.config.path), 'token.json')
+        assert self.tool.token_cache.check_interval == 3600
+        assert self.tool.api.token_refresher == self.tool.refresh_token
+
+    def test__refresh_token(self, mocker):
+        mocker.patch.object(DeezerAuth, 'check_token', return_value=False)
+        mocker.patch.object(DeezerTool, '_update_token')
+        self.tool.api.token = 'rejected'
+
+        self.tool.refresh_token('rejected')
+        self.tool.refresh_token('already_replaced')
+
+        DeezerAuth.check_token.assert_called_once_with(forced=True)
+        DeezerTool._update_token.assert_called_once()
+
     def test__update_token(self, mocker):
         assert self.tool.config.get('auth', 'token') == ''
         assert self.tool.api.token == ''
@@ -88,52 +148,306 @@ class TestDeezerTool(object):
         assert self.tool.api.token == ''
 
     def test_get_my_playlists_request(self, mocker):
-        playlist_data_1 = {"data": "value1"}
-        mocker.patch.object(DeezerApi, 'get_request',
-                            return_value=playlist_data_1)
+        playlist_data_1 = [{"data": "value1"}]
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            return_value=iter(playlist_data_1))
 
         data = self.tool.get_my_playlists()
 
         assert data == playlist_data_1
-        DeezerApi.get_request.assert_called_once_with('/user/me/playlists',
-                                                      'list')
+        DeezerApi.iter_request.assert_called_once_with(
+            '/user/me/playlists', parallel=True
+        )
 
     def test_get_my_playlists_cached(self, mocker):
-        playlist_data_1 = {"data": "value1"}
-        mocker.patch.object(DeezerApi, 'get_request')
+        playlist_data_1 = [{"data": "value1"}]
+        mocker.patch.object(DeezerApi, 'iter_request')
         self.tool._myplaylists = playlist_data_1
 
         data = self.tool.get_my_playlists()
 
         assert data == playlist_data_1
-        DeezerApi.get_request.assert_not_called()
+        DeezerApi.iter_request.assert_not_called()
 
     def test_get_my_playlists_forced(self, mocker):
-        playlist_data_1 = {"data": "value1"}
-        playlist_data_2 = {"data": "value1"}
-        mocker.patch.object(DeezerApi, 'get_request',
-                            return_value=playlist_data_2)
+        playlist_data_1 = [{"data": "value1"}]
+        playlist_data_2 = [{"data": "value2"}]
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            return_value=iter(playlist_data_2))
         self.tool._myplaylists = playlist_data_1
 
         data = self.tool.get_my_playlists(forced=True)
 
         assert data == playlist_data_2
-        DeezerApi.get_request.assert_called_once_with(
-            '/user/me/playlists', 'list'
+        DeezerApi.iter_request.assert_called_once_with(
+            '/user/me/playlists', parallel=True
         )
 
+    def test_get_playlists_by_titles(self, mocker):
+        playlists = [
+            {"id": 1, "title": "a"},
+            {"id": 2, "title": "b"},
+            {"id": 3, "title": "a"},
+        ]
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            return_value=iter(playlists))
+
+        assert self.tool.get_playlists_by_titles(['a', 'c', 'a']) == [
+            playlists[0], playlists[2]
+        ]
+        assert self.tool.get_playlists_by_titles(['b']) == [playlists[1]]
+        assert self.tool.get_playlist_by_id('3') == playlists[2]
+        assert self.tool.get_playlist_by_id(4) is None
+        DeezerApi.iter_request.assert_called_once()
+
+    def test_playlists_listing_updated(self, mocker):
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            return_value=iter([{"id": 1, "title": "a",
+                                                "nb_tracks": 5,
+                                                "checksum": "abc"}]))
+        mocker.patch.object(DeezerApi, 'delete_request', return_value=True)
+        mocker.patch.object(DeezerApi, 'post_request',
+                            return_value={"id": 2})
+        mocker.patch.object(DeezerAuth, 'user', {"id": 7})
+
+        assert self.tool.get_playlist_by_id(1)
+
+        self.tool.create_playlist('b')
+        self.tool.add_tracks_to_playlist([1, 2, 3], 1)
+
+        assert self.tool.get_playlists_by_titles(['b']) == [
+            {"id": 2, "title": "b", "nb_tracks": 0}
+        ]
+        assert self.tool.get_playlist_by_id(1) == {
+            "id": 1, "title": "a", "nb_tracks": 8, "checksum": None
+        }
+
+        self.tool.remove_playlist(1)
+
+        assert self.tool.get_playlist_by_id(1) is None
+        DeezerApi.iter_request.assert_called_once()
+
+    def test_playlists_listing_between_runs(self, mocker):
+        playlists = [{"id": 1, "title": "a"}]
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            side_effect=lambda *a, **k: iter(playlists))
+        mocker.patch.object(DeezerApi, 'delete_request', return_value=True)
+        self.tool.get_my_playlists()
+        self.tool.remove_playlist(1)
+
+        other_tool = DeezerTool(self.config)
+
+        assert other_tool.get_my_playlists() == []
+        DeezerApi.iter_request.assert_called_once()
+
+        assert other_tool.get_my_playlists(forced=True) == playlists
+        assert DeezerApi.iter_request.call_count == 2
+        assert DeezerTool(self.config).get_my_playlists() == playlists
+        assert DeezerApi.iter_request.call_count == 2
+
     def test_get_tracks_from_playlist(self, mocker):
-        tracks_data = {"data": "value"}
+        tracks_data = [{"id": 1}, {"id": 2}]
         playlist_id = 77
-        mocker.patch.object(DeezerApi, 'get_request', return_value=tracks_data)
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            return_value=iter(tracks_data))
 
         data = self.tool.get_tracks_from_playlist(playlist_id)
 
         assert data == tracks_data
-        DeezerApi.get_request.assert_called_once_with(
-            f'/playlist/{playlist_id}/tracks', 'list'
+        DeezerApi.iter_request.assert_called_once_with(
+            f'/playlist/{playlist_id}/tracks', parallel=True
+        )
+
+    def test_iter_track_records(self, mocker):
+        tracks_data = [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}]
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            return_value=iter(tracks_data))
+
+        data = list(self.tool.iter_track_records(77))
+
+        assert data == [Track(1, 'a'), Track(2, 'b')]
+
+    def test_get_track_ids_from_playlist_synced(self, mocker, tmp_path):
+        playlist = {'id': 77, 'checksum': 'abc'}
+        self.tool.track_store = TrackStore(str(tmp_path / 'tracks.db'))
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            side_effect=lambda *a, **k: iter([{"id": 1},
+                                                              {"id": 2}]))
+
+        first = self.tool.get_track_ids_from_playlist(playlist)
+        second = self.tool.get_track_ids_from_playlist(playlist)
+
+        assert first == second == array('q', [1, 2])
+        DeezerApi.iter_request.assert_called_once_with(
+            '/playlist/77/tracks', parallel=True
         )
 
+    def test_get_track_ids_from_playlist_changed(self, mocker, tmp_path):
+        self.tool.track_store = TrackStore(str(tmp_path / 'tracks.db'))
+        self.tool.track_store.save(77, 'old', [1, 2])
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            return_value=iter([{"id": 3}]))
+
+        data = self.tool.get_track_ids_from_playlist({'id': 77,
+                                                      'checksum': 'new'})
+
+        assert data == array('q', [3])
+        assert self.tool.track_store.get_track_ids(77, 'new') == data
+
+    def test_get_track_ids_from_playlist_cached(self, deezer_stub,
+                                                tmp_path):
+        self.tool.api._base_url = deezer_stub.url
+        self.tool.api.cache = ResponseCache(str(tmp_path / 'cache'),
+                                            {'/playlist/*/tracks': 3600})
+        self.tool.track_store = TrackStore(str(tmp_path / 'tracks.db'))
+        self.tool.listing_cache = None
+        playlist_id = deezer_stub.add_playlist('pl', [1, 2, 3])
+
+        playlist = self.tool.get_my_playlists()[0]
+        assert list(self.tool.get_track_ids_from_playlist(playlist)) == [
+            1, 2, 3
+        ]
+
+        # playlist is changed elsewhere while its tracks are cached
+        deezer_stub.playlists[playlist_id]['tracks'] = [7, 8, 9]
+        playlist = self.tool.get_my_playlists(forced=True)[0]
+
+        assert list(self.tool.get_track_ids_from_playlist(playlist)) == [
+            7, 8, 9
+        ]
+        assert list(self.tool.track_store.get_track_ids(
+            playlist_id, playlist['checksum']
+        )) == [7, 8, 9]
+
+    def test_get_current_track_ids(self, deezer_stub, tmp_path):
+        self.tool.api._base_url = deezer_stub.url
+        self.tool.api.cache = ResponseCache(str(tmp_path / 'cache'),
+                                            {'/playlist/*/tracks': 3600})
+        playlist_id = deezer_stub.add_playlist('pl', [1, 2, 3])
+        self.tool.get_tracks_from_playlist(playlist_id)
+
+        deezer_stub.playlists[playlist_id]['tracks'] = [1, 2, 3, 4]
+
+        assert self.tool.get_current_track_ids(playlist_id) == array(
+            'q', [1, 2, 3, 4]
+        )
+
+    def test_iter_track_ids_from_playlists(self, deezer_stub):
+        self.tool.disable_cache()
+        self.tool.api._base_url = deezer_stub.url
+        playlists = [
+            {'id': deezer_stub.add_playlist('pl', range(i * 10, i * 10 + i))}
+            for i in range(1, 6)
+        ]
+
+        results = list(self.tool.iter_track_ids_from_playlists(playlists))
+
+        assert len(results) == 5
+        for playlist, track_ids, seconds in results:
+            tracks = deezer_stub.playlists[playlist['id']]['tracks']
+            assert list(track_ids) == tracks
+            assert seconds >= 0
+
+    def test_share_track_ids(self, deezer_stub):
+        self.tool.disable_cache()
+        self.tool.api._base_url = deezer_stub.url
+        self.tool.share_track_ids()
+        playlist_id = deezer_stub.add_playlist('pl', range(5))
+        playlist = self.tool.get_my_playlists()[0]
+
+        first = self.tool.get_track_ids_from_playlist(playlist)
+        second = self.tool.get_track_ids_from_playlist(playlist)
+
+        assert list(first) == list(second) == list(range(5))
+        assert deezer_stub.count_requests(
+            'GET', '/playlist/{0}/tracks'.format(playlist_id)
+        ) == 1
+        assert self.tool.estimate_fetch_requests([playlist]) == 0
+
+        self.tool.add_tracks_to_playlist([7], playlist_id)
+        third = self.tool.get_track_ids_from_playlist(playlist)
+
+        assert list(third) == list(range(5)) + [7]
+        assert deezer_stub.count_requests(
+            'GET', '/playlist/{0}/tracks'.format(playlist_id)
+        ) == 2
+
+    def test_set_shared_track_ids(self, mocker):
+        mocker.patch.object(DeezerApi, 'iter_request')
+
+        self.tool.set_shared_track_ids(5, [1, 2])
+        self.tool.share_track_ids()
+        self.tool.set_shared_track_ids(6, [3, 4])
+
+        assert self.tool.get_track_ids_from_playlist({'id': 6}) == array(
+            'q', [3, 4]
+        )
+        assert 5 not in self.tool._shared_track_ids
+        DeezerApi.iter_request.assert_not_called()
+
+    def test_sample_track_ids_from_playlists(self, deezer_stub):
+        self.tool.disable_cache()
+        self.tool.api._base_url = deezer_stub.url
+        self.tool.api._limit_results_per_request = 10
+        deezer_stub.add_playlist('big', range(1000))
+        deezer_stub.add_playlist('dup', range(5))
+        playlists = self.tool.get_my_playlists()
+
+        sample = self.tool.sample_track_ids_from_playlists(playlists, 3)
+
+        assert len(set(sample)) == 3
+        assert all(0 <= track_id < 1000 for track_id in sample)
+        assert deezer_stub.count_requests('GET') <= 1 + 3
+
+    def test_sample_track_ids_from_playlists_top_up(self, deezer_stub):
+        self.tool.disable_cache()
+        self.tool.api._base_url = deezer_stub.url
+        self.tool.api._limit_results_per_request = 10
+        deezer_stub.add_playlist('pl_1', range(20))
+        deezer_stub.add_playlist('pl_2', range(20))
+        playlists = self.tool.get_my_playlists()
+        # listing says there are more tracks than playlist has
+        playlists[1]['nb_tracks'] = 30
+
+        sample = self.tool.sample_track_ids_from_playlists(playlists, 100)
+
+        assert sorted(sample) == list(range(20))
+
+    def test_sample_track_ids_from_playlists_cached(self, deezer_stub,
+                                                    tmp_path):
+        self.tool.api._base_url = deezer_stub.url
+        self.tool.api._limit_results_per_request = 10
+        self.tool.api.cache = ResponseCache(str(tmp_path / 'cache'),
+                                            {'/playlist/*/tracks': 3600})
+        self.tool.track_store = None
+        self.tool.listing_cache = None
+        playlist_id = deezer_stub.add_playlist('pl', range(100))
+        playlists = self.tool.get_my_playlists()
+        self.tool.sample_track_ids_from_playlists(playlists, 50)
+
+        # playlist is changed elsewhere while its pages are cached
+        deezer_stub.playlists[playlist_id]['tracks'] = list(range(1000, 1100))
+        playlists = self.tool.get_my_playlists(forced=True)
+
+        sample = self.tool.sample_track_ids_from_playlists(playlists, 5)
+
+        assert len(sample) == 5
+        assert all(1000 <= track_id < 1100 for track_id in sample)
+
+    def test_estimate_requests(self, tmp_path):
+        self.tool.api._limit_results_per_request = 100
+        self.tool.track_store = TrackStore(str(tmp_path / 'tracks.db'))
+        self.tool.track_store.save(2, 'abc', range(500))
+        playlists = [
+            {'id': 1, 'checksum': 'abc', 'nb_tracks': 1000},
+            {'id': 2, 'checksum': 'abc', 'nb_tracks': 500},
+        ]
+
+        assert self.tool.estimate_fetch_requests(playlists) == 10
+        assert self.tool.estimate_sparse_requests(playlists, 3) <= 2
+        assert 9 < self.tool.estimate_sparse_requests(playlists, 1000) <= 10
+        assert self.tool.estimate_sparse_requests([], 3) == 0
+
     def test_create_playlist(self, mocker):
         user_id = 11
         new_playlist_id = 77
@@ -177,13 +491,14 @@ class TestDeezerTool(object):
         ]
         tracks_ids_str = '3,5,8,34,46'
         playlist_id = 77
-        mocker.patch.object(DeezerApi, 'get_request', return_value=tracks_data)
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            return_value=iter(tracks_data))
         mocker.patch.object(DeezerApi, 'delete_request')
 
         self.tool.purge_playlist(playlist_id)
 
-        DeezerApi.get_request.assert_called_once_with(
-            f'/playlist/{playlist_id}/tracks', 'list'
+        DeezerApi.iter_request.assert_called_once_with(
+            f'/playlist/{playlist_id}/tracks', parallel=True
         )
 
         DeezerApi.delete_request.assert_called_once_with(
@@ -191,6 +506,26 @@ class TestDeezerTool(object):
             {"songs": tracks_ids_str}
         )
 
+    def test_purge_and_update_ignore_cache(self, deezer_stub, tmp_path):
+        self.tool.api._base_url = deezer_stub.url
+        self.tool.api.cache = ResponseCache(str(tmp_path / 'cache'),
+                                            {'/playlist/*/tracks': 3600})
+        playlist_id = deezer_stub.add_playlist('pl', [1, 2])
+        tracks = deezer_stub.playlists[playlist_id]['tracks']
+        self.tool.get_tracks_from_playlist(playlist_id)
+
+        # tracks are added elsewhere while old ones are cached
+        tracks.append(3)
+        self.tool.update_playlist_tracks([1], playlist_id)
+
+        assert deezer_stub.playlists[playlist_id]['tracks'] == [1]
+
+        self.tool.get_tracks_from_playlist(playlist_id)
+        deezer_stub.playlists[playlist_id]['tracks'].append(4)
+        self.tool.purge_playlist(playlist_id)
+
+        assert deezer_stub.playlists[playlist_id]['tracks'] == []
+
     def test_purge_playlist_by_chunks(self, mocker):
         self.tool._limit_items_delete = 3
         tracks_data = [
@@ -203,13 +538,14 @@ class TestDeezerTool(object):
         tracks_ids_str_1 = '3,5,8'
         tracks_ids_str_2 = '34,46'
         playlist_id = 77
-        mocker.patch.object(DeezerApi, 'get_request', return_value=tracks_data)
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            return_value=iter(tracks_data))
         mocker.patch.object(DeezerApi, 'delete_request')
 
         self.tool.purge_playlist(playlist_id)
 
-        DeezerApi.get_request.assert_called_once_with(
-            f'/playlist/{playlist_id}/tracks', 'list'
+        DeezerApi.iter_request.assert_called_once_with(
+            f'/playlist/{playlist_id}/tracks', parallel=True
         )
 
         DeezerApi.delete_request.assert_has_calls([
@@ -221,7 +557,103 @@ class TestDeezerTool(object):
                 f'/playlist/{playlist_id}/tracks', 'single',
                 {"songs": tracks_ids_str_2}
             ),
-        ])
+        ], any_order=True)
+
+    def test_purge_playlist_concurrent(self, deezer_stub):
+        self.tool.disable_cache()
+        self.tool.api._base_url = deezer_stub.url
+        self.tool._limit_items_delete = 10
+        playlist_id = deezer_stub.add_playlist('pl', range(95))
+        progress = []
+
+        removed = self.tool.purge_playlist(
+            playlist_id, lambda done, total: progress.append((done, total))
+        )
+
+        assert removed == 95
+        assert deezer_stub.playlists[playlist_id]['tracks'] == []
+        assert deezer_stub.count_requests('DELETE') == 10
+        assert len(progress) == 10
+        assert progress[-1] == (95, 95)
+
+    def test_purge_playlist_chunk_failed(self, mocker):
+        self.tool._limit_items_delete = 2
+        mocker.patch.object(DeezerApi, 'iter_request',
+                            return_value=iter([{"id": i} for i in range(5)]))
+        mocker.patch.object(DeezerApi, 'delete_request',
+                            side_effect=[True, DeezerToolError('fail'), True])
+
+        with pytest.raises(DeezerToolError) as e:
+            self.tool.purge_playlist(77)
+
+        assert DeezerApi.delete_request.call_count == 3
+        assert 'of 5 tracks' in str(e.value)
+
+    def test_update_playlist_tracks(self, deezer_stub):
+        self.tool.disable_cache()
+        self.tool.api._base_url = deezer_stub.url
+        playlist_id = deezer_stub.add_playlist('pl', [1, 2, 3, 4])
+
+        stats = self.tool.update_playlist_tracks([5, 3, 1, 6], playlist_id)
+
+        assert stats == {'removed': 2, 'added': 2}
+        assert deezer_stub.playlists[playlist_id]['tracks'] == [1, 3, 5, 6]
+        assert deezer_stub.count_requests('DELETE') == 1
+        assert deezer_stub.count_requests('POST') == 1
+
+    def test_update_playlist_tracks_duplicates(self, deezer_stub):
+        self.tool.disable_cache()
+        self.tool.api._base_url = deezer_stub.url
+        playlist_id = deezer_stub.add_playlist('pl', [1, 1, 2, 3])
+
+        stats = self.tool.update_playlist_tracks([3, 1, 5], playlist_id,
+                                                 keep_order=True)
+
+        assert stats == {'removed': 3, 'added': 2}
+        assert deezer_stub.playlists[playlist_id]['tracks'] == [3, 1, 5]
+
+    def test_update_playlist_tracks_keep_order(self, deezer_stub):
+        self.tool.disable_cache()
+        self.tool.api._base_url = deezer_stub.url
+        playlist_id = deezer_stub.add_playlist('pl', [1, 2, 3])
+
+        self.tool.update_playlist_tracks([3, 1, 2], playlist_id,
+                                         keep_order=True)
+        self.tool.update_playlist_tracks([3, 1, 2], playlist_id,
+                                         keep_order=True)
+
+        assert deezer_stub.playlists[playlist_id]['tracks'] == [3, 1, 2]
+        assert deezer_stub.count_requests('DELETE') == 0
+        assert deezer_stub.count_requests('POST') == 1
+
+    def test_estimate_purge_requests(self):
+        self.tool._limit_items_delete = 500
+        self.tool.api._limit_results_per_request = 500
+
+        assert self.tool.estimate_purge_requests(0) == 1
+        assert self.tool.estimate_purge_requests(500) == 2
+        assert self.tool.estimate_purge_requests(2001) == 10
+
+    def test_estimate_add_requests(self):
+        self.tool._limit_items_add = 500
+        self.tool._limit_bytes_add = 4096
+
+        # 315 ids of 10 digits with encoded commas fit in 4096 bytes
+        assert self.tool.estimate_add_requests(0) == 0
+        assert self.tool.estimate_add_requests(315) == 1
+        assert self.tool.estimate_add_requests(316) == 2
+
+        self.tool._limit_items_add = 100
+
+        assert self.tool.estimate_add_requests(316) == 4
+
+    def test_estimate_seconds(self):
+        self.tool._expected_latency = 0.5
+        self.tool.api.rate_limiter.capacity = 50
+        self.tool.api.rate_limiter.period = 5
+
+        assert self.tool.estimate_seconds(4, 40) == 2
+        assert self.tool.estimate_seconds(4, 150) == 10
 
     def test_add_tracks_to_playlist(self, mocker):
         playlist_id = 77
@@ -237,6 +669,38 @@ class TestDeezerTool(object):
             {"songs": track_ids_str}
         )
 
+    def test_add_tracks_to_playlist_by_batches(self, deezer_stub):
+        self.tool.disable_cache()
+        self.tool.api._base_url = deezer_stub.url
+        self.tool._limit_items_add = 100
+        playlist_id = deezer_stub.add_playlist('pl')
+        track_ids = list(range(1000, 1350))
+        progress = []
+
+        result = self.tool.add_tracks_to_playlist(
+            track_ids, playlist_id,
+            progress=lambda *args: progress.append(args)
+        )
+
+        assert result
+        assert deezer_stub.playlists[playlist_id]['tracks'] == track_ids
+        assert deezer_stub.count_requests('POST') == 4
+        assert [p[0] for p in progress] == [100, 200, 300, 350]
+        assert all(p[1] == 350 and p[2] >= 0 for p in progress)
+
+    def test__split_ids_by_size(self):
+        ids = ['1', '22', '333', '4444', '55555']
+
+        by_count = list(self.tool._split_ids_by_size(ids, 2, 1000))
+        # 1%2C22%2C333 is 12 bytes, 4444%2C55555 too
+        by_size = list(self.tool._split_ids_by_size(ids, 10, 12))
+
+        assert by_count == [['1', '22'], ['333', '4444'], ['55555']]
+        assert by_size == [['1', '22', '333'], ['4444', '55555']]
+        assert (list(self.tool._split_ids_by_size(ids, 10, 11))
+                == [['1', '22'], ['333', '4444'], ['55555']])
+        assert list(self.tool._split_ids_by_size([], 2, 10)) == []
+
     def test_set_playlist_desctiption(self, mocker):
         playlist_id = 77,
         description = 'Some text',
@@ -15,7 +15,6 @@ assert callable(pytest_mock.mocker)
 class TestDzshuffledCli(object):
 
     def setup_class(self):
-        self.config_path = './tests/testcfg.ini'
         self.default_config_data = {
             'system': {
                 'port': '8090',
@@ -45,8 +44,9 @@ class TestDzshuffledCli(object):
             '[1] pl_test2',
         ]
 
-    def setup(self):
-        assert not os.path.isfile(self.config_path)
+    @pytest.fixture(autouse=True)
+    def setup_config(self, config_path):
+        self.config_path = config_path
         cfg_patcher = patch.object(
             DeezerConfig,
             '_get_default_data',
@@ -56,10 +56,6 @@ class TestDzshuffledCli(object):
             dz_cli.main([], self.config_path)
         cfg_patcher.stop()
 
-    def teardown(self):
-        if os.path.isfile(self.config_path):
-            os.remove(self.config_path)
-
     def test_config_file_created(self):
         assert os.path.isfile(self.config_path)
 
@@ -0,0 +1,38 @@
+import time
+from dztoolset.generationlog import GenerationLog
+
+
+class TestGenerationLog(object):
+
+    def test_save_and_get(self, tmp_path):
+        log = GenerationLog(str(tmp_path / 'generations.json'))
+
+        assert log.get('title') is None
+
+        log.save_generation('title', 'abc', 5)
+        log.save_generation('other', None, 6)
+        record = log.get('title')
+
+        assert record['fingerprint'] == 'abc'
+        assert record['target_id'] == '5'
+        assert record['decision'] == 'generated'
+        assert time.time() - record['generated'] < 5
+        assert log.get('other')['fingerprint'] is None
+
+    def test_save_decision(self, tmp_path):
+        log = GenerationLog(str(tmp_path / 'generations.json'))
+        log.save_generation('title', 'abc', 5)
+
+        log.save_decision('title', 'skipped: no changes')
+        record = log.get('title')
+
+        assert record['decision'] == 'skipped: no changes'
+        assert record['fingerprint'] == 'abc'
+
+    def test_clear(self, tmp_path):
+        log = GenerationLog(str(tmp_path / 'generations.json'))
+        log.save_generation('title', 'abc', 5)
+        log.clear()
+        log.clear()
+
+        assert log.get('title') is None
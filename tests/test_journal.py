@@ -0,0 +1,44 @@
+from dztoolset.journal import MutationJournal
+
+
+class TestMutationJournal(object):
+
+    def test_entry_lifecycle(self, tmp_path):
+        journal = MutationJournal(str(tmp_path / 'journal'))
+
+        assert journal.get('title') is None
+
+        journal.start('title')
+
+        assert journal.get('title')['stage'] == 'reset'
+
+        journal.save_plan('title', 5, [3, 1, 2], 'reset', 'abc')
+        journal.save_progress('title', 2)
+        entry = journal.get('title')
+
+        assert entry['stage'] == 'add'
+        assert entry['target_id'] == '5'
+        assert entry['tracks'] == [3, 1, 2]
+        assert entry['update_mode'] == 'reset'
+        assert entry['fingerprint'] == 'abc'
+        assert entry['added'] == 2
+
+        journal.finish('title')
+        journal.finish('title')
+
+        assert journal.get('title') is None
+
+    def test_entries_are_separate(self, tmp_path):
+        journal = MutationJournal(str(tmp_path / 'journal'))
+        journal.start('title 1')
+        journal.save_plan('title 2', 6, [4], 'diff')
+        journal.save_progress('title 3', 1)
+
+        assert journal.get('title 1')['stage'] == 'reset'
+        assert journal.get('title 2')['tracks'] == [4]
+        assert journal.get('title 3') is None
+
+        journal.clear()
+
+        assert journal.get('title 1') is None
+        assert journal.get('title 2') is None
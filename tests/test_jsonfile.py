@@ -0,0 +1,27 @@
+import json
+import os
+import pytest
+from dztoolset.jsonfile import write_json
+
+
+class TestJsonFile(object):
+
+    def test_write_json(self, tmp_path):
+        path = tmp_path / 'dir' / 'data.json'
+
+        write_json(str(path), {'a': 1})
+        write_json(str(path), {'a': 2})
+
+        assert json.loads(path.read_text()) == {'a': 2}
+        assert os.listdir(str(tmp_path / 'dir')) == ['data.json']
+
+    def test_interrupted_write_keeps_file(self, tmp_path, mocker):
+        path = tmp_path / 'data.json'
+        write_json(str(path), {'a': 1})
+
+        mocker.patch.object(json, 'dump', side_effect=KeyboardInterrupt)
+        with pytest.raises(KeyboardInterrupt):
+            write_json(str(path), {'a': 2})
+
+        assert json.loads(path.read_text()) == {'a': 1}
+        assert os.listdir(str(tmp_path)) == ['data.json']
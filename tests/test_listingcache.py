@@ -0,0 +1,49 @@
+import time
+from dztoolset.listingcache import ListingCache
+
+
+class TestListingCache(object):
+
+    def test_save_and_get(self, tmp_path):
+        cache = ListingCache(str(tmp_path / 'playlists.json'), 60)
+        playlists = [{'id': 1, 'title': 'a'}]
+
+        assert cache.get('token') is None
+
+        cache.save('token', playlists)
+
+        assert cache.get('token') == playlists
+        assert cache.get('other_token') is None
+
+    def test_expired(self, tmp_path, mocker):
+        cache = ListingCache(str(tmp_path / 'playlists.json'), 60)
+        cache.save('token', [])
+        now = time.time()
+
+        mocker.patch.object(time, 'time', return_value=now + 61)
+
+        assert cache.get('token') is None
+
+    def test_keep_age(self, tmp_path, mocker):
+        cache = ListingCache(str(tmp_path / 'playlists.json'), 60)
+        cache.save('token', [])
+        now = time.time()
+
+        mocker.patch.object(time, 'time', return_value=now + 30)
+        cache.save('token', [{'id': 1}], keep_age=True)
+        assert cache.get('token') == [{'id': 1}]
+
+        time.time.return_value = now + 61
+        assert cache.get('token') is None
+
+    def test_disabled_and_clear(self, tmp_path):
+        cache = ListingCache(str(tmp_path / 'playlists.json'), 60)
+        cache.save('token', [])
+        cache.clear()
+        cache.clear()
+
+        assert cache.get('token') is None
+
+        cache.ttl = 0
+        cache.save('token', [])
+        assert cache.get('token') is None
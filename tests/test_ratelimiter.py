@@ -0,0 +1,58 @@
+import time
+import threading
+import pytest_mock
+from dztoolset.ratelimiter import RateLimiter
+
+assert callable(pytest_mock.mocker)
+
+
+class TestRateLimiter(object):
+
+    def setup(self):
+        self.limiter = RateLimiter(requests=5, period=1)
+
+    def teardown(self):
+        self.limiter = None
+
+    def test_burst_without_waiting(self, mocker):
+        mocker.patch('time.sleep')
+
+        for i in range(5):
+            self.limiter.acquire()
+
+        time.sleep.assert_not_called()
+        assert self.limiter.waited == 0
+
+    def test_wait_when_bucket_empty(self):
+        self.limiter = RateLimiter(requests=2, period=0.1)
+        started = time.monotonic()
+
+        for i in range(4):
+            self.limiter.acquire()
+
+        # two tokens from full bucket, two more refilled for 0.1 sec
+        assert time.monotonic() - started >= 0.09
+        assert self.limiter.waited > 0
+
+    def test_drain(self):
+        self.limiter = RateLimiter(requests=2, period=0.1)
+        self.limiter.drain()
+        started = time.monotonic()
+
+        self.limiter.acquire()
+
+        assert time.monotonic() - started >= 0.09
+
+    def test_thread_safe(self):
+        self.limiter = RateLimiter(requests=10, period=0.1)
+        threads = [threading.Thread(target=self.limiter.acquire)
+                   for i in range(20)]
+        started = time.monotonic()
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # ten from full bucket, ten more refilled for 0.1 sec
+        assert time.monotonic() - started >= 0.09
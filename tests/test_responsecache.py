@@ -0,0 +1,95 @@
+import os
+import time
+import pytest_mock
+from dztoolset.responsecache import ResponseCache
+
+assert callable(pytest_mock.mocker)
+
+
+class MockResponse(object):
+
+    def __init__(self, text, headers=None):
+        self.text = text
+        self.status_code = 200
+        self.headers = headers or {}
+
+
+class TestResponseCache(object):
+
+    def setup(self):
+        self.ttls = {'/user/me/playlists': 100, '/playlist/*/tracks': 100}
+        self.url = 'http://api.deezer.com/playlist/5/tracks'
+
+    def test_store_and_get(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), self.ttls)
+        cache.store(self.url, {'access_token': 'a', 'limit': 500},
+                    MockResponse('{"data": []}', {'ETag': '"tag"'}))
+
+        # key does not depend on token and order of params
+        entry = cache.get(self.url + '?limit=500', {'access_token': 'b'})
+
+        assert entry.text == '{"data": []}'
+        assert entry.is_fresh()
+        assert entry.get_validators() == {'If-None-Match': '"tag"'}
+        assert cache.get(self.url, {'limit': 25}) is None
+
+    def test_user_me_scoped_by_token(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), self.ttls)
+        url = 'http://api.deezer.com/user/me/playlists'
+        cache.store(url, {'access_token': 'a'}, MockResponse('[1]'))
+
+        assert cache.get(url, {'access_token': 'a'}).text == '[1]'
+        assert cache.get(url, {'access_token': 'b'}) is None
+        assert cache.get(url + '?access_token=b') is None
+
+        cache.invalidate(['/user/me/playlists'])
+
+        assert cache.get(url, {'access_token': 'a'}) is None
+
+    def test_not_cacheable_endpoint(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), self.ttls)
+        cache.store('http://api.deezer.com/user/me', None,
+                    MockResponse('{}'))
+
+        assert cache.get('http://api.deezer.com/user/me') is None
+        assert os.listdir(str(tmp_path)) == []
+
+    def test_stale_and_revalidated(self, tmp_path, mocker):
+        cache = ResponseCache(str(tmp_path), self.ttls)
+        cache.store(self.url, None, MockResponse('{"data": []}'))
+        stored = time.time()
+
+        mocker.patch('time.time', return_value=stored + 200)
+        entry = cache.get(self.url)
+        assert not entry.is_fresh()
+
+        cache.revalidated(entry)
+        assert cache.get(self.url).is_fresh()
+
+    def test_invalidate(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), self.ttls)
+        other_url = 'http://api.deezer.com/playlist/55/tracks'
+        cache.store(self.url, None, MockResponse('[]'))
+        cache.store(other_url, None, MockResponse('[]'))
+
+        cache.invalidate(['/playlist/5'])
+
+        assert cache.get(self.url) is None
+        assert cache.get(other_url) is not None
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), self.ttls, max_size=700)
+        urls = ['http://api.deezer.com/playlist/{0}/tracks'.format(n)
+                for n in range(3)]
+        text = '"{0}"'.format('x' * 150)
+
+        cache.store(urls[0], None, MockResponse(text))
+        cache.store(urls[1], None, MockResponse(text))
+        # use first entry, so second becomes least recently used
+        first = cache.get(urls[0])
+        os.utime(first.filename, (time.time() + 10, time.time() + 10))
+        cache.store(urls[2], None, MockResponse(text))
+
+        assert cache.get(urls[0]) is not None
+        assert cache.get(urls[1]) is None
+        assert cache.get(urls[2]) is not None
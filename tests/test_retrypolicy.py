@@ -0,0 +1,45 @@
+import requests
+import pytest_mock
+from dztoolset.retrypolicy import RetryPolicy
+
+assert callable(pytest_mock.mocker)
+
+
+class TestRetryPolicy(object):
+
+    def setup(self):
+        self.policy = RetryPolicy(max_attempts=3, backoff_base=1,
+                                  backoff_cap=3)
+
+    def teardown(self):
+        self.policy = None
+
+    def test_retry_idempotent_methods(self):
+        error = requests.exceptions.ReadTimeout()
+
+        assert self.policy.should_retry('get', 1, error)
+        assert self.policy.should_retry('delete', 2, error)
+        assert not self.policy.should_retry('get', 3, error)
+        assert self.policy.get_stats() == {'retries': 2, 'gave_up': 1}
+
+    def test_retry_post_only_if_not_sent(self):
+        assert not self.policy.should_retry(
+            'post', 1, requests.exceptions.ReadTimeout()
+        )
+        assert not self.policy.should_retry('post', 1, ValueError())
+        assert self.policy.should_retry(
+            'post', 1, requests.exceptions.ConnectTimeout()
+        )
+
+    def test_delay(self, mocker):
+        mocker.patch('random.uniform', side_effect=lambda a, b: b)
+
+        assert self.policy.get_delay(1) == 1
+        assert self.policy.get_delay(2) == 2
+        # capped
+        assert self.policy.get_delay(3) == 3
+        assert self.policy.get_delay(10) == 3
+
+    def test_delay_jitter(self):
+        for attempt in range(1, 5):
+            assert 0 <= self.policy.get_delay(attempt) <= 3
@@ -0,0 +1,47 @@
+from array import array
+from collections import Counter
+from dztoolset.sampler import ReservoirSampler
+
+
+class TestReservoirSampler(object):
+
+    def test_sample_size(self):
+        sampler = ReservoirSampler(10)
+        sampler.extend(range(1000))
+
+        sample = sampler.get_sample()
+
+        assert isinstance(sample, array)
+        assert len(sample) == 10
+        assert len(set(sample)) == 10
+        assert sampler.count == 1000
+
+    def test_small_stream(self):
+        sampler = ReservoirSampler(10)
+        sampler.extend([3, 1, 3, 2, 1])
+
+        assert sorted(sampler.get_sample()) == [1, 2, 3]
+        assert sampler.count == 5
+
+    def test_duplicates_dropped(self):
+        sampler = ReservoirSampler(5)
+        sampler.extend(list(range(100)) * 3)
+
+        sample = sampler.get_sample()
+
+        assert len(sample) == 5
+        assert len(set(sample)) == 5
+
+    def test_uniform(self):
+        # id 0 is repeated many times, but it must not be picked
+        # more often than others
+        stream = [0] * 50 + list(range(10)) + [5] * 20
+        counter = Counter()
+        for i in range(2000):
+            sampler = ReservoirSampler(2)
+            sampler.extend(stream)
+            counter.update(sampler.get_sample())
+
+        assert set(counter) == set(range(10))
+        for item, count in counter.items():
+            assert 300 < count < 500
@@ -0,0 +1,54 @@
+import json
+import time
+from dztoolset.tokencache import TokenCache
+
+
+class TestTokenCache(object):
+
+    def test_save_and_get(self, tmp_path):
+        cache = TokenCache(str(tmp_path / 'token.json'), 60)
+        user = {'type': 'user', 'id': 1}
+
+        assert cache.get_user('token') is None
+
+        cache.save('token', user)
+
+        assert cache.get_user('token') == user
+        assert cache.get_user('other_token') is None
+        assert cache.get_user('') is None
+
+    def test_token_not_stored(self, tmp_path):
+        path = tmp_path / 'token.json'
+        TokenCache(str(path)).save('secret_token', {'id': 1})
+
+        assert 'secret_token' not in path.read_text()
+
+    def test_expired(self, tmp_path, mocker):
+        cache = TokenCache(str(tmp_path / 'token.json'), 60)
+        cache.save('token', {'id': 1})
+
+        mocker.patch.object(time, 'time', return_value=time.time() + 61)
+
+        assert cache.get_user('token') is None
+
+    def test_disabled(self, tmp_path):
+        cache = TokenCache(str(tmp_path / 'token.json'), 0)
+        cache.save('token', {'id': 1})
+
+        assert cache.get_user('token') is None
+
+    def test_clear_and_broken_file(self, tmp_path):
+        path = tmp_path / 'token.json'
+        cache = TokenCache(str(path))
+        cache.save('token', {'id': 1})
+
+        cache.clear()
+        cache.clear()
+
+        assert cache.get_user('token') is None
+
+        path.write_text('{broken')
+        assert cache.get_user('token') is None
+
+        path.write_text(json.dumps({'token_hash': 'x'}))
+        assert cache.get_user('token') is None
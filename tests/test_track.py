@@ -0,0 +1,29 @@
+import pytest
+from dztoolset.track import Track
+
+
+class TestTrack(object):
+
+    def test_from_dict(self):
+        track = Track.from_dict({
+            'id': 3135556,
+            'title': 'Harder Better Faster Stronger',
+            'duration': 224,
+            'link': 'https://www.deezer.com/track/3135556',
+            'md5_image': '2e018122cb56986277102d2041a592c8',
+            'artist': {'id': 27, 'name': 'Daft Punk'},
+            'album': {'id': 302127, 'title': 'Discovery'},
+        })
+
+        assert track == Track(3135556, 'Harder Better Faster Stronger',
+                              'Daft Punk', 'Discovery', 224)
+
+    def test_from_dict_only_id(self):
+        assert Track.from_dict({'id': '5'}) == Track(5)
+
+    def test_slots(self):
+        track = Track(1)
+
+        assert not hasattr(track, '__dict__')
+        with pytest.raises(AttributeError):
+            track.link = 'https://www.deezer.com/track/1'
@@ -0,0 +1,49 @@
+import sqlite3
+from array import array
+from dztoolset.trackstore import TrackStore
+
+
+class TestTrackStore(object):
+
+    def test_save_and_get(self, tmp_path):
+        store = TrackStore(str(tmp_path / 'store' / 'tracks.db'))
+
+        assert store.get_track_ids(1, 'abc') is None
+
+        store.save(1, 'abc', [5, 3, 8])
+
+        assert store.get_track_ids(1, 'abc') == array('q', [5, 3, 8])
+        assert store.get_track_ids('1', 'abc') == array('q', [5, 3, 8])
+        assert store.get_track_ids(1, 'other') is None
+        store.close()
+
+    def test_save_replaces_tracks(self, tmp_path):
+        store = TrackStore(str(tmp_path / 'tracks.db'))
+        store.save(1, 'abc', [5, 3, 8])
+        store.save(1, 'def', [2])
+
+        assert store.get_track_ids(1, 'abc') is None
+        assert store.get_track_ids(1, 'def') == array('q', [2])
+        store.close()
+
+    def test_remove(self, tmp_path):
+        store = TrackStore(str(tmp_path / 'tracks.db'))
+        store.save(1, 'abc', [5])
+        store.save(2, 'abc', [6])
+
+        store.remove(1)
+
+        assert store.get_track_ids(1, 'abc') is None
+        assert store.get_track_ids(2, 'abc') == array('q', [6])
+        store.close()
+
+    def test_persistent(self, tmp_path):
+        path = str(tmp_path / 'tracks.db')
+        store = TrackStore(path)
+        store.save(1, 'abc', [5, 3])
+        store.close()
+
+        assert TrackStore(path).get_track_ids(1, 'abc') == array('q', [5, 3])
+        rows = sqlite3.connect(path).execute(
+            'SELECT nb_tracks FROM playlists').fetchall()
+        assert rows == [(2,)]